@@ -0,0 +1,40 @@
+"""postgres gist indexes
+
+Revision ID: 0a7d6e3f9b52
+Revises: c31e9a4b7d20
+Create Date: 2025-10-14 20:05:17.640281
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7d6e3f9b52'
+down_revision: Union[str, Sequence[str], None] = 'c31e9a4b7d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Natywne indeksy tylko na Postgresie; SQLite korzysta z geo_cell i indeksów B-tree.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_reports_location_gist "
+        "ON reports USING gist (point(longitude, latitude))"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_events_time_range_gist "
+        "ON events USING gist (tstzrange(starts_at, ends_at, '[]'))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_events_time_range_gist")
+    op.execute("DROP INDEX IF EXISTS ix_reports_location_gist")
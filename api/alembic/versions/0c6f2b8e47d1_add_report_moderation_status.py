@@ -0,0 +1,53 @@
+"""add report moderation_status
+
+Revision ID: 0c6f2b8e47d1
+Revises: f3b7e1a94c26
+Create Date: 2025-10-18 16:22:51.770349
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c6f2b8e47d1'
+down_revision: Union[str, Sequence[str], None] = 'f3b7e1a94c26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+moderation_status = sa.Enum('PENDING', 'APPROVED', 'REJECTED', name='moderation_status')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Typ enum na Postgresie nie powstaje sam przy add_column.
+    moderation_status.create(op.get_bind(), checkfirst=True)
+    # Istniejące zgłoszenia przeszły już moderację synchroniczną.
+    op.add_column(
+        'reports',
+        sa.Column('moderation_status', moderation_status, server_default='APPROVED', nullable=False),
+    )
+    op.create_index(op.f('ix_reports_moderation_status'), 'reports', ['moderation_status'], unique=False)
+
+    # Status na końcu indeksu klastrów – agregacja widocznych zgłoszeń dalej idzie samym indeksem.
+    op.drop_index('ix_reports_geo_cell_type_created', table_name='reports')
+    op.create_index(
+        'ix_reports_geo_cell_type_created',
+        'reports',
+        ['geo_cell', 'type', 'created_at', 'moderation_status'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reports_geo_cell_type_created', table_name='reports')
+    op.create_index(
+        'ix_reports_geo_cell_type_created', 'reports', ['geo_cell', 'type', 'created_at'], unique=False
+    )
+    op.drop_index(op.f('ix_reports_moderation_status'), table_name='reports')
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.drop_column('moderation_status')
+    moderation_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,58 @@
+"""add event duration_class
+
+Revision ID: 4b1e9c7d2a60
+Revises: 0a7d6e3f9b52
+Create Date: 2025-10-15 18:41:09.532017
+
+"""
+from math import ceil
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b1e9c7d2a60'
+down_revision: Union[str, Sequence[str], None] = '0a7d6e3f9b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Klasy długości zamrożone na stan tej rewizji (app.utils.intervals.duration_class) – migracja nie może
+# zależeć od bieżącego kodu aplikacji.
+_DURATION_CLASS_MAX = 19
+
+
+def _duration_class(starts_at, ends_at) -> int:
+    minutes = ceil(max((ends_at - starts_at).total_seconds(), 0) / 60)
+    return min(max(minutes - 1, 0).bit_length(), _DURATION_CLASS_MAX)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('duration_class', sa.Integer(), nullable=True))
+
+    events = sa.table(
+        'events',
+        sa.column('id', sa.Integer()),
+        sa.column('starts_at', sa.DateTime(timezone=True)),
+        sa.column('ends_at', sa.DateTime(timezone=True)),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(events.c.id, events.c.starts_at, events.c.ends_at)).all()
+    if rows:
+        bind.execute(
+            sa.text("UPDATE events SET duration_class = :duration_class WHERE id = :id"),
+            [{"id": row.id, "duration_class": _duration_class(row.starts_at, row.ends_at)} for row in rows],
+        )
+
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.alter_column('duration_class', existing_type=sa.Integer(), nullable=False)
+    op.create_index('ix_events_duration_start', 'events', ['duration_class', 'starts_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_events_duration_start', table_name='events')
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.drop_column('duration_class')
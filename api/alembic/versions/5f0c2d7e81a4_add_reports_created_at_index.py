@@ -0,0 +1,33 @@
+"""add reports created_at index
+
+Revision ID: 5f0c2d7e81a4
+Revises: 93c5f5ba3217
+Create Date: 2025-10-12 18:40:03.551927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0c2d7e81a4'
+down_revision: Union[str, Sequence[str], None] = '93c5f5ba3217'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Wiersze z server_default datetime('now') nie mają mikrosekund – ujednolicamy format,
+    # żeby porównania kursora (created_at, id) były spójne z parametrami SQLAlchemy.
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute(
+            "UPDATE reports SET created_at = created_at || '.000000' WHERE length(created_at) = 19"
+        )
+    op.create_index('ix_reports_created_at_id', 'reports', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reports_created_at_id', table_name='reports')
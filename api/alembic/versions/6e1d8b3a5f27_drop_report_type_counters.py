@@ -0,0 +1,30 @@
+"""drop report type counters
+
+Revision ID: 6e1d8b3a5f27
+Revises: 0c6f2b8e47d1
+Create Date: 2025-10-19 09:14:37.208114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1d8b3a5f27'
+down_revision: Union[str, Sequence[str], None] = '0c6f2b8e47d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Liczniki per typ nie były nigdzie czytane – zostaje tylko 'reports'.
+    op.execute(sa.text("DELETE FROM row_counts WHERE name LIKE 'reports:type:%'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Kod sprzed tej migracji i tak ich nie czytał – nie odtwarzamy.
+    pass
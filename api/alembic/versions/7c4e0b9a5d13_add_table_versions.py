@@ -0,0 +1,39 @@
+"""add table_versions
+
+Revision ID: 7c4e0b9a5d13
+Revises: e2a9d5f13c87
+Create Date: 2025-10-17 09:03:28.615740
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e0b9a5d13'
+down_revision: Union[str, Sequence[str], None] = 'e2a9d5f13c87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    table_versions = op.create_table('table_versions',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    now = datetime.now(timezone.utc)
+    op.bulk_insert(
+        table_versions,
+        [{"name": name, "version": 1, "updated_at": now} for name in ("events", "reports")],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('table_versions')
@@ -0,0 +1,34 @@
+"""events window location index
+
+Revision ID: 8d2f4a61c0b9
+Revises: 4b1e9c7d2a60
+Create Date: 2025-10-16 10:27:44.906113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f4a61c0b9'
+down_revision: Union[str, Sequence[str], None] = '4b1e9c7d2a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_events_duration_start_location',
+        'events',
+        ['duration_class', 'starts_at', 'ends_at', 'lat', 'lng', 'radius_m'],
+        unique=False,
+    )
+    op.drop_index('ix_events_duration_start', table_name='events')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_events_duration_start', 'events', ['duration_class', 'starts_at'], unique=False)
+    op.drop_index('ix_events_duration_start_location', table_name='events')
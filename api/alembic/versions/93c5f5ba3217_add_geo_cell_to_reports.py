@@ -0,0 +1,54 @@
+"""add geo_cell to reports
+
+Revision ID: 93c5f5ba3217
+Revises: b486f7701f03
+Create Date: 2025-10-11 09:12:40.118205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '93c5f5ba3217'
+down_revision: Union[str, Sequence[str], None] = 'b486f7701f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Siatka zamrożona na stan tej rewizji (app.utils.geo.grid_cell) – migracja nie może zależeć od
+# bieżącego kodu aplikacji.
+_GRID_CELL_DEG = 0.01
+_GRID_ROWS = round(180 / _GRID_CELL_DEG)
+_GRID_COLS = round(360 / _GRID_CELL_DEG)
+
+
+def _grid_cell(lat: float, lng: float) -> int:
+    row = min(max(int((lat + 90.0) / _GRID_CELL_DEG), 0), _GRID_ROWS - 1)
+    col = min(max(int((lng + 180.0) / _GRID_CELL_DEG), 0), _GRID_COLS - 1)
+    return row * _GRID_COLS + col
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reports', sa.Column('geo_cell', sa.Integer(), nullable=True))
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, latitude, longitude FROM reports")).all()
+    if rows:
+        bind.execute(
+            sa.text("UPDATE reports SET geo_cell = :geo_cell WHERE id = :id"),
+            [{"id": row.id, "geo_cell": _grid_cell(row.latitude, row.longitude)} for row in rows],
+        )
+
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.alter_column('geo_cell', existing_type=sa.Integer(), nullable=False)
+    op.create_index(op.f('ix_reports_geo_cell'), 'reports', ['geo_cell'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_reports_geo_cell'), table_name='reports')
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.drop_column('geo_cell')
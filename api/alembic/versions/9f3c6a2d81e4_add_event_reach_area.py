@@ -0,0 +1,75 @@
+"""add event reach_class and area
+
+Revision ID: 9f3c6a2d81e4
+Revises: 6e1d8b3a5f27
+Create Date: 2025-10-19 11:02:48.615390
+
+"""
+from math import ceil, log2
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f3c6a2d81e4'
+down_revision: Union[str, Sequence[str], None] = '6e1d8b3a5f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Klasy zasięgu i siatki zamrożone na stan tej rewizji (app.utils.geo.reach_class / reach_grid) – migracja
+# nie może zależeć od bieżącego kodu aplikacji.
+_GRID_CELL_DEG = 0.01
+_GRID_ROWS = round(180 / _GRID_CELL_DEG)
+_GRID_COLS = round(360 / _GRID_CELL_DEG)
+_REACH_CLASS_MAX = 12
+
+
+def _reach_class(radius_m: float) -> int:
+    km = radius_m / 1000
+    return min(ceil(log2(km)), _REACH_CLASS_MAX) if km > 1 else 0
+
+
+def _reach_area(class_: int, lat: float, lng: float) -> int:
+    factor = 1 << min(class_, _REACH_CLASS_MAX)
+    row = min(max(int((lat + 90.0) / _GRID_CELL_DEG), 0), _GRID_ROWS - 1)
+    col = min(max(int((lng + 180.0) / _GRID_CELL_DEG), 0), _GRID_COLS - 1)
+    return (row // factor) * ceil(_GRID_COLS / factor) + col // factor
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('reach_class', sa.Integer(), nullable=True))
+    op.add_column('events', sa.Column('area', sa.Integer(), nullable=True))
+
+    events = sa.table(
+        'events',
+        sa.column('id', sa.Integer()),
+        sa.column('lat', sa.Float()),
+        sa.column('lng', sa.Float()),
+        sa.column('radius_m', sa.Integer()),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(events.c.id, events.c.lat, events.c.lng, events.c.radius_m)).all()
+    params = []
+    for row in rows:
+        class_ = _reach_class(row.radius_m)
+        params.append({"id": row.id, "reach_class": class_, "area": _reach_area(class_, row.lat, row.lng)})
+    if params:
+        bind.execute(sa.text("UPDATE events SET reach_class = :reach_class, area = :area WHERE id = :id"), params)
+
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.alter_column('reach_class', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('area', existing_type=sa.Integer(), nullable=False)
+    op.create_index(
+        'ix_events_reach_area_ends', 'events', ['reach_class', 'area', 'ends_at', 'starts_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_events_reach_area_ends', table_name='events')
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.drop_column('area')
+        batch_op.drop_column('reach_class')
@@ -0,0 +1,83 @@
+"""add event_lines
+
+Revision ID: a93b6e2d48f1
+Revises: 7c4e0b9a5d13
+Create Date: 2025-10-17 14:36:52.081467
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93b6e2d48f1'
+down_revision: Union[str, Sequence[str], None] = '7c4e0b9a5d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Normalizacja linii i przewoźnika zamrożona na stan tej rewizji (app.utils.transit) – migracja nie może
+# zależeć od bieżącego kodu aplikacji.
+_LINE_SEPARATORS = re.compile(r"[,;/|\s]+")
+
+
+def _split_lines(affected_lines: str | None) -> list[str]:
+    if not affected_lines:
+        return []
+    lines = (part.strip().upper() for part in _LINE_SEPARATORS.split(affected_lines))
+    return list(dict.fromkeys(line for line in lines if line))
+
+
+def _normalize_carrier(carrier: str | None) -> str | None:
+    if carrier is None:
+        return None
+    return carrier.strip().lower() or None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    event_lines = op.create_table('event_lines',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('line', sa.String(length=50), nullable=False),
+    sa.Column('carrier', sa.String(length=100), nullable=True),
+    sa.Column('starts_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('ends_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id', 'line')
+    )
+    op.create_index('ix_event_lines_line_ends', 'event_lines', ['line', 'ends_at'], unique=False)
+    op.create_index('ix_event_lines_line_carrier_ends', 'event_lines', ['line', 'carrier', 'ends_at'], unique=False)
+
+    events = sa.table(
+        'events',
+        sa.column('id', sa.Integer()),
+        sa.column('affected_lines', sa.String()),
+        sa.column('carrier', sa.String()),
+        sa.column('starts_at', sa.DateTime(timezone=True)),
+        sa.column('ends_at', sa.DateTime(timezone=True)),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(events).where(events.c.affected_lines.is_not(None))).all()
+    op.bulk_insert(
+        event_lines,
+        [
+            {
+                "event_id": row.id,
+                "line": line,
+                "carrier": _normalize_carrier(row.carrier),
+                "starts_at": row.starts_at,
+                "ends_at": row.ends_at,
+            }
+            for row in rows
+            for line in _split_lines(row.affected_lines)
+        ],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_event_lines_line_carrier_ends', table_name='event_lines')
+    op.drop_index('ix_event_lines_line_ends', table_name='event_lines')
+    op.drop_table('event_lines')
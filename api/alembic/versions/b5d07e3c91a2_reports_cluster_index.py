@@ -0,0 +1,31 @@
+"""reports cluster index
+
+Revision ID: b5d07e3c91a2
+Revises: a93b6e2d48f1
+Create Date: 2025-10-18 11:14:06.372958
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d07e3c91a2'
+down_revision: Union[str, Sequence[str], None] = 'a93b6e2d48f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_reports_geo_cell_type_created', 'reports', ['geo_cell', 'type', 'created_at'], unique=False
+    )
+    op.drop_index(op.f('ix_reports_geo_cell'), table_name='reports')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_reports_geo_cell'), 'reports', ['geo_cell'], unique=False)
+    op.drop_index('ix_reports_geo_cell_type_created', table_name='reports')
@@ -0,0 +1,35 @@
+"""add row_counts
+
+Revision ID: c31e9a4b7d20
+Revises: 5f0c2d7e81a4
+Create Date: 2025-10-13 08:27:51.903412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c31e9a4b7d20'
+down_revision: Union[str, Sequence[str], None] = '5f0c2d7e81a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    row_counts = op.create_table('row_counts',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    total = op.get_bind().execute(sa.text("SELECT count(*) FROM reports")).scalar_one()
+    op.bulk_insert(row_counts, [{"name": "reports", "value": total}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('row_counts')
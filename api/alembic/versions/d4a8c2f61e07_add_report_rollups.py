@@ -0,0 +1,95 @@
+"""add report rollups
+
+Revision ID: d4a8c2f61e07
+Revises: b5d07e3c91a2
+Create Date: 2025-10-18 10:12:37.604118
+
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+from math import ceil
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8c2f61e07'
+down_revision: Union[str, Sequence[str], None] = 'b5d07e3c91a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLES = {
+    'hour': 'report_rollups_hourly',
+    'day': 'report_rollups_daily',
+}
+
+# Kubełki i obszary zamrożone na stan tej rewizji (app.repositories.rollup, ROLLUP_AREA_FACTOR = 50) –
+# migracja nie może zależeć od bieżącego kodu ani ustawień aplikacji.
+_ROLLUP_FIELDS = ('reports', 'likes', 'confirmations', 'denials')
+_GRID_COLS = 36000
+_AREA_FACTOR = 50
+_AREA_COLS = ceil(_GRID_COLS / _AREA_FACTOR)
+
+
+def _bucket_start(at: datetime, granularity: str) -> datetime:
+    at = at.replace(tzinfo=timezone.utc) if at.tzinfo is None else at.astimezone(timezone.utc)
+    if granularity == 'day':
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+def _area_of_cell(cell: int) -> int:
+    return (cell // _GRID_COLS // _AREA_FACTOR) * _AREA_COLS + (cell % _GRID_COLS) // _AREA_FACTOR
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tables = {}
+    for granularity, name in _TABLES.items():
+        tables[granularity] = op.create_table(name,
+        sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('type', sa.String(length=20), nullable=False),
+        sa.Column('area', sa.Integer(), nullable=False),
+        sa.Column('reports', sa.Integer(), nullable=False),
+        sa.Column('likes', sa.Integer(), nullable=False),
+        sa.Column('confirmations', sa.Integer(), nullable=False),
+        sa.Column('denials', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('bucket', 'type', 'area')
+        )
+        op.create_index(f'ix_{name}_area_bucket', name, ['area', 'bucket'], unique=False)
+
+    # Istniejące zgłoszenia: głosy nie mają znacznika czasu, więc trafiają do kubełka utworzenia zgłoszenia.
+    reports = sa.table(
+        'reports',
+        sa.column('type', sa.String()),
+        sa.column('geo_cell', sa.Integer()),
+        sa.column('created_at', sa.DateTime(timezone=True)),
+        sa.column('likes', sa.Integer()),
+        sa.column('confirmations', sa.Integer()),
+        sa.column('denials', sa.Integer()),
+    )
+    bind = op.get_bind()
+    for granularity, table in tables.items():
+        totals = defaultdict(lambda: dict.fromkeys(_ROLLUP_FIELDS, 0))
+        for row in bind.execute(sa.select(reports)):
+            key = (_bucket_start(row.created_at, granularity), row.type.lower(), _area_of_cell(row.geo_cell))
+            counts = totals[key]
+            counts['reports'] += 1
+            for field in ('likes', 'confirmations', 'denials'):
+                counts[field] += getattr(row, field)
+        op.bulk_insert(
+            table,
+            [
+                {'bucket': bucket, 'type': type_, 'area': area, **counts}
+                for (bucket, type_, area), counts in totals.items()
+            ],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in reversed(_TABLES.values()):
+        op.drop_index(f'ix_{name}_area_bucket', table_name=name)
+        op.drop_table(name)
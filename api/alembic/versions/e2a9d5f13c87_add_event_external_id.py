@@ -0,0 +1,31 @@
+"""add event external_id
+
+Revision ID: e2a9d5f13c87
+Revises: 8d2f4a61c0b9
+Create Date: 2025-10-16 16:52:13.270394
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9d5f13c87'
+down_revision: Union[str, Sequence[str], None] = '8d2f4a61c0b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('external_id', sa.String(length=200), nullable=True))
+    op.create_index('uq_events_source_external_id', 'events', ['source', 'external_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_events_source_external_id', table_name='events')
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.drop_column('external_id')
@@ -32,7 +32,7 @@ def upgrade() -> None:
     sa.Column('likes', sa.Integer(), nullable=False),
     sa.Column('confirmations', sa.Integer(), nullable=False),
     sa.Column('denials', sa.Integer(), nullable=False),
-    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text("(datetime('now'))"), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
     sa.PrimaryKeyConstraint('id')
     )
     op.create_index(op.f('ix_reports_id'), 'reports', ['id'], unique=False)
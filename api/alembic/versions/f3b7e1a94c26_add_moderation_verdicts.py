@@ -0,0 +1,35 @@
+"""add moderation_verdicts
+
+Revision ID: f3b7e1a94c26
+Revises: d4a8c2f61e07
+Create Date: 2025-10-18 13:05:44.218930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b7e1a94c26'
+down_revision: Union[str, Sequence[str], None] = 'd4a8c2f61e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('moderation_verdicts',
+    sa.Column('text_hash', sa.String(length=64), nullable=False),
+    sa.Column('allowed', sa.Boolean(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('text_hash')
+    )
+    op.create_index(op.f('ix_moderation_verdicts_expires_at'), 'moderation_verdicts', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_moderation_verdicts_expires_at'), table_name='moderation_verdicts')
+    op.drop_table('moderation_verdicts')
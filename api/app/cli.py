@@ -0,0 +1,60 @@
+import asyncio
+import sys
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import BinaryIO
+
+import typer
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal, engine
+from app.services.event_import import ImportFormat, import_events
+
+cli = typer.Typer(help="Travel Hi API – narzędzia administracyjne.", no_args_is_help=True)
+
+_READ_CHUNK = 1024 * 1024
+
+
+@cli.callback()
+def main() -> None:
+    """Uruchamiaj z katalogu api/ (`python -m app.cli ...`), z tą samą konfiguracją co API."""
+
+
+async def _read_chunks(stream: BinaryIO) -> AsyncIterator[bytes]:
+    while chunk := stream.read(_READ_CHUNK):
+        yield chunk
+
+
+async def _import(stream: BinaryIO, fmt: ImportFormat, batch_size: int):
+    try:
+        async with AsyncSessionLocal() as session:
+            return await import_events(session, _read_chunks(stream), fmt, batch_size=batch_size)
+    finally:
+        await engine.dispose()
+
+
+@cli.command("import-events")
+def import_events_command(
+        source: str = typer.Argument(..., help="Plik NDJSON/CSV albo '-' dla stdin"),
+        format: ImportFormat | None = typer.Option(None, "--format", "-f", help="Domyślnie według rozszerzenia pliku"),
+        batch_size: int = typer.Option(settings.EVENT_IMPORT_BATCH_SIZE, min=1, help="Rekordów na transakcję"),
+) -> None:
+    """Import zdarzeń z feedu; rekordy z istniejącym (source, external_id) są aktualizowane."""
+    if source == "-":
+        fmt = format or ImportFormat.NDJSON
+        result = asyncio.run(_import(sys.stdin.buffer, fmt, batch_size))
+    else:
+        path = Path(source)
+        fmt = format or (ImportFormat.CSV if path.suffix.lower() == ".csv" else ImportFormat.NDJSON)
+        with path.open("rb") as stream:
+            result = asyncio.run(_import(stream, fmt, batch_size))
+
+    typer.echo(f"received={result.received} upserted={result.upserted} failed={result.failed}")
+    for error in result.errors:
+        typer.echo(f"  line {error.line}: {error.error}", err=True)
+    if result.failed:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import DbSession
+from app.repositories.counter import get_versions
+
+
+class NotModified(Exception):
+    """Raised when the client's validators still match; turned into an empty 304 by the handler in main.py."""
+
+    def __init__(self, headers: dict[str, str]):
+        self.headers = headers
+
+
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers=exc.headers)
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # SQLite zwraca naiwne daty (zapisywane w UTC).
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Porównanie słabe (RFC 9110): prefiks W/ jest ignorowany.
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _unmodified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return int(last_modified.timestamp()) <= int(since.timestamp())
+
+
+async def check_conditional(
+        request: Request,
+        session: AsyncSession,
+        tables: list[str],
+        *,
+        salt: str | None = None,
+) -> dict[str, str]:
+    """
+    Validators for a read endpoint, derived from the change versions of `tables` (no body hashing).
+
+    Raises `NotModified` when `If-None-Match` / `If-Modified-Since` still match; otherwise returns the
+    `ETag`, `Last-Modified` and `Cache-Control` headers to send with the response. `salt` is mixed into
+    the ETag for responses that also depend on something other than the tables (e.g. the current time);
+    such responses get no `Last-Modified`.
+    """
+    versions = await get_versions(session, tables)
+    tag = "-".join(f"{name}.{versions[name][0] if name in versions else 0}" for name in tables)
+    if salt:
+        tag = f"{tag}-{salt}"
+    headers = {"ETag": f'W/"{tag}"', "Cache-Control": "no-cache"}
+
+    last_modified = None
+    if versions and not salt:
+        last_modified = max(_as_utc(updated_at) for _, updated_at in versions.values())
+        # Last-Modified ma rozdzielczość sekundy: w sekundzie ostatniej zmiany kolejny zapis dostałby tę samą
+        # wartość i If-Modified-Since dałby nieaktualne 304. Wysyłamy go dopiero, gdy ta sekunda minęła
+        # (RFC 9110 §8.8.2.2) – do tego czasu walidatorem jest sam ETag.
+        if int(last_modified.timestamp()) < int(datetime.now(timezone.utc).timestamp()):
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+        else:
+            last_modified = None
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, headers["ETag"]):
+            raise NotModified(headers)
+    elif last_modified is not None:
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and _unmodified_since(if_modified_since, last_modified):
+            raise NotModified(headers)
+    return headers
+
+
+def table_validators(*tables: str):
+    """Dependency: conditional-GET check for an endpoint whose response depends only on `tables`."""
+    async def validators_dependency(request: Request, response: Response, session: DbSession) -> dict[str, str]:
+        headers = await check_conditional(request, session, list(tables))
+        response.headers.update(headers)
+        return headers
+
+    return validators_dependency
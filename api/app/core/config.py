@@ -24,6 +24,8 @@ class Settings(BaseSettings):
     SECRET_KEY: str = Field(..., description="Secret dla JWT")
 
 
+    # Async URL: sqlite+aiosqlite (local/test) or postgresql+asyncpg.
+    DATABASE_URL: str = "sqlite+aiosqlite:///./app.db"
     DB_POOL_SIZE: int = 10
     DB_MAX_OVERFLOW: int = 20
     DB_POOL_TIMEOUT: int = 30
@@ -31,14 +33,92 @@ class Settings(BaseSettings):
     DB_PRE_PING: bool = True
     DB_ECHO: bool = False
 
+    # Pragmas applied to every SQLite connection (ignored on other backends).
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE: int = -64_000  # ujemna wartość = KiB, dodatnia = liczba stron
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # Co ile sekund robić wal_checkpoint(PASSIVE) + PRAGMA optimize; 0 wyłącza.
+    SQLITE_MAINTENANCE_INTERVAL_SECONDS: int = 300
+
     MAX_IMAGE_BYTES: int = 5 * 1024 * 1024
     IMAGES_UPLOAD_DIR: str = "uploaded_images"
 
+    # In-process index of recent ("live") reports; needs numpy.
+    LIVE_INDEX_ENABLED: bool = False
+    LIVE_INDEX_MAX_AGE_MINUTES: int = 180
+    LIVE_INDEX_MAX_ITEMS: int = 50_000
+
+    # Cache of filtered list totals served for include_total=approx.
+    COUNT_CACHE_TTL_SECONDS: int = 60
+    COUNT_CACHE_MAX_ITEMS: int = 2048
+
+    # Map clusters (GET /incidents/clusters), cached per (zoom, cell).
+    CLUSTER_CACHE_TTL_SECONDS: int = 30
+    CLUSTER_CACHE_MAX_ITEMS: int = 20_000
+    CLUSTER_POINTS_THRESHOLD: int = 5
+
+    # Outbound LLM calls (moderation, disruption assessment): global concurrency limit and per-call timeouts.
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_TIMEOUT_SECONDS: float = 15.0
+    MODERATION_TIMEOUT_SECONDS: float = 5.0
+
+    # Asynchronous moderation: POST /incidents stores the report as pending and returns at once;
+    # MODERATION_WORKERS background tasks moderate it and publish it when approved.
+    MODERATION_ASYNC_ENABLED: bool = False
+    MODERATION_WORKERS: int = 4
+    # A failed moderation is retried after RETRY_BASE_SECONDS, doubling up to RETRY_MAX_SECONDS.
+    MODERATION_RETRY_BASE_SECONDS: float = 2.0
+    MODERATION_RETRY_MAX_SECONDS: float = 300.0
+
+    # Micro-batching of LLM moderation: texts arriving within MAX_WAIT_MS (up to MAX_ITEMS) share one call.
+    MODERATION_BATCH_ENABLED: bool = True
+    MODERATION_BATCH_MAX_ITEMS: int = 16
+    MODERATION_BATCH_MAX_WAIT_MS: int = 25
+
+    # Moderation verdict cache: in-process LRU in front of the persistent `moderation_verdicts` table.
+    MODERATION_CACHE_ENABLED: bool = True
+    MODERATION_CACHE_ALLOWED_ONLY: bool = False
+    MODERATION_CACHE_MAX_ITEMS: int = 10_000
+    MODERATION_CACHE_MEMORY_TTL_SECONDS: int = 3600
+    MODERATION_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # Local disruption scorer: recent reports within RADIUS_KM / MAX_AGE_MINUTES plus events at that time;
+    # the LLM is consulted only when its confidence is below MIN_CONFIDENCE.
+    DISRUPTION_HEURISTIC_ENABLED: bool = True
+    DISRUPTION_HEURISTIC_MIN_CONFIDENCE: float = 0.75
+    DISRUPTION_HEURISTIC_RADIUS_KM: float = 1.0
+    DISRUPTION_HEURISTIC_MAX_AGE_MINUTES: int = 60
+    DISRUPTION_HEURISTIC_MAX_REPORTS: int = 200
+
+    # Cache of /disruptions/predict results, keyed on city/mode/line, a coarse area
+    # (DISRUPTION_CACHE_AREA_FACTOR grid cells per side), a time bucket and the normalized user text.
+    DISRUPTION_CACHE_ENABLED: bool = True
+    DISRUPTION_CACHE_TTL_SECONDS: int = 120
+    DISRUPTION_CACHE_MAX_ITEMS: int = 2048
+    DISRUPTION_CACHE_BUCKET_MINUTES: int = 5
+    DISRUPTION_CACHE_AREA_FACTOR: int = 10
+
+    # Hourly/daily report rollups (GET /metrics/reports); an area is ROLLUP_AREA_FACTOR x ROLLUP_AREA_FACTOR grid cells.
+    ROLLUP_AREA_FACTOR: int = 50
+    ROLLUP_MAX_BUCKETS: int = 1000
+
+    # Write-behind buffering of like/confirm/deny votes.
+    VOTE_WRITE_BEHIND_ENABLED: bool = False
+    VOTE_FLUSH_INTERVAL_MS: int = 500
+
+    # Cache of /events/by-day and /events/around results; `at` is rounded to buckets of this many minutes.
+    EVENT_CACHE_TTL_SECONDS: int = 300
+    EVENT_CACHE_MAX_ITEMS: int = 1024
+    EVENT_CACHE_AT_BUCKET_MINUTES: int = 15
+
+    # Bulk event import (POST /events/bulk, `python -m app.cli import-events`).
+    EVENT_IMPORT_BATCH_SIZE: int = 1000
+
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
 
-    @property
-    def DATABASE_URL(self) -> str:
-        return "sqlite+aiosqlite:///./app.db"
 
 settings = Settings()
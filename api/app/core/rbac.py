@@ -1,10 +1,10 @@
 from fastapi import Depends, HTTPException, status
 from jose import jwt
 from jose.exceptions import JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db.database import get_session
+from app.db.session import get_db_session
 from app.core.security import oauth2_scheme
 from app.schemas.token import TokenData
 from app.schemas.user import Role, Permission, User
@@ -38,17 +38,17 @@ def get_permissions_for_role(role):
     return ROLE_PERMISSIONS.get(role, [])
 
 
-async def _get_user_by_username(username: str, db: Session) -> User | None:
+async def _get_user_by_username(username: str, db: AsyncSession) -> User | None:
     """Lazily import and call the user module function"""
     global _user_module
     if _user_module is None:
         import app.repositories.user as user_module
         _user_module = user_module
 
-    return _user_module.get_user_by_username(username, db)
+    return await _user_module.get_user_by_username(username, db)
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_session)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db_session)):
     """Get the current user from a JWT token."""
     credential_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
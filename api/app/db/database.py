@@ -1,29 +1,68 @@
-from typing import Generator
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from typing import Any
 
-DATABASE_URL = "sqlite:///./app.db"
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,
+from app.core.config import settings
+
+
+def engine_options(url: str) -> dict[str, Any]:
+    """Pool settings from `Settings`; an in-memory SQLite database keeps the driver's default pool."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_PRE_PING,
+    }
+
+
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DB_ECHO,
     future=True,
-    connect_args={"check_same_thread": False},
+    **engine_options(settings.DATABASE_URL),
 )
 
-SessionLocal: sessionmaker[Session] = sessionmaker(
+
+
+def sqlite_pragmas() -> dict[str, str | int]:
+    """Pragmas set on every new SQLite connection, in order (journal_mode must come first)."""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+if engine.dialect.name == "sqlite":
+    # WAL: czytelnicy nie blokują pisarza (i odwrotnie); busy_timeout zamiast natychmiastowego "database is locked".
+    event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+AsyncSessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
     bind=engine,
     autoflush=False,
-    autocommit=False,
     expire_on_commit=False,
-    future=True,
 )
 
-Base = declarative_base()
+# Zapytania geo/czasowe wybierają natywne indeksy Postgresa (GiST), a na SQLite – kolumny pomocnicze.
+IS_POSTGRES = engine.dialect.name == "postgresql"
 
-def get_session() -> Generator[Session, None, None]:
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+Base = declarative_base()
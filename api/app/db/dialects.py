@@ -0,0 +1,13 @@
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.db.database import IS_POSTGRES
+
+
+def insert(table):
+    """
+    Dialect-specific INSERT for the configured backend.
+
+    Both variants expose `on_conflict_do_update` / `on_conflict_do_nothing` and `.excluded` with the same
+    signature, so upserts are written once for SQLite and Postgres.
+    """
+    return postgresql.insert(table) if IS_POSTGRES else sqlite.insert(table)
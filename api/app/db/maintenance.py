@@ -0,0 +1,55 @@
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.db.database import engine
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteMaintenance:
+    """
+    Periodic housekeeping for a WAL-mode SQLite database.
+
+    `wal_checkpoint(PASSIVE)` copies committed pages back into the main file without waiting for
+    readers, so the -wal file does not grow unbounded between automatic checkpoints;
+    `PRAGMA optimize` refreshes planner statistics for tables whose shape changed.
+    """
+
+    def __init__(self, *, interval: float, enabled: bool = True) -> None:
+        self.interval = interval
+        self.enabled = enabled and interval > 0 and engine.dialect.name == "sqlite"
+        self._task: asyncio.Task | None = None
+
+    async def run_once(self) -> tuple[int, int, int] | None:
+        """Returns `(busy, wal_pages, checkpointed_pages)` from the checkpoint, or None on failure."""
+        try:
+            async with engine.connect() as conn:
+                result = (await conn.exec_driver_sql("PRAGMA wal_checkpoint(PASSIVE)")).one()
+                await conn.exec_driver_sql("PRAGMA optimize")
+        except Exception:
+            logger.exception("SQLite maintenance failed")
+            return None
+        return tuple(result)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self.run_once()
+
+
+sqlite_maintenance = SqliteMaintenance(interval=settings.SQLITE_MAINTENANCE_INTERVAL_SECONDS)
@@ -1,2 +1,5 @@
-from .event import Event
+from .event import Event, EventLine
 from app.db.models.report import Report
+from app.db.models.counter import RowCount, TableVersion
+from app.db.models.rollup import ReportRollupDaily, ReportRollupHourly
+from app.db.models.moderation import CachedVerdict
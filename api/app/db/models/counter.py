@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class RowCount(Base):
+    """Liczniki wierszy utrzymywane przyrostowo (np. 'reports' – liczba widocznych zgłoszeń)."""
+
+    __tablename__ = "row_counts"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class TableVersion(Base):
+    """Numer wersji tabeli zwiększany przy każdym zapisie – źródło ETag/Last-Modified dla list."""
+
+    __tablename__ = "table_versions"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
@@ -9,6 +9,7 @@ from sqlalchemy import (
     Float,
     Text,
     Boolean,
+    ForeignKey,
     Index,
 )
 from sqlalchemy.orm import Mapped, mapped_column
@@ -58,13 +59,20 @@ class Event(Base):
         nullable=False,
         index=True,
     )
+    # log2 długości w minutach (zob. app.utils.intervals) – ogranicza skan po starts_at w zapytaniach o okno czasowe.
+    duration_class: Mapped[int] = mapped_column(Integer, nullable=False)
 
     lat: Mapped[float] = mapped_column(Float, nullable=False)
     lng: Mapped[float] = mapped_column(Float, nullable=False)
     radius_m: Mapped[int] = mapped_column(Integer, nullable=False, default=300)
+    # Klasa zasięgu i komórka środka w siatce tej klasy (zob. app.utils.geo.reach_class) – prefiltr przestrzenny.
+    reach_class: Mapped[int] = mapped_column(Integer, nullable=False)
+    area: Mapped[int] = mapped_column(Integer, nullable=False)
     location_name: Mapped[str | None] = mapped_column(String(200), default=None)
 
     source: Mapped[str | None] = mapped_column(String(100), default=None)
+    # Id zdarzenia w źródle (feed przewoźnika, kalendarz miasta); (source, external_id) jest kluczem upsertu.
+    external_id: Mapped[str | None] = mapped_column(String(200), default=None)
     carrier: Mapped[str | None] = mapped_column(String(100), default=None)
     affected_lines: Mapped[str | None] = mapped_column(
         String(300), default=None
@@ -87,4 +95,36 @@ class Event(Base):
         Index("ix_events_time_window", "starts_at", "ends_at"),
         Index("ix_events_lat_lng", "lat", "lng"),
         Index("ix_events_type_start", "event_type", "starts_at"),
+        Index("uq_events_source_external_id", "source", "external_id", unique=True),
+        # Pokrywający: okno czasowe i warunek "punkt w promieniu zdarzenia" liczą się na samym indeksie.
+        Index(
+            "ix_events_duration_start_location",
+            "duration_class", "starts_at", "ends_at", "lat", "lng", "radius_m",
+        ),
+        # "Zdarzenia obejmujące punkt w oknie": dla każdej klasy zasięgu kilka komórek i zakres po ends_at.
+        Index("ix_events_reach_area_ends", "reach_class", "area", "ends_at", "starts_at"),
+    )
+
+
+class EventLine(Base):
+    """
+    Znormalizowane mapowanie zdarzenie -> linia (z `Event.affected_lines`), utrzymywane przy każdym zapisie zdarzenia.
+
+    Okno czasowe i przewoźnik są zdenormalizowane, żeby zapytanie "zdarzenia na linii 52" szło samym indeksem.
+    """
+
+    __tablename__ = "event_lines"
+
+    event_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True
+    )
+    line: Mapped[str] = mapped_column(String(50), primary_key=True)
+    carrier: Mapped[str | None] = mapped_column(String(100), default=None)
+    starts_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    ends_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # Alerty dotyczą bieżących i przyszłych zdarzeń – zakres po ends_at omija historię linii.
+        Index("ix_event_lines_line_ends", "line", "ends_at"),
+        Index("ix_event_lines_line_carrier_ends", "line", "carrier", "ends_at"),
     )
@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class CachedVerdict(Base):
+    """Werdykt moderacji LLM dla tekstu, identyfikowanego skrótem SHA-256 znormalizowanej treści."""
+
+    __tablename__ = "moderation_verdicts"
+
+    text_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    allowed: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,8 +1,9 @@
 import enum
-from sqlalchemy import Enum, String, Integer, Float, Text, DateTime, text
+from datetime import datetime, timezone
+from sqlalchemy import Enum, String, Integer, Float, Text, DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.database import Base
-from app.schemas.report import ReportType
+from app.schemas.report import ModerationStatus, ReportType
 
 class Report(Base):
     __tablename__ = "reports"
@@ -15,14 +16,33 @@ class Report(Base):
     )
     latitude: Mapped[float] = mapped_column(Float, nullable=False, index=True)
     longitude: Mapped[float] = mapped_column(Float, nullable=False, index=True)
+    # Komórka siatki (app.utils.geo.grid_cell) – indeksowany prefiltr zapytań przestrzennych.
+    geo_cell: Mapped[int] = mapped_column(Integer, nullable=False)
     name: Mapped[str | None] = mapped_column(String(128), nullable=True)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     photo_path: Mapped[str | None] = mapped_column(String(512), nullable=True)
     likes: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     confirmations: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     denials: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Z asynchroniczną moderacją zgłoszenie czeka jako PENDING; listy pokazują tylko APPROVED.
+    moderation_status: Mapped[ModerationStatus] = mapped_column(
+        Enum(ModerationStatus, name="moderation_status"),
+        nullable=False,
+        default=ModerationStatus.APPROVED,
+        server_default=ModerationStatus.APPROVED.name,
+        index=True,
+    )
     created_at: Mapped["DateTime"] = mapped_column(
         DateTime(timezone=True),
-        server_default=text("(datetime('now'))"),
+        # Wartość z Pythona ma ten sam format co parametry zapytań (z mikrosekundami),
+        # co jest potrzebne do porównań kursora (created_at, id).
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
         nullable=False,
     )
+
+    __table_args__ = (
+        Index("ix_reports_created_at_id", "created_at", "id"),
+        # Prefiltr przestrzenny; z typem, datą i statusem pokrywa też agregację klastrów mapy.
+        Index("ix_reports_geo_cell_type_created", "geo_cell", "type", "created_at", "moderation_status"),
+    )
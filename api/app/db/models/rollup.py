@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class _ReportRollup:
+    """Kolumny wspólne dla agregatów zgłoszeń: kubełek czasu x typ x obszar (app.repositories.rollup.AREA_GRID)."""
+
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    type: Mapped[str] = mapped_column(String(20), primary_key=True)
+    area: Mapped[int] = mapped_column(Integer, primary_key=True)
+    reports: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    likes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    confirmations: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    denials: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class ReportRollupHourly(_ReportRollup, Base):
+    __tablename__ = "report_rollups_hourly"
+
+    __table_args__ = (
+        Index("ix_report_rollups_hourly_area_bucket", "area", "bucket"),
+    )
+
+
+class ReportRollupDaily(_ReportRollup, Base):
+    __tablename__ = "report_rollups_daily"
+
+    __table_args__ = (
+        Index("ix_report_rollups_daily_area_bucket", "area", "bucket"),
+    )
@@ -1,10 +1,40 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .core.conditional import NotModified, not_modified_handler
+from .db.database import AsyncSessionLocal
+from .db.maintenance import sqlite_maintenance
+from .repositories.report import ReportRepository
 from .routers.v1.api import api_router
+from .services.live_index import live_index
+from .services.moderation_queue import moderation_queue
+from .services.vote_buffer import vote_aggregator
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if live_index.enabled:
+        async with AsyncSessionLocal() as session:
+            since = datetime.now(timezone.utc) - live_index.max_age
+            live_index.rebuild(await ReportRepository(session).list_created_since(since))
+    vote_aggregator.start()
+    sqlite_maintenance.start()
+    await moderation_queue.start()
+    yield
+    await moderation_queue.stop()
+    await vote_aggregator.stop()
+    await sqlite_maintenance.stop()
+
 
 app = FastAPI(
-    title="Travel Hi API", version="1.0.0", description="API for managing travels.", debug=True
+    title="Travel Hi API",
+    version="1.0.0",
+    description="API for managing travels.",
+    debug=True,
+    lifespan=lifespan,
 )
 
 origins = [
@@ -21,6 +51,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_exception_handler(NotModified, not_modified_handler)
+
 app.include_router(api_router, prefix="/api/v1")
 
 
@@ -1,12 +1,13 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import verify_password
 from app.db.models.user import User
 
 
-def authenticate_user(username: str, password: str, db: Session) -> User | None:
+async def authenticate_user(username: str, password: str, db: AsyncSession) -> User | None:
     """Authenticate a user with a username and password."""
-    user = db.query(User).filter(User.username == username).first()
+    user = (await db.execute(select(User).where(User.username == username))).scalars().first()
     if not user:
         return None
     if not verify_password(password, user.password_hash):  # sprawdzamy hash
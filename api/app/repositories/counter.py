@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.counter import RowCount, TableVersion
+
+REPORTS_TOTAL = "reports"
+
+
+async def adjust_counts(session: AsyncSession, names: list[str], delta: int) -> None:
+    """
+    Przesuwa liczniki o `delta` w bieżącej transakcji (bez commita) – wywołujący commituje
+    razem z insertem/deletem, którego licznik dotyczy.
+    """
+    for name in names:
+        res = await session.execute(
+            update(RowCount).where(RowCount.name == name).values(value=RowCount.value + delta)
+        )
+        if res.rowcount == 0:
+            session.add(RowCount(name=name, value=max(delta, 0)))
+
+
+async def get_count(session: AsyncSession, name: str) -> int | None:
+    return await session.scalar(select(RowCount.value).where(RowCount.name == name))
+
+
+async def bump_version(session: AsyncSession, name: str) -> None:
+    """Zwiększa wersję tabeli w bieżącej transakcji (bez commita), razem z zapisem, którego dotyczy."""
+    now = datetime.now(timezone.utc)
+    res = await session.execute(
+        update(TableVersion)
+        .where(TableVersion.name == name)
+        .values(version=TableVersion.version + 1, updated_at=now)
+    )
+    if res.rowcount == 0:
+        session.add(TableVersion(name=name, version=1, updated_at=now))
+
+
+async def get_versions(session: AsyncSession, names: list[str]) -> dict[str, tuple[int, datetime]]:
+    """Wersja i czas ostatniej zmiany dla podanych tabel; tabele bez zapisu pomijane."""
+    res = await session.execute(
+        select(TableVersion.name, TableVersion.version, TableVersion.updated_at).where(TableVersion.name.in_(names))
+    )
+    return {name: (version, updated_at) for name, version, updated_at in res.all()}
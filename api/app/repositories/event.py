@@ -1,19 +1,240 @@
+from collections.abc import AsyncIterator
 from datetime import date, datetime, timedelta, timezone
+from math import cos, radians
+from typing import Any
 
-from sqlalchemy import and_, select
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, func, insert, literal, literal_column, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models.event import Event, EventType, EventSeverity
+from app.db import dialects
+from app.db.database import IS_POSTGRES
+from app.db.models.event import Event, EventLine, EventType, EventSeverity
+from app.repositories.counter import bump_version
+from app.schemas.common import TotalMode
+from app.utils.counting import known_total, needs_count, store_total
+from app.utils.geo import (
+    MAX_CELL_RANGES,
+    METERS_PER_DEGREE,
+    REACH_CLASS_MAX,
+    max_reach_km,
+    radius_bbox,
+    reach_class,
+    reach_grid,
+)
+from app.utils.intervals import DURATION_CLASS_MAX, duration_class, max_duration
+from app.utils.transit import normalize_carrier, split_lines
 
 
-def _day_window(day: date, tz: timezone = timezone.utc) -> tuple[datetime, datetime]:
+async def _sync_lines(session: AsyncSession, events: list[tuple[int, dict[str, Any]]]) -> None:
+    """Przepisuje wiersze `event_lines` dla podanych (id, dane zdarzenia) w bieżącej transakcji."""
+    await session.execute(delete(EventLine).where(EventLine.event_id.in_([id_ for id_, _ in events])))
+    rows = [
+        {
+            "event_id": id_,
+            "line": line,
+            "carrier": normalize_carrier(data.get("carrier")),
+            "starts_at": data["starts_at"],
+            "ends_at": data["ends_at"],
+        }
+        for id_, data in events
+        for line in split_lines(data.get("affected_lines"))
+    ]
+    if rows:
+        await session.execute(insert(EventLine), rows)
+
+
+def _derived(data: dict[str, Any]) -> dict[str, int]:
+    """Kolumny wyliczane z danych zdarzenia: klasa długości oraz klasa zasięgu z komórką środka."""
+    class_ = reach_class(data["radius_m"])
+    return {
+        "duration_class": duration_class(data["starts_at"], data["ends_at"]),
+        "reach_class": class_,
+        "area": reach_grid(class_).key_of(data["lat"], data["lng"]),
+    }
+
+
+async def create_event(session: AsyncSession, data: dict[str, Any]) -> Event:
+    evt = Event(**data, **_derived(data))
+    session.add(evt)
+    await session.flush()
+    await _sync_lines(session, [(evt.id, data)])
+    await bump_version(session, Event.__tablename__)
+    await session.commit()
+    await session.refresh(evt)
+    return evt
+
+
+UPSERT_KEY = ("source", "external_id")
+
+
+def _last_per_key(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Ostatni wiersz dla każdego (source, external_id), w kolejności pierwszego wystąpienia. Dwa wiersze z tym
+    samym kluczem w jednym INSERT ... ON CONFLICT to błąd na Postgresie ("cannot affect row a second time"),
+    a na SQLite – powtórzone id i duplikaty w `event_lines`.
+    """
+    unique: dict[tuple[str, str] | int, dict[str, Any]] = {}
+    for no, row in enumerate(rows):
+        key = tuple(row.get(name) for name in UPSERT_KEY)
+        # NULL w kluczu nie koliduje z niczym – taki wiersz zawsze jest osobnym insertem.
+        unique[key if None not in key else no] = row
+    return list(unique.values())
+
+
+async def upsert_events(session: AsyncSession, rows: list[dict[str, Any]]) -> int:
+    """
+    Zapisuje partię zdarzeń jednym executemany w jednej transakcji.
+
+    Zdarzenie z tym samym (source, external_id) jest aktualizowane, więc ponowny import feedu jest idempotentny;
+    wiersze bez external_id są zawsze wstawiane. Powtórzony klucz w jednej partii wygrywa ostatni wiersz.
+    Wszystkie wiersze muszą mieć te same klucze.
+    """
+    if not rows:
+        return 0
+    params = [{**row, **_derived(row)} for row in _last_per_key(rows)]
+    stmt = dialects.insert(Event)
+    updated = {name: stmt.excluded[name] for name in params[0] if name not in UPSERT_KEY}
+    updated["updated_at"] = stmt.excluded.updated_at
+    stmt = stmt.on_conflict_do_update(index_elements=list(UPSERT_KEY), set_=updated).returning(
+        Event.id, sort_by_parameter_order=True
+    )
+    ids = (await session.execute(stmt, params)).scalars().all()
+    await _sync_lines(session, list(zip(ids, params, strict=True)))
+    await bump_version(session, Event.__tablename__)
+    await session.commit()
+    return len(rows)
+
+
+async def list_events_page(
+        session: AsyncSession,
+        *,
+        limit: int,
+        offset: int = 0,
+        total_mode: TotalMode = TotalMode.EXACT,
+) -> tuple[list[Event], int | None]:
+    stmt = select(Event).order_by(Event.id.asc()).limit(limit).offset(offset)
+    items = list((await session.execute(stmt)).scalars().all())
+
+    key = ("events",)
+    total = await known_total(total_mode, key)
+    if needs_count(total_mode, total):
+        total = store_total(key, int(await session.scalar(select(func.count()).select_from(Event))))
+    return items, total
+
+
+async def stream_events(session: AsyncSession, *, chunk_size: int = 500) -> AsyncIterator[list[Event]]:
+    """
+    Wszystkie zdarzenia (po id) w paczkach po `chunk_size` z kursora po stronie serwera –
+    w pamięci jest naraz tylko jedna paczka, niezależnie od wielkości tabeli.
+    """
+    stmt = select(Event).order_by(Event.id.asc()).execution_options(yield_per=chunk_size)
+    result = await session.stream_scalars(stmt)
+    try:
+        async for partition in result.partitions():
+            yield partition
+    finally:
+        await result.close()
+
+
+async def existing_window(session: AsyncSession, keys: list[tuple[str, str]]) -> tuple[datetime, datetime] | None:
+    """Najwcześniejszy początek i najpóźniejszy koniec zdarzeń o podanych (source, external_id) – przed nadpisaniem."""
+    if not keys:
+        return None
+    stmt = select(func.min(Event.starts_at), func.max(Event.ends_at)).where(
+        tuple_(Event.source, Event.external_id).in_(keys)
+    )
+    start, end = (await session.execute(stmt)).one()
+    return (start, end) if start is not None else None
+
+
+def _overlapping(window_start: datetime, window_end: datetime) -> list:
+    """
+    Zdarzenia, których przedział [starts_at, ends_at] nachodzi na okno.
+
+    Na SQLite sam warunek `starts_at <= koniec okna` skanowałby całą historię. Zamiast tego dla każdej
+    klasy długości szukamy w `ix_events_duration_start_location` tylko od `początek okna - max długość klasy`,
+    więc koszt zależy od liczby zdarzeń blisko okna, a nie od wieku bazy.
+    """
+    if IS_POSTGRES:
+        # Wyrażenie musi być identyczne z indeksem GiST ix_events_time_range_gist.
+        bounds = literal_column("'[]'")
+        return [
+            func.tstzrange(Event.starts_at, Event.ends_at, bounds).op("&&")(
+                func.tstzrange(
+                    literal(window_start, Event.starts_at.type), literal(window_end, Event.ends_at.type), bounds
+                )
+            )
+        ]
+    by_class = []
+    for class_ in range(DURATION_CLASS_MAX + 1):
+        longest = max_duration(class_)
+        starts = (
+            Event.starts_at.between(window_start - longest, window_end)
+            if longest is not None
+            else Event.starts_at <= window_end
+        )
+        by_class.append(and_(Event.duration_class == class_, starts))
+    return [or_(*by_class), Event.ends_at >= window_start]
+
+
+def _near_in_window(lat: float, lng: float, radius_m: float, window_start: datetime, window_end: datetime) -> list:
+    """
+    Prefiltr przestrzenno-czasowy po `ix_events_reach_area_ends` (oba dialekty): dla każdej klasy zasięgu
+    tylko komórki siatki tej klasy, w których może leżeć środek zdarzenia sięgającego punktu,
+    i zakres po ends_at.
+
+    Koszt zależy od liczby zdarzeń w pobliżu, które jeszcze się nie skończyły – nie od wszystkich zdarzeń
+    aktywnych na świecie ani od historii. Dokładny warunek odległości dokłada `_affecting`.
+    """
+    by_class = []
+    for class_ in range(REACH_CLASS_MAX + 1):
+        conditions = [Event.reach_class == class_, Event.ends_at >= window_start]
+        reach = max_reach_km(class_)
+        if reach is not None:
+            keys = reach_grid(class_).keys_for(radius_bbox(lat, lng, reach + radius_m / 1000))
+            # Przy biegunach pudełko obejmuje wszystkie długości – wtedy klasa idzie samym zakresem czasu.
+            if len(keys) <= MAX_CELL_RANGES:
+                conditions.append(Event.area.in_(keys))
+        by_class.append(and_(*conditions))
+    return [or_(*by_class), Event.starts_at <= window_end]
+
+
+def _affecting(lat: float, lng: float, radius_m: float) -> list:
+    """
+    Zdarzenia, których okrąg oddziaływania (lat, lng, radius_m) przecina okrąg o promieniu `radius_m` wokół punktu.
+
+    Odległość liczona jest w przybliżeniu równoodległościowym (błąd pomijalny na skali kilku km),
+    tylko dla kandydatów z `_near_in_window`; nie obsługuje przejścia przez antypołudnik.
+    """
+    dy = (Event.lat - lat) * METERS_PER_DEGREE
+    dx = (Event.lng - lng) * (METERS_PER_DEGREE * cos(radians(lat)))
+    reach = Event.radius_m + radius_m
+    return [dx * dx + dy * dy <= reach * reach]
+
+
+def _attribute_filters(
+        event_type: EventType | None,
+        severity: EventSeverity | None,
+        is_verified: bool | None,
+) -> list:
+    conditions: list = []
+    if event_type is not None:
+        conditions.append(Event.event_type == event_type)
+    if severity is not None:
+        conditions.append(Event.severity == severity)
+    if is_verified is not None:
+        conditions.append(Event.is_verified == is_verified)
+    return conditions
+
+
+def day_window(day: date, tz: timezone = timezone.utc) -> tuple[datetime, datetime]:
     start = datetime.combine(day, datetime.min.time(), tzinfo=tz)
     end = start + timedelta(days=1) - timedelta(microseconds=1)
     return start, end
 
 
-def list_events_between(
-        session: Session,
+async def list_events_between(
+        session: AsyncSession,
         window_start: datetime,
         window_end: datetime,
         *,
@@ -27,15 +248,9 @@ def list_events_between(
         raise ValueError("window_end must be >= window_start")
 
     conditions: list = [
-        Event.starts_at <= window_end,
-        Event.ends_at >= window_start,
+        *_overlapping(window_start, window_end),
+        *_attribute_filters(event_type, severity, is_verified),
     ]
-    if event_type is not None:
-        conditions.append(Event.event_type == event_type)
-    if severity is not None:
-        conditions.append(Event.severity == severity)
-    if is_verified is not None:
-        conditions.append(Event.is_verified == is_verified)
 
     stmt = (
         select(Event)
@@ -44,11 +259,78 @@ def list_events_between(
         .limit(limit)
         .offset(offset)
     )
-    return list(session.execute(stmt).scalars().all())
+    return list((await session.execute(stmt)).scalars().all())
+
+
+async def list_events_affecting(
+        session: AsyncSession,
+        lat: float,
+        lng: float,
+        window_start: datetime,
+        window_end: datetime,
+        *,
+        radius_m: float = 0,
+        event_type: EventType | None = None,
+        severity: EventSeverity | None = None,
+        is_verified: bool | None = None,
+        limit: int = 500,
+        offset: int = 0,
+) -> list[Event]:
+    """Zdarzenia aktywne w oknie czasowym, których obszar obejmuje punkt (lub nachodzi na okrąg `radius_m`)."""
+    if window_end < window_start:
+        raise ValueError("window_end must be >= window_start")
+
+    conditions: list = [
+        *_near_in_window(lat, lng, radius_m, window_start, window_end),
+        *_affecting(lat, lng, radius_m),
+        *_attribute_filters(event_type, severity, is_verified),
+    ]
+
+    stmt = (
+        select(Event)
+        .where(and_(*conditions))
+        .order_by(Event.starts_at.asc())
+        .limit(limit)
+        .offset(offset)
+    )
+    return list((await session.execute(stmt)).scalars().all())
 
 
-def list_events_on_day(
-        session: Session,
+async def list_events_for_line(
+        session: AsyncSession,
+        line: str,
+        window_start: datetime,
+        window_end: datetime,
+        *,
+        carrier: str | None = None,
+        limit: int = 500,
+        offset: int = 0,
+) -> list[Event]:
+    """Zdarzenia dotyczące linii (opcjonalnie u danego przewoźnika), aktywne w oknie czasowym."""
+    if window_end < window_start:
+        raise ValueError("window_end must be >= window_start")
+
+    conditions: list = [
+        EventLine.line == line.strip().upper(),
+        EventLine.ends_at >= window_start,
+        EventLine.starts_at <= window_end,
+    ]
+    if carrier is not None:
+        conditions.append(EventLine.carrier == normalize_carrier(carrier))
+
+    stmt = (
+        select(Event)
+        .join(EventLine, EventLine.event_id == Event.id)
+        .where(and_(*conditions))
+        .order_by(Event.starts_at.asc())
+        .limit(limit)
+        .offset(offset)
+    )
+    return list((await session.execute(stmt)).scalars().all())
+
+
+async def list_events_on_day(
+        session: AsyncSession,
         day: date,
         *,
         tz: timezone = timezone.utc,
@@ -58,8 +340,8 @@ def list_events_on_day(
         limit: int = 500,
         offset: int = 0,
 ) -> list[Event]:
-    day_start, day_end = _day_window(day, tz=tz)
-    return list_events_between(
+    day_start, day_end = day_window(day, tz=tz)
+    return await list_events_between(
         session,
         day_start,
         day_end,
@@ -71,8 +353,8 @@ def list_events_on_day(
     )
 
 
-def list_events_around(
-        session: Session,
+async def list_events_around(
+        session: AsyncSession,
         at: datetime,
         *,
         threshold_hours: int = 3,
@@ -87,23 +369,13 @@ def list_events_around(
 
     window_start = at - timedelta(hours=threshold_hours)
     window_end = at + timedelta(hours=threshold_hours)
-
-    conditions = [
-        Event.starts_at <= window_end,
-        Event.ends_at >= window_start,
-    ]
-    if event_type is not None:
-        conditions.append(Event.event_type == event_type)
-    if severity is not None:
-        conditions.append(Event.severity == severity)
-    if is_verified is not None:
-        conditions.append(Event.is_verified == is_verified)
-
-    stmt = (
-        select(Event)
-        .where(and_(*conditions))
-        .order_by(Event.starts_at.asc())
-        .limit(limit)
-        .offset(offset)
+    return await list_events_between(
+        session,
+        window_start,
+        window_end,
+        event_type=event_type,
+        severity=severity,
+        is_verified=is_verified,
+        limit=limit,
+        offset=offset,
     )
-    return list(session.execute(stmt).scalars().all())
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import dialects
+from app.db.models.moderation import CachedVerdict
+
+
+async def get_verdict(session: AsyncSession, text_hash: str, now: datetime) -> tuple[bool, datetime] | None:
+    """Niewygasły werdykt i czas jego wygaśnięcia albo None."""
+    row = (
+        await session.execute(
+            select(CachedVerdict.allowed, CachedVerdict.expires_at).where(
+                CachedVerdict.text_hash == text_hash, CachedVerdict.expires_at > now
+            )
+        )
+    ).one_or_none()
+    return (row.allowed, row.expires_at) if row is not None else None
+
+
+async def store_verdict(session: AsyncSession, text_hash: str, allowed: bool, expires_at: datetime) -> None:
+    stmt = dialects.insert(CachedVerdict).values(text_hash=text_hash, allowed=allowed, expires_at=expires_at)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CachedVerdict.text_hash],
+        set_={"allowed": stmt.excluded.allowed, "expires_at": stmt.excluded.expires_at},
+    )
+    await session.execute(stmt)
+    await session.commit()
+
+
+async def purge_expired(session: AsyncSession, now: datetime) -> int:
+    res = await session.execute(delete(CachedVerdict).where(CachedVerdict.expires_at <= now))
+    await session.commit()
+    return res.rowcount
@@ -1,14 +1,77 @@
-from math import radians, sin, cos, sqrt, atan2
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from datetime import datetime, timezone
+from math import pi
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, bindparam, select, func, or_, and_, update
+from app.db.database import IS_POSTGRES
 from app.db.models.report import Report, ReportType
+from app.schemas.report import ModerationStatus
+from app.utils.geo import (
+    GRID_COLS,
+    GRID_ROWS,
+    MAX_CELL_RANGES,
+    BBox,
+    ClusterGrid,
+    EARTH_RADIUS_KM,
+    cell_ranges,
+    grid_cell,
+    haversine_km,
+    radius_bbox,
+)
+from app.utils.pagination import Page, cursor_time, page_from
+from app.repositories.counter import REPORTS_TOTAL, adjust_counts, bump_version, get_count
+from app.repositories.rollup import add_to_rollups
+from app.schemas.common import TotalMode
+from app.utils.counting import count_cache, known_total, needs_count, store_total
+
+HALF_EARTH_CIRCUMFERENCE_KM = pi * EARTH_RADIUS_KM
+NEWEST_FIRST = (Report.created_at.desc(), Report.id.desc())
+_CANDIDATE_BATCH = 500
+# Klucz promienia ma współrzędne zaokrąglone do 1e-4° (~11 m) – z zapasem, żeby nie przeoczyć punktu na brzegu.
+_RADIUS_KEY_SLACK_KM = 0.02
+COUNTER_FIELDS = ("likes", "confirmations", "denials")
+# Listy, klastry, liczniki i głosy dotyczą tylko zgłoszeń zaakceptowanych przez moderację.
+VISIBLE = Report.moderation_status == ModerationStatus.APPROVED
+
+# Kolumny zwracane przez listy – wiersze Core mają te same atrybuty co `Report`, bez kosztu mapowania ORM.
+REPORT_COLUMNS = (
+    Report.id,
+    Report.type,
+    Report.name,
+    Report.description,
+    Report.latitude,
+    Report.longitude,
+    Report.photo_path,
+    Report.likes,
+    Report.confirmations,
+    Report.denials,
+    Report.created_at,
+)
+
+
+def since_bucket(since: datetime | None) -> int | None:
+    # "Ostatnie N minut" przesuwa się z każdym żądaniem – klucz cache zaokrąglamy do minuty.
+    return int(since.timestamp() // 60) if since is not None else None
+
+
+def invalidate_totals_at(lat: float, lng: float) -> int:
+    """Drops cached list totals whose area contains the point – call once a report there becomes visible."""
+
+    def contains(key) -> bool:
+        if key[0] == "bbox":
+            return key[1].contains(lat, lng)
+        if key[0] == "radius":
+            return haversine_km(key[1], key[2], lat, lng) <= key[3] + _RADIUS_KEY_SLACK_KM
+        return False
+
+    return count_cache.invalidate_where(contains)
 
 
 class ReportRepository:
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
-    def create(
+    async def create(
             self,
             *,
             type_: ReportType,
@@ -17,11 +80,16 @@ class ReportRepository:
             photo_path: str | None,
             name: str | None = None,
             description: str | None = None,
+            moderation_status: ModerationStatus = ModerationStatus.APPROVED,
     ) -> Report:
+        now = datetime.now(timezone.utc)
         obj = Report(
             type=type_,
             latitude=lat,
             longitude=lng,
+            geo_cell=grid_cell(lat, lng),
+            created_at=now,
+            moderation_status=moderation_status,
             photo_path=photo_path,
             name=name,
             description=description,
@@ -30,57 +98,325 @@ class ReportRepository:
             denials=0,
         )
         self.session.add(obj)
-        self.session.commit()
-        self.session.refresh(obj)
+        if moderation_status is ModerationStatus.APPROVED:
+            await self._count_visible(obj)
+        await bump_version(self.session, Report.__tablename__)
+        await self.session.commit()
+        await self.session.refresh(obj)
         return obj
 
-    def get(self, id_: int) -> Report | None:
-        res = self.session.execute(select(Report).where(Report.id == id_))
+    async def _count_visible(self, obj: Report) -> None:
+        """Liczniki i agregaty obejmują zgłoszenie od chwili, gdy staje się widoczne (w bieżącej transakcji)."""
+        await adjust_counts(self.session, [REPORTS_TOTAL], 1)
+        await add_to_rollups(self.session, obj.created_at, [(obj.type, obj.geo_cell, {"reports": 1})])
+
+    async def set_moderation_status(self, id_: int, status: ModerationStatus) -> Report | None:
+        """Werdykt dla zgłoszenia PENDING; None, gdy zgłoszenia nie ma albo werdykt już zapadł."""
+        stmt = (
+            update(Report)
+            .where(Report.id == id_, Report.moderation_status == ModerationStatus.PENDING)
+            .values(moderation_status=status)
+            .returning(Report)
+            .execution_options(populate_existing=True)
+        )
+        report = (await self.session.execute(stmt)).scalar_one_or_none()
+        if report is not None:
+            if status is ModerationStatus.APPROVED:
+                await self._count_visible(report)
+            await bump_version(self.session, Report.__tablename__)
+        await self.session.commit()
+        return report
+
+    async def pending_ids(self) -> list[int]:
+        q = select(Report.id).where(Report.moderation_status == ModerationStatus.PENDING).order_by(Report.id.asc())
+        return list((await self.session.execute(q)).scalars().all())
+
+    async def get(self, id_: int) -> Report | None:
+        res = await self.session.execute(select(Report).where(Report.id == id_))
         return res.scalar_one_or_none()
 
-    def list_in_radius(self, *, lat: float, lng: float, radius_km: float, skip: int, limit: int
-    ) -> tuple[list[Report], int]:
-        q = select(Report).order_by(Report.created_at.desc()).offset(skip).limit(limit)
-        res = self.session.execute(q)
-        items = list(res.scalars().all())
-        total = self.session.scalar(select(func.count()).select_from(Report))
-        return items, int(total)
-
-    # def list_in_radius(
-    #         self, *, lat: float, lng: float, radius_km: float, skip: int, limit: int
-    # ) -> tuple[list[Report], int]:
-    #     q = select(Report)
-    #     reports = list(self.session.execute(q).scalars().all())
-    #
-    #     def haversine(lat1, lng1, lat2, lng2):
-    #         R = 6371  # promień Ziemi w km
-    #         dlat = radians(lat2 - lat1)
-    #         dlng = radians(lng2 - lng1)
-    #         a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlng / 2) ** 2
-    #         c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    #         return R * c
-    #
-    #     filtered = [
-    #         r for r in reports
-    #         if haversine(lat, lng, r.latitude, r.longitude) <= radius_km
-    #     ]
-    #
-    #     total = len(filtered)
-    #     return filtered[skip: skip + limit], total
-
-    def increment_counter(self, id_: int, field: str) -> Report | None:
+    async def _get_many(self, ids: list[int]) -> list[Row]:
+        if not ids:
+            return []
+        res = await self.session.execute(select(*REPORT_COLUMNS).where(Report.id.in_(ids)))
+        by_id = {row.id: row for row in res.all()}
+        return [by_id[id_] for id_ in ids if id_ in by_id]
+
+    @staticmethod
+    def _bbox_conditions(bbox: BBox) -> list:
         """
-        Inkrementuje pole 'likes', 'confirmations' lub 'denials' dla danego zgłoszenia.
+        Warunki WHERE dla bounding boxa: na Postgresie `point <@ box` (indeks GiST),
+        na SQLite zakresy indeksowanej kolumny `geo_cell` (gdy jest ich niewiele) plus dokładne granice lat/lng.
         """
-        report = self.get(id_)
-        if not report:
-            return None
+        if bbox.is_global:
+            return []
+
+        if IS_POSTGRES:
+            # GiST na point(longitude, latitude) – zob. migracja 0a7d6e3f9b52.
+            location = func.point(Report.longitude, Report.latitude)
+            boxes = [
+                location.op("<@")(
+                    func.box(func.point(float(lo), float(bbox.min_lat)), func.point(float(hi), float(bbox.max_lat)))
+                )
+                for lo, hi in bbox.lng_intervals()
+            ]
+            return [or_(*boxes) if len(boxes) > 1 else boxes[0]]
 
-        if field not in {"likes", "confirmations", "denials"}:
+        lng_conditions = [Report.longitude.between(lo, hi) for lo, hi in bbox.lng_intervals()]
+        conditions: list = [
+            Report.latitude.between(bbox.min_lat, bbox.max_lat),
+            or_(*lng_conditions) if len(lng_conditions) > 1 else lng_conditions[0],
+        ]
+
+        ranges = cell_ranges(bbox)
+        if ranges is not None:
+            conditions.append(or_(*(Report.geo_cell.between(lo, hi) for lo, hi in ranges)))
+        return conditions
+
+    @staticmethod
+    def _cluster_conditions(grid: ClusterGrid, rows: range, col_spans: list[tuple[int, int]]) -> list:
+        """
+        Warunki wyłącznie na `geo_cell` obejmujące całe klastry z `rows` x `col_spans` – bez lat/lng,
+        więc agregacja idzie samym indeksem (geo_cell, type, created_at).
+        """
+        f = grid.factor
+        row_lo, row_hi = rows.start * f, min(rows.stop * f, GRID_ROWS) - 1
+        spans = [(lo * f, min((hi + 1) * f, GRID_COLS) - 1) for lo, hi in col_spans]
+        if (row_hi - row_lo + 1) * len(spans) <= MAX_CELL_RANGES:
+            return [or_(*(
+                Report.geo_cell.between(row * GRID_COLS + lo, row * GRID_COLS + hi)
+                for row in range(row_lo, row_hi + 1)
+                for lo, hi in spans
+            ))]
+        # Pas pełnych wierszy siatki jednym zakresem, kolumny liczone z geo_cell na wpisach indeksu.
+        conditions: list = [Report.geo_cell.between(row_lo * GRID_COLS, (row_hi + 1) * GRID_COLS - 1)]
+        if not any(lo == 0 and hi == GRID_COLS - 1 for lo, hi in spans):
+            col = Report.geo_cell % GRID_COLS
+            conditions.append(or_(*(col.between(lo, hi) for lo, hi in spans)))
+        return conditions
+
+    @staticmethod
+    def _cluster_key(grid: ClusterGrid):
+        return (Report.geo_cell // GRID_COLS // grid.factor) * grid.cols + (Report.geo_cell % GRID_COLS) // grid.factor
+
+    async def cluster_counts(
+            self,
+            grid: ClusterGrid,
+            rows: range,
+            col_spans: list[tuple[int, int]],
+            since: datetime | None = None,
+    ) -> list[Row]:
+        """Per (klaster, typ): liczba zgłoszeń i średni wiersz/kolumna siatki (do środka ciężkości)."""
+        key = self._cluster_key(grid).label("cluster")
+        q = (
+            select(
+                key,
+                Report.type,
+                func.count().label("count"),
+                func.avg(Report.geo_cell // GRID_COLS).label("row"),
+                func.avg(Report.geo_cell % GRID_COLS).label("col"),
+            )
+            .where(*self._cluster_conditions(grid, rows, col_spans), *self._time_conditions(since, None), VISIBLE)
+            .group_by(key, Report.type)
+        )
+        return list((await self.session.execute(q)).all())
+
+    async def cluster_points(
+            self,
+            grid: ClusterGrid,
+            rows: range,
+            col_spans: list[tuple[int, int]],
+            keys: list[int],
+            since: datetime | None = None,
+    ) -> list[Row]:
+        """Pojedyncze zgłoszenia (id, typ, położenie) z podanych klastrów."""
+        if not keys:
+            return []
+        key = self._cluster_key(grid)
+        q = select(key.label("cluster"), Report.id, Report.type, Report.latitude, Report.longitude).where(
+            *self._cluster_conditions(grid, rows, col_spans),
+            *self._time_conditions(since, None),
+            VISIBLE,
+            key.in_(keys),
+        )
+        return list((await self.session.execute(q)).all())
+
+    async def list_created_since(self, since: datetime) -> list[Report]:
+        q = select(Report).where(Report.created_at >= since, VISIBLE).order_by(Report.created_at.asc())
+        return list((await self.session.execute(q)).scalars().all())
+
+    @staticmethod
+    def _time_conditions(since: datetime | None, cursor: tuple[datetime, int] | None) -> list:
+        conditions: list = []
+        if since is not None:
+            conditions.append(Report.created_at >= since)
+        if cursor is not None:
+            created_at, id_ = cursor
+            # Kursor jest naiwny w UTC; ze strefą pasuje do timestamptz na Postgresie, a SQLite i tak ją pomija.
+            created_at = cursor_time(created_at).replace(tzinfo=timezone.utc)
+            conditions.append(
+                or_(Report.created_at < created_at, and_(Report.created_at == created_at, Report.id < id_))
+            )
+        return conditions
+
+    async def list_in_bbox(
+            self,
+            *,
+            bbox: BBox,
+            skip: int,
+            limit: int,
+            since: datetime | None = None,
+            cursor: tuple[datetime, int] | None = None,
+            total_mode: TotalMode = TotalMode.EXACT,
+    ) -> Page[Row]:
+        filters = self._bbox_conditions(bbox) + self._time_conditions(since, None)
+        q = (
+            select(*REPORT_COLUMNS)
+            .where(VISIBLE, *filters, *self._time_conditions(None, cursor))
+            .order_by(*NEWEST_FIRST)
+            .offset(skip)
+            .limit(limit + 1)
+        )
+        items = list((await self.session.execute(q)).all())
+
+        key = ("bbox", bbox, since_bucket(since))
+        counter = (lambda: get_count(self.session, REPORTS_TOTAL)) if not filters else None
+        total = await known_total(total_mode, key, counter)
+        if needs_count(total_mode, total):
+            count_q = select(func.count()).select_from(Report).where(VISIBLE, *filters)
+            total = store_total(key, int(await self.session.scalar(count_q)))
+        return page_from(items, limit, total)
+
+    async def list_in_radius(
+            self,
+            *,
+            lat: float,
+            lng: float,
+            radius_km: float,
+            skip: int,
+            limit: int,
+            since: datetime | None = None,
+            cursor: tuple[datetime, int] | None = None,
+            total_mode: TotalMode = TotalMode.EXACT,
+    ) -> Page[Row]:
+        """
+        Zgłoszenia w promieniu `radius_km` od punktu, od najnowszych.
+
+        SQL zawęża kandydatów po bounding boxie (indeks `geo_cell`), a dokładny warunek
+        haversine liczony jest tylko dla kandydatów, na samych kolumnach (id, lat, lng).
+        Gdy total nie jest potrzebny (lub jest znany z cache), kandydaci są czytani tylko do zapełnienia strony.
+        """
+        bbox = radius_bbox(lat, lng, radius_km)
+        if bbox.is_global and radius_km >= HALF_EARTH_CIRCUMFERENCE_KM:
+            return await self.list_in_bbox(
+                bbox=bbox, skip=skip, limit=limit, since=since, cursor=cursor, total_mode=total_mode
+            )
+
+        def candidates(*conditions):
+            return (
+                select(Report.id, Report.created_at, Report.latitude, Report.longitude)
+                .where(VISIBLE, *self._bbox_conditions(bbox), *self._time_conditions(since, None), *conditions)
+                .order_by(*NEWEST_FIRST)
+                .execution_options(yield_per=_CANDIDATE_BATCH)
+            )
+
+        def in_radius(row) -> bool:
+            return haversine_km(lat, lng, row.latitude, row.longitude) <= radius_km
+
+        key = ("radius", round(lat, 4), round(lng, 4), radius_km, since_bucket(since))
+        total = await known_total(total_mode, key)
+        if needs_count(total_mode, total):
+            # Liczenie i tak przechodzi przez wszystkich kandydatów – stronę wycinamy z tej samej listy.
+            rows = await self._scan(candidates(), in_radius)
+            total = store_total(key, len(rows))
+            if cursor is not None:
+                rows = [row for row in rows if (cursor_time(row.created_at), row.id) < cursor]
+            rows = rows[skip: skip + limit + 1]
+        else:
+            rows = await self._scan(
+                candidates(*self._time_conditions(None, cursor)), in_radius, skip=skip, count=limit + 1
+            )
+
+        return page_from(await self._get_many([row.id for row in rows]), limit, total)
+
+    async def _scan(self, q, predicate, *, skip: int = 0, count: int | None = None) -> list:
+        """
+        Strumieniowo czyta wynik `q` i zwraca wiersze spełniające `predicate` (z pominięciem `skip`);
+        z `count` przerywa odczyt, gdy ma ich dość.
+        """
+        result = await self.session.stream(q)
+        rows: list = []
+        try:
+            async for row in result:
+                if not predicate(row):
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                rows.append(row)
+                if count is not None and len(rows) >= count:
+                    break
+        finally:
+            await result.close()
+        return rows
+
+    async def increment_counter(self, id_: int, field: str, by: int = 1) -> Report | None:
+        """
+        Inkrementuje pole 'likes', 'confirmations' lub 'denials' dla danego zgłoszenia
+        jednym atomowym `UPDATE ... SET pole = pole + 1 RETURNING`.
+        """
+        if field not in COUNTER_FIELDS:
             raise ValueError(f"Invalid counter field: {field}")
 
-        current_value = getattr(report, field, 0)
-        setattr(report, field, current_value + 1)
-        self.session.commit()
-        self.session.refresh(report)
+        column = getattr(Report, field)
+        stmt = (
+            update(Report)
+            .where(Report.id == id_, VISIBLE)
+            .values({column: column + by})
+            .returning(Report)
+            .execution_options(populate_existing=True)
+        )
+        report = (await self.session.execute(stmt)).scalar_one_or_none()
+        if report is not None:
+            # Bez bump_version – wiersz wersji tabeli szeregowałby wszystkie głosy; wersję podbija
+            # `VoteAggregator` raz na interwał (`touch`).
+            await add_to_rollups(
+                self.session, datetime.now(timezone.utc), [(report.type, report.geo_cell, {field: by})]
+            )
+        await self.session.commit()
         return report
+
+    async def apply_counter_deltas(self, deltas: dict[int, dict[str, int]]) -> None:
+        """
+        Zapisuje zbuforowane przyrosty liczników: jeden executemany w jednej transakcji.
+        Agregaty głosów trafiają do kubełka chwili zapisu (opóźnionej o co najwyżej interwał bufora).
+        """
+        if not deltas:
+            return
+        table = Report.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values({field: table.c[field] + bindparam(f"b_{field}") for field in COUNTER_FIELDS})
+        )
+        params = [
+            {"b_id": id_, **{f"b_{field}": counts.get(field, 0) for field in COUNTER_FIELDS}}
+            for id_, counts in deltas.items()
+        ]
+        await self.session.execute(stmt, params)
+
+        located = await self.session.execute(
+            select(Report.id, Report.type, Report.geo_cell).where(Report.id.in_(list(deltas)))
+        )
+        await add_to_rollups(
+            self.session,
+            datetime.now(timezone.utc),
+            [(type_, geo_cell, deltas[id_]) for id_, type_, geo_cell in located.all()],
+        )
+        await bump_version(self.session, Report.__tablename__)
+        await self.session.commit()
+
+    async def bump_list_version(self) -> None:
+        """Podbija wersję tabeli reports (ETag list) po głosach zapisanych bez bufora."""
+        await bump_version(self.session, Report.__tablename__)
+        await self.session.commit()
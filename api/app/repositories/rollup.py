@@ -0,0 +1,110 @@
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Row, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import dialects
+from app.db.models.rollup import ReportRollupDaily, ReportRollupHourly
+from app.schemas.report import ReportType, RollupGranularity
+from app.utils.geo import MAX_CELL_RANGES, BBox, ClusterGrid
+
+# Obszar agregatów: kwadrat ROLLUP_AREA_FACTOR x ROLLUP_AREA_FACTOR komórek geo_cell (domyślnie 0.5°).
+AREA_GRID = ClusterGrid(settings.ROLLUP_AREA_FACTOR)
+ROLLUP_FIELDS = ("reports", "likes", "confirmations", "denials")
+
+_MODELS = {RollupGranularity.HOUR: ReportRollupHourly, RollupGranularity.DAY: ReportRollupDaily}
+
+
+def bucket_start(at: datetime, granularity: RollupGranularity) -> datetime:
+    """Początek kubełka (godziny albo doby UTC) zawierającego `at`."""
+    at = at.replace(tzinfo=timezone.utc) if at.tzinfo is None else at.astimezone(timezone.utc)
+    if granularity is RollupGranularity.DAY:
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+def bucket_step(granularity: RollupGranularity) -> timedelta:
+    return timedelta(days=1) if granularity is RollupGranularity.DAY else timedelta(hours=1)
+
+
+async def add_to_rollups(
+        session: AsyncSession,
+        at: datetime,
+        deltas: Iterable[tuple[ReportType | str, int, dict[str, int]]],
+) -> None:
+    """
+    Dodaje przyrosty (typ, geo_cell, {pole: delta}) do kubełka godzinowego i dziennego `at`
+    w bieżącej transakcji (bez commita) – jeden upsert executemany na tabelę.
+    """
+    merged: defaultdict[tuple[str, int], defaultdict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for type_, geo_cell, counts in deltas:
+        key = (ReportType(type_).value, AREA_GRID.key_of_cell(geo_cell))
+        for field, value in counts.items():
+            merged[key][field] += value
+    if not merged:
+        return
+
+    for granularity, model in _MODELS.items():
+        bucket = bucket_start(at, granularity)
+        stmt = dialects.insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["bucket", "type", "area"],
+            set_={field: getattr(model, field) + stmt.excluded[field] for field in ROLLUP_FIELDS},
+        )
+        await session.execute(
+            stmt,
+            [
+                {"bucket": bucket, "type": type_, "area": area, **{f: counts.get(f, 0) for f in ROLLUP_FIELDS}}
+                for (type_, area), counts in merged.items()
+            ],
+        )
+
+
+def _area_conditions(model, bbox: BBox) -> list:
+    """Obszary przecinające `bbox` – zakresy klucza obszaru per wiersz siatki albo pas wierszy + kolumny."""
+    if bbox.is_global:
+        return []
+    rows, spans = AREA_GRID.rows_for(bbox), AREA_GRID.col_spans_for(bbox)
+    cols = AREA_GRID.cols
+    if len(rows) * len(spans) <= MAX_CELL_RANGES:
+        return [or_(*(model.area.between(row * cols + lo, row * cols + hi) for row in rows for lo, hi in spans))]
+    return [
+        model.area.between(rows.start * cols, rows.stop * cols - 1),
+        or_(*((model.area % cols).between(lo, hi) for lo, hi in spans)),
+    ]
+
+
+async def rollup_series(
+        session: AsyncSession,
+        granularity: RollupGranularity,
+        start: datetime,
+        end: datetime,
+        *,
+        type_: ReportType | None = None,
+        bbox: BBox | None = None,
+        by_area: bool = False,
+) -> list[Row]:
+    """
+    Sumy z tabeli agregatów dla kubełków z [start, end] – per (kubełek, typ[, obszar]).
+
+    Zakres czasu to zakres klucza głównego (bucket, type, area), a przy filtrze obszaru indeks (area, bucket),
+    więc koszt zależy od liczby kubełków w odpowiedzi, a nie od liczby zgłoszeń.
+    """
+    model = _MODELS[granularity]
+    keys = [model.bucket, model.type, *([model.area] if by_area else [])]
+    conditions: list = [model.bucket.between(bucket_start(start, granularity), bucket_start(end, granularity))]
+    if type_ is not None:
+        conditions.append(model.type == type_.value)
+    if bbox is not None:
+        conditions.extend(_area_conditions(model, bbox))
+
+    q = (
+        select(*keys, *(func.sum(getattr(model, field)).label(field) for field in ROLLUP_FIELDS))
+        .where(*conditions)
+        .group_by(*keys)
+        .order_by(*keys)
+    )
+    return list((await session.execute(q)).all())
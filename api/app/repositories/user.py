@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import EmailStr
 
 from app.core.rbac import get_permissions_for_role
@@ -7,17 +8,17 @@ from app.db.models.user import User, Role
 from app.schemas.user import UserCreate, UserUpdate, Permission
 
 
-def get_user_by_username(username: str, db: Session) -> User | None:
-    """Get a user by username from SQL (sync)."""
-    return db.query(User).filter(User.username == username).first()
+async def get_user_by_username(username: str, db: AsyncSession) -> User | None:
+    """Get a user by username from SQL."""
+    return (await db.execute(select(User).where(User.username == username))).scalars().first()
 
 
-def get_user_by_email(email: EmailStr, db: Session) -> User | None:
-    """Get a user by email from SQL (sync)."""
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(email: EmailStr, db: AsyncSession) -> User | None:
+    """Get a user by email from SQL."""
+    return (await db.execute(select(User).where(User.email == email))).scalars().first()
 
 
-def create_user(user: UserCreate, db: Session) -> User:
+async def create_user(user: UserCreate, db: AsyncSession) -> User:
     """Create a new user in SQLite."""
     user_dict = user.model_dump()
     user_dict["password_hash"] = get_password_hash(user_dict["password"])
@@ -32,31 +33,31 @@ def create_user(user: UserCreate, db: Session) -> User:
     new_user = User(**user_dict)
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return new_user
 
 
-def get_user_by_id(user_id: int, db: Session) -> User | None:
-    """Get a user by id from SQL (sync)."""
-    return db.query(User).filter(User.id == user_id).first()
+async def get_user_by_id(user_id: int, db: AsyncSession) -> User | None:
+    """Get a user by id from SQL."""
+    return (await db.execute(select(User).where(User.id == user_id))).scalars().first()
 
 
-def update_user(user_id: int, user_update: UserUpdate, db: Session) -> User | None:
+async def update_user(user_id: int, user_update: UserUpdate, db: AsyncSession) -> User | None:
     """Update a user in SQLite"""
-    user = get_user_by_id(user_id, db)
+    user = await get_user_by_id(user_id, db)
     if not user:
         return None
 
     if user_update.username is not None and user_update.username != user.username:
-        existing_user = get_user_by_username(user_update.username, db)
+        existing_user = await get_user_by_username(user_update.username, db)
         if existing_user and existing_user.id != user_id:
             raise ValueError("Username already exists")
         user.username = user_update.username
 
     if user_update.email is not None and user_update.email != user.email:
-        existing_email = get_user_by_email(user_update.email, db)
+        existing_email = await get_user_by_email(user_update.email, db)
         if existing_email and existing_email.id != user_id:
             raise ValueError("Email already exists.")
         user.email = user_update.email
@@ -65,20 +66,20 @@ def update_user(user_id: int, user_update: UserUpdate, db: Session) -> User | No
         user.password_hash = get_password_hash(user_update.password)
 
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     return user
 
 
-def get_all_users(db: Session, skip: int = 0, limit: int = 100) -> list[User]:
+async def get_all_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[User]:
     """Get all users (for admin purposes)"""
-    return db.query(User).offset(skip).limit(limit).all()
+    return list((await db.execute(select(User).offset(skip).limit(limit))).scalars().all())
 
 
-def update_user_role(user_id: int, role: Role, db: Session) -> User | None:
+async def update_user_role(user_id: int, role: Role, db: AsyncSession) -> User | None:
     """Update a user's role"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await get_user_by_id(user_id, db)
     if not user:
         return None
 
@@ -86,26 +87,26 @@ def update_user_role(user_id: int, role: Role, db: Session) -> User | None:
 
     user.role = role
     user.permissions = permissions
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     return user
 
 
-def update_user_status(user_id: int, disabled: bool, db: Session) -> bool:
+async def update_user_status(user_id: int, disabled: bool, db: AsyncSession) -> bool:
     """Update a user's disabled status"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await get_user_by_id(user_id, db)
     if not user:
         return False
 
     user.disabled = disabled
-    db.commit()
+    await db.commit()
     return True
 
 
-def add_user_permission(user_id: int, permission: Permission, db: Session) -> User | None:
+async def add_user_permission(user_id: int, permission: Permission, db: AsyncSession) -> User | None:
     """Add a permission to a user"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await get_user_by_id(user_id, db)
     if not user:
         return None
 
@@ -113,15 +114,15 @@ def add_user_permission(user_id: int, permission: Permission, db: Session) -> Us
     if permission not in current_permissions:
         current_permissions.append(permission)
         user.permissions = current_permissions
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
 
     return user
 
 
-def remove_user_permission(user_id: int, permission: Permission, db: Session) -> User | None:
+async def remove_user_permission(user_id: int, permission: Permission, db: AsyncSession) -> User | None:
     """Remove a permission from a user"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await get_user_by_id(user_id, db)
     if not user:
         return None
 
@@ -130,24 +131,24 @@ def remove_user_permission(user_id: int, permission: Permission, db: Session) ->
     if permission in current_permissions:
         current_permissions.remove(perm_value)
         user.permissions = list(current_permissions)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
 
     return user
 
 
-def delete_user(user_id: int, db: Session) -> bool:
+async def delete_user(user_id: int, db: AsyncSession) -> bool:
     """Delete a user and their widgets"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await get_user_by_id(user_id, db)
     if not user:
         return False
 
     if user.role == Role.ADMIN:
-        admin_count = db.query(User).filter(User.role == Role.ADMIN).count()
+        admin_count = await db.scalar(select(func.count()).select_from(User).where(User.role == Role.ADMIN))
         if admin_count <= 1:
             return False
 
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
 
     return True
\ No newline at end of file
@@ -4,6 +4,7 @@ from app.routers.v1.endpoints import event, ws, disruptions
 from app.routers.v1.endpoints import report
 from app.routers.v1.endpoints import auth
 from app.routers.v1.endpoints import user
+from app.routers.v1.endpoints import metrics
 
 api_router = APIRouter()
 
@@ -11,6 +12,7 @@ api_router.include_router(event.router, prefix="/events", tags=["Events"])
 api_router.include_router(report.router, prefix="", tags=["reports"])
 api_router.include_router(auth.router, prefix="/token", tags=["authentication"])
 api_router.include_router(user.router, prefix="/users", tags=["users"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 
 api_router.include_router(ws.router, prefix="/ws", tags=["Websocket"])
 api_router.include_router(disruptions.router, prefix="/disruptions", tags=["AI"])
@@ -1,9 +1,8 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 
+from app.core.dependencies import DbSession
 from app.core.security import create_access_token
-from app.db.database import get_session
 from app.repositories.auth import authenticate_user
 from app.schemas.token import Token
 
@@ -15,10 +14,10 @@ router = APIRouter()
     response_model=Token
 )
 async def login_for_access_token(
+        db: DbSession,
         form_data: OAuth2PasswordRequestForm = Depends(),
-        db: Session = Depends(get_session)
 ):
-    user = authenticate_user(form_data.username, form_data.password, db)
+    user = await authenticate_user(form_data.username, form_data.password, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -3,7 +3,7 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException, status
 
 from app.schemas.traffic import TrafficReport, DisruptionPrediction
-from app.utils.llm import assess_disruption
+from app.services.disruption_cache import predict_disruption as cached_prediction
 
 
 router = APIRouter(prefix="/disruptions", tags=["AI"])
@@ -13,8 +13,8 @@ router = APIRouter(prefix="/disruptions", tags=["AI"])
     response_model=Optional[DisruptionPrediction],
     status_code=status.HTTP_200_OK,
 )
-def predict_disruption(report: TrafficReport) -> Optional[DisruptionPrediction]:
+async def predict_disruption(report: TrafficReport) -> Optional[DisruptionPrediction]:
     try:
-        return assess_disruption(report)
+        return await cached_prediction(report)
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"LLM error: {e}")
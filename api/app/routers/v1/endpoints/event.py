@@ -1,41 +1,129 @@
-from app.db.models import Event
 from app.db.models.event import EventType, EventSeverity
-from app.schemas.event import EventCreate, EventRead
+from app.schemas.common import PaginatedResponse, TotalMode
+from app.schemas.event import EventCreate, EventImportResult, EventRead, EventStreamFormat
 from datetime import date, timezone, datetime
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 
-from app.db.database import get_session
-from app.repositories.event import list_events_on_day, list_events_around
+from app.core.dependencies import DbSession
+from app.core.conditional import table_validators
+from app.core.config import settings
+from app.db.models.event import Event
+from app.db.database import AsyncSessionLocal
+from app.services.event_cache import events_around, events_on_day, invalidate_window
+from app.services.event_import import ImportFormat, import_events
+from app.repositories.event import (
+    create_event as create_event_row,
+    list_events_affecting,
+    list_events_for_line,
+    list_events_page,
+    stream_events,
+)
 from app.schemas.event import EventRead
 
 router = APIRouter(prefix="")
 
+_STREAM_CHUNK = 500
+_event_json = TypeAdapter(EventRead)
+_event_list_json = TypeAdapter(list[EventRead])
+# ETag/Last-Modified z wersji tabeli events (304 dla niezmienionych list).
+event_validators = table_validators(Event.__tablename__)
+
 
 @router.post("/", response_model=EventRead)
-def create_event(payload: EventCreate, db: Session = Depends(get_session)):
-    evt = Event(**payload.model_dump())
-    db.add(evt)
-    db.commit()
-    db.refresh(evt)
+async def create_event(payload: EventCreate, db: DbSession):
+    evt = await create_event_row(db, payload.model_dump())
+    invalidate_window(evt.starts_at, evt.ends_at)
     return evt
 
 
+@router.post("/bulk", response_model=EventImportResult)
+async def import_events_bulk(
+        request: Request,
+        db: DbSession,
+        format: ImportFormat | None = Query(None, description="ndjson | csv; domyślnie według Content-Type"),
+        batch_size: int = Query(settings.EVENT_IMPORT_BATCH_SIZE, ge=1, le=10_000),
+):
+    """
+    Import wielu zdarzeń z body przesyłanego strumieniowo (NDJSON: jeden obiekt na linię, CSV: nagłówek z nazwami pól).
+    Rekordy z istniejącym (source, external_id) aktualizują zdarzenie.
+    """
+    fmt = format or ImportFormat.from_content_type(request.headers.get("content-type"))
+    try:
+        return await import_events(db, request.stream(), fmt, batch_size=batch_size)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be UTF-8 encoded.")
+
+
+def _query_window(starts_at: datetime, ends_at: datetime | None) -> tuple[datetime, datetime]:
+    """Okno z parametrów zapytania: naiwne daty jako UTC, brak końca = jedna chwila."""
+    if starts_at.tzinfo is None:
+        starts_at = starts_at.replace(tzinfo=timezone.utc)
+    if ends_at is None:
+        ends_at = starts_at
+    elif ends_at.tzinfo is None:
+        ends_at = ends_at.replace(tzinfo=timezone.utc)
+    if ends_at < starts_at:
+        raise HTTPException(status_code=422, detail="ends_at must be >= starts_at.")
+    return starts_at, ends_at
+
+
+async def _stream_event_list(fmt: EventStreamFormat):
+    # Własna sesja: zależność DbSession zamyka się, zanim odpowiedź zacznie być wysyłana.
+    async with AsyncSessionLocal() as session:
+        first = True
+        if fmt is EventStreamFormat.JSON:
+            yield b"["
+        async for partition in stream_events(session, chunk_size=_STREAM_CHUNK):
+            items = _event_list_json.validate_python(partition, from_attributes=True)
+            if fmt is EventStreamFormat.NDJSON:
+                yield b"".join(_event_json.dump_json(item) + b"\n" for item in items)
+                continue
+            # Tablica paczki bez nawiasów – cała odpowiedź to jedna tablica JSON.
+            chunk = _event_list_json.dump_json(items)[1:-1]
+            yield chunk if first else b"," + chunk
+            first = False
+        if fmt is EventStreamFormat.JSON:
+            yield b"]"
+
+
 @router.get("/", response_model=list[EventRead])
-def list_events(db: Session = Depends(get_session)):
-    return db.query(Event).all()
+async def list_events(
+        format: EventStreamFormat = Query(
+            EventStreamFormat.JSON, description="json (tablica) | ndjson (obiekt na linię)"
+        ),
+        validators: dict[str, str] = Depends(event_validators),
+):
+    """Wszystkie zdarzenia, wysyłane strumieniowo paczkami z kursora – pamięć nie rośnie z rozmiarem tabeli."""
+    media_type = "application/x-ndjson" if format is EventStreamFormat.NDJSON else "application/json"
+    return StreamingResponse(_stream_event_list(format), media_type=media_type, headers=validators)
 
 
-@router.get("/by-day", response_model=list[EventRead])
-def events_by_day(
+@router.get("/page", response_model=PaginatedResponse[EventRead], dependencies=[Depends(event_validators)])
+async def list_events_paginated(
+        session: DbSession,
+        limit: int = Query(100, ge=1, le=1000),
+        offset: int = Query(0, ge=0),
+        include_total: TotalMode = Query(TotalMode.APPROX, description="false | approx | exact"),
+):
+    items, total = await list_events_page(session, limit=limit, offset=offset, total_mode=include_total)
+    return PaginatedResponse[EventRead].create(
+        data=[EventRead.model_validate(evt) for evt in items], total=total, limit=limit, offset=offset
+    )
+
+
+@router.get("/by-day", response_model=list[EventRead], dependencies=[Depends(event_validators)])
+async def events_by_day(
+        session: DbSession,
         day: date = Query(..., description="YYYY-MM-DD"),
-        session: Session = Depends(get_session),
 ):
-    return list_events_on_day(session, day, tz=timezone.utc)
+    return await events_on_day(session, day, tz=timezone.utc)
 
 
-@router.get("/around", response_model=list[EventRead])
-def events_around_time(
+@router.get("/around", response_model=list[EventRead], dependencies=[Depends(event_validators)])
+async def events_around_time(
+        session: DbSession,
         at: datetime = Query(..., description="Czas odniesienia (ISO 8601, np. 2025-10-04T12:00:00Z)"),
         threshold_hours: int = Query(3, ge=1, le=24, description="Okno w godzinach po obu stronach (±)"),
         event_type: EventType | None = Query(None),
@@ -43,9 +131,8 @@ def events_around_time(
         is_verified: bool | None = Query(None),
         limit: int = Query(200, ge=1, le=1000),
         offset: int = Query(0, ge=0),
-        session: Session = Depends(get_session),
 ):
-    return list_events_around(
+    return await events_around(
         session,
         at,
         threshold_hours=threshold_hours,
@@ -55,3 +142,51 @@ def events_around_time(
         limit=limit,
         offset=offset,
     )
+
+
+@router.get("/affecting", response_model=list[EventRead], dependencies=[Depends(event_validators)])
+async def events_affecting_point(
+        session: DbSession,
+        lat: float = Query(..., ge=-90, le=90),
+        lng: float = Query(..., ge=-180, le=180),
+        starts_at: datetime = Query(..., description="Początek okna (ISO 8601)"),
+        ends_at: datetime | None = Query(None, description="Koniec okna; domyślnie = starts_at (jedna chwila)"),
+        radius_m: float = Query(0, ge=0, le=50_000, description="Promień wokół punktu (np. odcinek trasy)"),
+        event_type: EventType | None = Query(None),
+        severity: EventSeverity | None = Query(None),
+        is_verified: bool | None = Query(None),
+        limit: int = Query(200, ge=1, le=1000),
+        offset: int = Query(0, ge=0),
+):
+    starts_at, ends_at = _query_window(starts_at, ends_at)
+
+    return await list_events_affecting(
+        session,
+        lat,
+        lng,
+        starts_at,
+        ends_at,
+        radius_m=radius_m,
+        event_type=event_type,
+        severity=severity,
+        is_verified=is_verified,
+        limit=limit,
+        offset=offset,
+    )
+
+
+@router.get("/by-line", response_model=list[EventRead], dependencies=[Depends(event_validators)])
+async def events_by_line(
+        session: DbSession,
+        line: str = Query(..., min_length=1, max_length=50, description="Kod linii, np. 52 albo A"),
+        carrier: str | None = Query(None, max_length=100),
+        starts_at: datetime = Query(..., description="Początek okna (ISO 8601)"),
+        ends_at: datetime | None = Query(None, description="Koniec okna; domyślnie = starts_at (jedna chwila)"),
+        limit: int = Query(200, ge=1, le=1000),
+        offset: int = Query(0, ge=0),
+):
+    starts_at, ends_at = _query_window(starts_at, ends_at)
+
+    return await list_events_for_line(
+        session, line, starts_at, ends_at, carrier=carrier, limit=limit, offset=offset
+    )
@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.conditional import table_validators
+from app.core.config import settings
+from app.core.dependencies import DbSession
+from app.core.rbac import require_permission
+from app.db.models.report import Report
+from app.repositories.rollup import AREA_GRID, bucket_start, bucket_step, rollup_series
+from app.routers.v1.endpoints.report import get_viewport
+from app.schemas.report import Location, ReportRollupPoint, ReportRollupSeries, ReportType, RollupGranularity
+from app.schemas.user import Permission
+from app.utils.cache import cache_stats
+from app.utils.geo import BBox
+
+router = APIRouter()
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    # Naiwna data to UTC (jak w SQLite) – z offsetem przeliczamy, żeby dało się porównać obie granice.
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo is not None else dt
+
+
+@router.get(
+    "/caches",
+    dependencies=[Depends(require_permission(Permission.VIEW_METRICS))]
+)
+async def read_cache_stats() -> list[dict[str, Any]]:
+    """Size and hit/miss counters of the in-process caches (requires VIEW_METRICS permission)"""
+    return cache_stats()
+
+
+@router.get(
+    "/reports",
+    response_model=ReportRollupSeries,
+    # Agregaty zmieniają się tylko razem z zapisami zgłoszeń, więc wersja tabeli reports wystarcza jako ETag.
+    dependencies=[
+        Depends(require_permission(Permission.VIEW_METRICS)),
+        Depends(table_validators(Report.__tablename__)),
+    ],
+)
+async def read_report_rollups(
+        db: DbSession,
+        start: datetime = Query(..., description="Początek zakresu (zaokrąglany w dół do kubełka)"),
+        end: datetime = Query(..., description="Koniec zakresu (włącznie)"),
+        granularity: RollupGranularity = Query(RollupGranularity.HOUR),
+        type: ReportType | None = Query(None, description="Tylko zgłoszenia tego typu"),
+        by_area: bool = Query(False, description="Osobne wiersze per obszar"),
+        viewport: BBox | None = Depends(get_viewport),
+) -> ReportRollupSeries:
+    """Hourly or daily report counts and vote totals by type and area (requires VIEW_METRICS permission)"""
+    start, end = _naive_utc(start), _naive_utc(end)
+    if end < start:
+        raise HTTPException(status_code=422, detail="end must be >= start")
+    buckets = (bucket_start(end, granularity) - bucket_start(start, granularity)) // bucket_step(granularity) + 1
+    if buckets > settings.ROLLUP_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Range covers {buckets} buckets; at most {settings.ROLLUP_MAX_BUCKETS} allowed "
+                   f"(use granularity=day for long ranges).",
+        )
+
+    rows = await rollup_series(db, granularity, start, end, type_=type, bbox=viewport, by_area=by_area)
+    points = []
+    for row in rows:
+        area = row.area if by_area else None
+        center = None
+        if area is not None:
+            bounds = AREA_GRID.bounds(area)
+            center = Location(lat=(bounds.min_lat + bounds.max_lat) / 2, lng=(bounds.min_lng + bounds.max_lng) / 2)
+        points.append(ReportRollupPoint(
+            bucket=row.bucket,
+            type=row.type,
+            area=area,
+            area_center=center,
+            reports=row.reports,
+            likes=row.likes,
+            confirmations=row.confirmations,
+            denials=row.denials,
+        ))
+    return ReportRollupSeries(
+        granularity=granularity,
+        start=bucket_start(start, granularity),
+        end=end,
+        area_deg=AREA_GRID.cell_deg,
+        points=points,
+    )
@@ -1,5 +1,5 @@
-from datetime import datetime
-import asyncio
+from datetime import timedelta
+import time
 from fastapi import (
     APIRouter,
     Depends,
@@ -7,20 +7,37 @@ from fastapi import (
     File,
     Form,
     Request,
+    Response,
     HTTPException,
     Query,
 )
+from fastapi.responses import ORJSONResponse
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
-from app.db.database import get_session
-from app.repositories.report import ReportRepository
+from app.core.conditional import check_conditional
+from app.core.config import settings
+from app.core.dependencies import DbSession
+from app.db.models.report import Report
+from app.repositories.report import COUNTER_FIELDS, ReportRepository
 from app.services.report import ReportService
-from app.schemas.report import ReportRead, ReportType, Location, ReportList
+from app.schemas.common import TotalMode
+from app.schemas.report import (
+    ClusterPoint,
+    Location,
+    ModerationStatus,
+    ReportCluster,
+    ReportClusterList,
+    ReportList,
+    ReportRead,
+    ReportStatus,
+    ReportType,
+    serialize_reports,
+)
+from app.utils.geo import BBox
 from app.utils.images import validate_and_store_image
+from app.utils.pagination import decode_cursor
 from app.schemas.traffic import TrafficReport
-from app.utils.llm import assess_disruption
-from app.services.ws_manager import manager
-from app.utils.moderation import moderate_text
+from app.services.moderation_queue import moderation_queue
+from app.utils.moderation import amoderate_texts, contains_profanity
 from app.core.security import oauth2_scheme
 from app.repositories.auth import authenticate_user
 from app.schemas.user import User
@@ -29,10 +46,30 @@ from app.core.rbac import get_current_active_user, get_current_user
 router = APIRouter()
 
 
-def get_service(session: Session = Depends(get_session)) -> ReportService:
+def get_service(session: DbSession) -> ReportService:
     return ReportService(ReportRepository(session))
 
 
+def get_viewport(
+        min_lat: float | None = Query(None, ge=-90, le=90, description="Viewport south edge (bbox mode)"),
+        min_lng: float | None = Query(None, ge=-180, le=180, description="Viewport west edge (bbox mode)"),
+        max_lat: float | None = Query(None, ge=-90, le=90, description="Viewport north edge (bbox mode)"),
+        max_lng: float | None = Query(None, ge=-180, le=180, description="Viewport east edge (bbox mode)"),
+) -> BBox | None:
+    """Optional map viewport; `min_lng > max_lng` means the viewport crosses the antimeridian."""
+    params = (min_lat, min_lng, max_lat, max_lng)
+    if all(p is None for p in params):
+        return None
+    if any(p is None for p in params):
+        raise HTTPException(
+            status_code=422,
+            detail="Viewport mode requires all of min_lat, min_lng, max_lat, max_lng.",
+        )
+    if min_lat > max_lat:
+        raise HTTPException(status_code=422, detail="min_lat must be <= max_lat.")
+    return BBox(min_lat=min_lat, min_lng=min_lng, max_lat=max_lat, max_lng=max_lng)
+
+
 @router.post("/incidents", response_model=ReportRead, status_code=201)
 async def create_report(
         request: Request,
@@ -44,7 +81,7 @@ async def create_report(
         photo: UploadFile | None = File(default=None),
         svc: ReportService = Depends(get_service),
         # token: str = Depends(oauth2_scheme),
-        # db=Depends(get_session),
+        # db: DbSession,
 ):
     try:
         Location(lat=lat, lng=lng)
@@ -62,8 +99,15 @@ async def create_report(
     #     except HTTPException:
     #         user = None
 
+    pending = settings.MODERATION_ASYNC_ENABLED
+    if pending:
+        # Od razu tylko lokalny prefiltr; moderacja LLM idzie w tle (app.services.moderation_queue).
+        moderate_description, moderate_name = not contains_profanity(description), not contains_profanity(name)
+    else:
+        # Nazwa i opis są moderowane równolegle, bez blokowania pętli zdarzeń.
+        moderate_description, moderate_name = await amoderate_texts(description, name)
+
     if description:
-        moderate_description = moderate_text(description)
         if moderate_description is False:
             raise HTTPException(
                 status_code=400,
@@ -71,7 +115,6 @@ async def create_report(
             )
 
     if name:
-        moderate_name = moderate_text(name)
         if moderate_name is False:
             raise HTTPException(
                 status_code=400,
@@ -80,68 +123,148 @@ async def create_report(
 
     photo_name = validate_and_store_image(photo) if photo and photo.filename else None
 
-    obj = svc.create(
+    obj = await svc.create(
         type_=type,
         lat=lat,
         lng=lng,
         name=name,
         description=description,
         photo_path=photo_name,
+        pending=pending,
     )
+    if pending:
+        moderation_queue.submit(obj.id)
 
     base = str(request.base_url).rstrip("/")
-    result = ReportRead.from_orm_with_photo(obj, base_url=base)
-
-    broadcast_data = {
-        "user": "Anonim",
-        "message": description or name or "Nowe zgłoszenie",
-        "lat": lat,
-        "lng": lng,
-        "likes": obj.likes,
-        "timestamp": datetime.utcnow().isoformat() + "Z",
-    }
+    return ReportRead.from_orm_with_photo(obj, base_url=base)
 
-    asyncio.create_task(manager.broadcast(broadcast_data))
 
-    return result
+@router.get("/incidents/clusters", response_model=ReportClusterList)
+async def list_report_clusters(
+        zoom: int = Query(..., ge=0, le=22, description="Poziom przybliżenia mapy (jak w kafelkach web-map)"),
+        max_age_minutes: int | None = Query(None, ge=1, description="Only reports newer than this many minutes"),
+        viewport: BBox | None = Depends(get_viewport),
+        svc: ReportService = Depends(get_service),
+):
+    """Zgłoszenia w widoku mapy zagregowane do klastrów; rzadkie klastry zawierają też pojedyncze punkty."""
+    if viewport is None:
+        raise HTTPException(status_code=422, detail="min_lat, min_lng, max_lat and max_lng are required.")
+    max_age = timedelta(minutes=max_age_minutes) if max_age_minutes else None
+    grid, cells = await svc.clusters(bbox=viewport, zoom=zoom, max_age=max_age)
+    return ReportClusterList(
+        zoom=zoom,
+        cell_deg=grid.cell_deg,
+        clusters=[
+            ReportCluster(
+                location=Location(lat=cell.lat, lng=cell.lng),
+                count=cell.count,
+                dominant_type=cell.dominant_type,
+                counts=cell.counts,
+                points=[
+                    ClusterPoint(id=id_, type=type_, location=Location(lat=lat, lng=lng))
+                    for id_, type_, lat, lng in cell.points
+                ] if cell.points is not None else None,
+            )
+            for cell in cells
+        ],
+    )
 
 
-@router.get("/incidents/{incident_id}", response_model=ReportRead, status_code=200)
-def get_report(
+@router.get(
+    "/incidents/{incident_id}",
+    response_model=ReportRead | ReportStatus,
+    status_code=200,
+)
+async def get_report(
         incident_id: int,
         request: Request,
+        response: Response,
+        db: DbSession,
         svc: ReportService = Depends(get_service),
 ):
-    obj = svc.get(incident_id)
-    if not obj:
+    obj = await svc.get(incident_id)
+    # Zgłoszenie PENDING jest dostępne po id (autor sprawdza status), ale bez niesprawdzonej treści;
+    # odrzucone – wcale.
+    if not obj or obj.moderation_status is ModerationStatus.REJECTED:
         raise HTTPException(status_code=404, detail=f"Report with id={incident_id} not found")
+    # Głosy nie podbijają wersji tabeli od razu (zob. VoteAggregator.touch) – ETag zawiera też liczniki
+    # samego zgłoszenia, razem z niezapisanymi jeszcze głosami z bufora.
+    counters = ".".join(str(getattr(obj, field)) for field in COUNTER_FIELDS)
+    response.headers.update(
+        await check_conditional(request, db, [Report.__tablename__], salt=f"{obj.id}.{counters}")
+    )
+    if obj.moderation_status is ModerationStatus.PENDING:
+        return ReportStatus(id=obj.id, moderation_status=obj.moderation_status)
     base = str(request.base_url).rstrip("/")
     return ReportRead.from_orm_with_photo(obj, base_url=base)
 
 
-@router.get("/incidents", response_model=ReportList, status_code=200)
-def list_reports(
+@router.get("/incidents", response_model=ReportList, response_class=ORJSONResponse, status_code=200)
+async def list_reports(
         request: Request,
+        db: DbSession,
         lat: float = Query(0, ge=-90, le=90, description="User latitude"),
         lng: float = Query(0, ge=-180, le=180, description="User longitude"),
         radius: float = Query(50000.0, gt=0, le=50009, description="Search radius in kilometers (default 5 km)"),
         skip: int = Query(0, ge=0, description="Number of items to skip"),
-        limit: int = Query(50, le=200, description="Max number of items to return"),
+        limit: int = Query(50, ge=1, le=200, description="Max number of items to return"),
+        max_age_minutes: int | None = Query(None, ge=1, description="Only reports newer than this many minutes"),
+        cursor: str | None = Query(None, description="Opaque cursor from `next_cursor` of the previous page"),
+        include_total: TotalMode | None = Query(
+            None, description="false | approx | exact; defaults to approx on the first page and false with a cursor"
+        ),
+        viewport: BBox | None = Depends(get_viewport),
         svc: ReportService = Depends(get_service),
 ):
-    items, total = svc.list_in_radius(lat=lat, lng=lng, radius_km=radius, skip=skip, limit=limit)
+    # "Ostatnie N minut" zmienia się z upływem czasu – wtedy ETag zależy też od bieżącej minuty.
+    salt = str(int(time.time() // 60)) if max_age_minutes else None
+    validators = await check_conditional(request, db, [Report.__tablename__], salt=salt)
+
+    max_age = timedelta(minutes=max_age_minutes) if max_age_minutes else None
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if include_total is None:
+        include_total = TotalMode.FALSE if after else TotalMode.APPROX
+
+    try:
+        if viewport is not None:
+            page = await svc.list_in_bbox(
+                bbox=viewport, skip=skip, limit=limit, max_age=max_age, cursor=after, total_mode=include_total
+            )
+        else:
+            page = await svc.list_in_radius(
+                lat=lat,
+                lng=lng,
+                radius_km=radius,
+                skip=skip,
+                limit=limit,
+                max_age=max_age,
+                cursor=after,
+                total_mode=include_total,
+            )
+    except TypeError:
+        # Porównanie czasu z kursora z datami wierszy – przy poprawnym kursorze nie występuje.
+        if after is None:
+            raise
+        raise HTTPException(status_code=400, detail="Invalid cursor.") from None
     base = str(request.base_url).rstrip("/")
-    reports = [ReportRead.from_orm_with_photo(obj, base_url=base) for obj in items]
-    return ReportList(items=reports, total=total)
+    # Zwracamy gotową odpowiedź – FastAPI nie waliduje jej ponownie względem `ReportList` (model zostaje dla OpenAPI).
+    return ORJSONResponse({
+        "items": serialize_reports(page.items, base_url=base),
+        "total": page.total,
+        "next_cursor": page.next_cursor,
+    }, headers=validators)
 
 
 @router.post("/incidents/{incident_id}/like", response_model=ReportRead)
-def like_report(
+async def like_report(
         incident_id: int,
         request: Request,
         svc: ReportService = Depends(get_service),
 ):
-    obj = svc.increment_counter(incident_id, "likes")
+    obj = await svc.increment_counter(incident_id, "likes")
     if not obj:
         raise HTTPException(status_code=404, detail=f"Report with id={incident_id} not found")
     base = str(request.base_url).rstrip("/")
@@ -149,12 +272,12 @@ def like_report(
 
 
 @router.post("/incidents/{incident_id}/confirm", response_model=ReportRead)
-def confirm_report(
+async def confirm_report(
         incident_id: int,
         request: Request,
         svc: ReportService = Depends(get_service),
 ):
-    obj = svc.increment_counter(incident_id, "confirmations")
+    obj = await svc.increment_counter(incident_id, "confirmations")
     if not obj:
         raise HTTPException(status_code=404, detail=f"Report with id={incident_id} not found")
     base = str(request.base_url).rstrip("/")
@@ -162,12 +285,12 @@ def confirm_report(
 
 
 @router.post("/incidents/{incident_id}/deny", response_model=ReportRead)
-def deny_report(
+async def deny_report(
         incident_id: int,
         request: Request,
         svc: ReportService = Depends(get_service),
 ):
-    obj = svc.increment_counter(incident_id, "denials")
+    obj = await svc.increment_counter(incident_id, "denials")
     if not obj:
         raise HTTPException(status_code=404, detail=f"Report with id={incident_id} not found")
     base = str(request.base_url).rstrip("/")
@@ -1,9 +1,8 @@
 from fastapi import APIRouter, HTTPException, status, Path
-from sqlalchemy.orm import Session
 from fastapi import Depends, Query
 from typing import Annotated
 
-from app.db.database import get_session
+from app.core.dependencies import DbSession
 from app.core.rbac import get_current_active_user, has_permission, require_permission
 from app.repositories.user import get_user_by_username, get_user_by_email, create_user, update_user, get_all_users, \
     update_user_role, get_user_by_id, update_user_status, add_user_permission, remove_user_permission, delete_user
@@ -16,21 +15,21 @@ router = APIRouter()
     "/user",
     response_model=User
 )
-async def register_user(user: UserCreate, db: Session = Depends(get_session)) -> User:
+async def register_user(user: UserCreate, db: DbSession) -> User:
     """Register a new user."""
-    existing_user = get_user_by_username(user.username, db)
+    existing_user = await get_user_by_username(user.username, db)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Username already exists"
         )
 
-    existing_email = get_user_by_email(user.email, db)
+    existing_email = await get_user_by_email(user.email, db)
     if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists."
         )
 
-    return create_user(user, db)
+    return await create_user(user, db)
 
 
 @router.get(
@@ -44,10 +43,10 @@ async def read_user(current_user: User = Depends(get_current_active_user)) -> Us
 
 @router.patch("/{user_id}", response_model=User)
 async def update_user_details(
+        db: DbSession,
         user_update: UserUpdate,
         user_id: str = Path(..., title="The ID of the user to update."),
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_session)
+        current_user: User = Depends(get_current_active_user)
 ):
     if str(current_user.id) != user_id and not has_permission(current_user, Permission.UPDATE_USER):
         raise HTTPException(
@@ -56,7 +55,7 @@ async def update_user_details(
         )
 
     try:
-        updated_user = update_user(int(user_id), user_update, db)
+        updated_user = await update_user(int(user_id), user_update, db)
         if not updated_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -72,12 +71,12 @@ async def update_user_details(
     dependencies=[Depends(require_permission(Permission.READ_USER))]
 )
 async def read_users(
+        db: DbSession,
         skip: Annotated[int, Query(ge=0)] = 0,
-        limit: Annotated[int, Query(ge=1, le=100)] = 10,
-        db: Session = Depends(get_session)
+        limit: Annotated[int, Query(ge=1, le=100)] = 10
 ):
     """Get all users (requires READ_USER permission)"""
-    return get_all_users(db, skip, limit)
+    return await get_all_users(db, skip, limit)
 
 
 @router.patch(
@@ -86,11 +85,11 @@ async def read_users(
     dependencies=[Depends(require_permission(Permission.MANAGE_ROLES))]
 )
 async def update_role(
+        db: DbSession,
         role: Role,
-        user_id: str = Path(..., title="The ID of the user to update."),
-        db: Session = Depends(get_session)
+        user_id: str = Path(..., title="The ID of the user to update.")
 ):
-    user = update_user_role(int(user_id), role, db)
+    user = await update_user_role(int(user_id), role, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -105,11 +104,11 @@ async def update_role(
 
 )
 async def read_user(
-        user_id: str = Path(..., title="The ID of the user to get."),
-        db: Session = Depends(get_session)
+        db: DbSession,
+        user_id: str = Path(..., title="The ID of the user to get.")
 ):
     """Get a specific user by id (requires READ_USER permission)"""
-    user = get_user_by_id(int(user_id), db)
+    user = await get_user_by_id(int(user_id), db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -124,17 +123,17 @@ async def read_user(
     dependencies=[Depends(require_permission(Permission.MANAGE_ROLES))]
 )
 async def update_user_status_endpoint(
+        db: DbSession,
         disabled: bool,
-        user_id: str = Path(..., title="The ID of the user to update."),
-        db: Session = Depends(get_session)
+        user_id: str = Path(..., title="The ID of the user to update.")
 ):
-    updated = update_user_status(int(user_id), disabled, db)
+    updated = await update_user_status(int(user_id), disabled, db)
     if not updated:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    user = get_user_by_id(int(user_id), db)
+    user = await get_user_by_id(int(user_id), db)
     return user
 
 
@@ -144,11 +143,11 @@ async def update_user_status_endpoint(
     dependencies=[Depends(require_permission(Permission.MANAGE_ROLES))]
 )
 async def add_permission(
+        db: DbSession,
         permission: Permission,
-        user_id: str = Path(..., title="The ID of the user to update."),
-        db: Session = Depends(get_session)
+        user_id: str = Path(..., title="The ID of the user to update.")
 ):
-    user = add_user_permission(user_id, permission, db)
+    user = await add_user_permission(user_id, permission, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -162,11 +161,11 @@ async def add_permission(
     dependencies=[Depends(require_permission(Permission.MANAGE_ROLES))]
 )
 async def remove_permission(
+        db: DbSession,
         permission: Permission,
-        user_id: str = Path(..., title="The ID of the user to update."),
-        db: Session = Depends(get_session)
+        user_id: str = Path(..., title="The ID of the user to update.")
 ):
-    user = remove_user_permission(int(user_id), permission, db)
+    user = await remove_user_permission(int(user_id), permission, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -179,16 +178,16 @@ async def remove_permission(
     status_code=status.HTTP_204_NO_CONTENT,
 )
 async def delete_user_endpoint(
+        db: DbSession,
         user_id: str = Path(..., title="The ID of the user to delete."),
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_session)
+        current_user: User = Depends(get_current_active_user)
 ):
     if str(current_user.id) != user_id and not has_permission(current_user, Permission.UPDATE_USER):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions to update this user"
         )
-    deleted = delete_user(int(user_id), db)
+    deleted = await delete_user(int(user_id), db)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from app.services.ws_manager import manager
+from app.utils.moderation import contains_profanity
 
 router = APIRouter()
 
@@ -14,6 +15,10 @@ async def websocket_endpoint(ws: WebSocket):
     try:
         while True:
             msg = await ws.receive_text()
+            # Tylko lokalny prefiltr (bez LLM) – odrzucona wiadomość wraca wyłącznie do nadawcy.
+            if contains_profanity(msg):
+                await ws.send_json({"type": "rejected", "message": "Message contains inappropriate content."})
+                continue
             await manager.broadcast({"type": "echo", "message": msg})
 
     except WebSocketDisconnect:
@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import Generic, TypeVar
 
 from pydantic import BaseModel, Field
@@ -5,24 +6,38 @@ from pydantic import BaseModel, Field
 T = TypeVar("T")
 
 
+class TotalMode(str, Enum):
+    """
+    How a list endpoint computes `total`:
+
+        false:  skip counting,
+        approx: incrementally kept counter or a recently cached count,
+        exact:  COUNT over the current data.
+    """
+
+    FALSE = "false"
+    APPROX = "approx"
+    EXACT = "exact"
+
+
 class PaginatedResponse(BaseModel, Generic[T]):
     """
     Generic schema for paginated API responses.
 
     Attributes:
         data: List of result items.
-        total: Total number of items matching the query.
+        total: Total number of items matching the query (None when not requested, see TotalMode).
         limit: Maximum number of items per page.
         offset: Number of items skipped before this page.
     """
 
     data: list[T] = Field(..., description="List of items on this page")
-    total: int = Field(..., description="Total number of matching items")
+    total: int | None = Field(None, description="Total number of matching items")
     limit: int = Field(..., description="Maximum number of items per page")
     offset: int = Field(..., description="Number of skipped items before this page")
 
     @classmethod
-    def create(cls, *, data: list[T], total: int, limit: int, offset: int):
+    def create(cls, *, data: list[T], total: int | None, limit: int, offset: int):
         """
         Factory method to create a paginated response.
         """
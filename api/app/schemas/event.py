@@ -1,5 +1,6 @@
-from datetime import datetime
-from pydantic import BaseModel, Field, field_validator
+from datetime import datetime, timezone
+from enum import Enum
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
 from app.db.models.event import EventType, EventSeverity
 
 
@@ -18,24 +19,34 @@ class EventBase(BaseModel):
     location_name: str | None = None
 
     source: str | None = None
+    external_id: str | None = Field(
+        None,
+        max_length=200,
+        description="Id w źródle; ponowny import z tym samym (source, external_id) aktualizuje zdarzenie",
+    )
     carrier: str | None = None
     affected_lines: str | None = Field(
         None, description="Lista linii jako string (np. '52,A,D')"
     )
     is_verified: bool = False
 
+
+class EventCreate(EventBase):
+    @field_validator("starts_at", "ends_at")
     @classmethod
+    def as_utc(cls, v: datetime) -> datetime:
+        # Data bez strefy to UTC (jak w SQLite) – mieszanie naiwnych i ze strefą psuje odejmowanie i min/max.
+        return v.replace(tzinfo=timezone.utc) if v.tzinfo is None else v.astimezone(timezone.utc)
+
     @field_validator("ends_at")
-    def validate_time(cls, v: datetime, values: dict) -> datetime:
-        if "starts_at" in values and v <= values["starts_at"]:
+    @classmethod
+    def validate_time(cls, v: datetime, info: ValidationInfo) -> datetime:
+        starts_at = info.data.get("starts_at")
+        if starts_at is not None and v <= starts_at:
             raise ValueError("ends_at must be greater than starts_at")
         return v
 
 
-class EventCreate(EventBase):
-    pass
-
-
 class EventUpdate(BaseModel):
     name: str | None = None
     description: str | None = None
@@ -51,6 +62,7 @@ class EventUpdate(BaseModel):
     location_name: str | None = None
 
     source: str | None = None
+    external_id: str | None = None
     carrier: str | None = None
     affected_lines: str | None = None
     is_verified: bool | None = None
@@ -62,4 +74,20 @@ class EventRead(EventBase):
     updated_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class EventImportError(BaseModel):
+    line: int = Field(..., description="Numer linii (NDJSON) lub rekordu (CSV, bez nagłówka)")
+    error: str
+
+
+class EventImportResult(BaseModel):
+    received: int = Field(0, description="Liczba odczytanych rekordów")
+    upserted: int = Field(0, description="Liczba zapisanych (wstawionych lub zaktualizowanych) zdarzeń")
+    failed: int = Field(0, description="Liczba odrzuconych rekordów")
+    errors: list[EventImportError] = Field(default_factory=list, description="Pierwsze błędy walidacji")
+
+
+class EventStreamFormat(str, Enum):
+    JSON = "json"
+    NDJSON = "ndjson"
@@ -1,3 +1,8 @@
+from collections.abc import Iterable
+from datetime import datetime
+from operator import attrgetter
+from typing import Any
+
 from pydantic import BaseModel, Field, ConfigDict
 from enum import Enum
 
@@ -12,6 +17,12 @@ class ReportType(str, Enum):
     OTHER = "other"
 
 
+class ModerationStatus(str, Enum):
+    PENDING = "pending"
+    APPROVED = "approved"
+    REJECTED = "rejected"
+
+
 class Location(BaseModel):
     lat: float = Field(..., ge=-90, le=90)
     lng: float = Field(..., ge=-180, le=180)
@@ -41,6 +52,7 @@ class ReportRead(BaseModel):
     confirmations: int
     denials: int
     created_at: str
+    moderation_status: ModerationStatus = ModerationStatus.APPROVED
 
     @classmethod
     def from_orm_with_photo(cls, obj, base_url: str | None = None):
@@ -60,12 +72,99 @@ class ReportRead(BaseModel):
             confirmations=obj.confirmations,
             denials=obj.denials,
             created_at=obj.created_at.isoformat(),
+            moderation_status=getattr(obj, "moderation_status", ModerationStatus.APPROVED),
         )
 
 
+class ReportStatus(BaseModel):
+    """
+    Zgłoszenie przed werdyktem moderacji – tylko status, bez niesprawdzonej jeszcze treści.
+    """
+    id: int
+    moderation_status: ModerationStatus
+
+
+_report_fields = attrgetter(
+    "id", "type", "name", "description", "latitude", "longitude",
+    "photo_path", "likes", "confirmations", "denials", "created_at",
+)
+
+
+def serialize_reports(objs: Iterable[Any], base_url: str | None = None) -> list[dict[str, Any]]:
+    """
+    Szybka ścieżka dla list: ten sam kształt co `ReportRead.from_orm_with_photo`, ale jako zwykłe dicty
+    bez walidacji Pydantic. Działa na obiektach ORM, wierszach Core i `LiveReport`;
+    enum i datetime serializuje dopiero orjson.
+    """
+    photo_prefix = f"{base_url}/files/" if base_url else None
+    items = []
+    append = items.append
+    for (
+            id_, type_, name, description, lat, lng, photo_path, likes, confirmations, denials, created_at,
+    ) in map(_report_fields, objs):
+        append({
+            "id": id_,
+            "type": type_,
+            "name": name,
+            "description": description,
+            "location": {"lat": lat, "lng": lng},
+            "photo_url": photo_prefix + photo_path.rpartition("/")[2] if photo_path and photo_prefix else None,
+            "likes": likes,
+            "confirmations": confirmations,
+            "denials": denials,
+            "created_at": created_at,
+        })
+    return items
+
+
 class ReportList(BaseModel):
     items: list[ReportRead]
-    total: int
+    total: int | None = Field(None, description="Total matching items; omitted on cursor pages")
+    next_cursor: str | None = Field(None, description="Pass as `cursor` to fetch the next page")
+
+
+class ClusterPoint(BaseModel):
+    id: int
+    type: ReportType
+    location: Location
+
+
+class ReportCluster(BaseModel):
+    location: Location = Field(..., description="Środek ciężkości zgłoszeń w klastrze")
+    count: int
+    dominant_type: ReportType
+    counts: dict[ReportType, int] = Field(..., description="Liczba zgłoszeń per typ")
+    points: list[ClusterPoint] | None = Field(None, description="Pojedyncze zgłoszenia dla rzadkich klastrów")
+
+
+class ReportClusterList(BaseModel):
+    zoom: int
+    cell_deg: float = Field(..., description="Bok komórki klastra w stopniach")
+    clusters: list[ReportCluster]
+
+
+class RollupGranularity(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+
+class ReportRollupPoint(BaseModel):
+    bucket: datetime = Field(..., description="Początek kubełka (UTC)")
+    type: ReportType
+    area: int | None = Field(None, description="Klucz obszaru (tylko z by_area=true)")
+    area_center: Location | None = None
+    reports: int = Field(..., description="Zgłoszenia utworzone w kubełku")
+    likes: int = Field(..., description="Polubienia oddane w kubełku")
+    confirmations: int
+    denials: int
+
+
+class ReportRollupSeries(BaseModel):
+    granularity: RollupGranularity
+    start: datetime
+    end: datetime
+    area_deg: float = Field(..., description="Bok obszaru w stopniach")
+    points: list[ReportRollupPoint]
 
 
 class LocationFilter(BaseModel):
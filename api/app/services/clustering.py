@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.core.config import settings
+from app.repositories.report import ReportRepository, since_bucket
+from app.schemas.report import ReportType
+from app.utils.cache import TTLCache
+from app.utils.geo import BBox, ClusterGrid, cell_center, cluster_factor
+
+# Powyżej tej liczby klastrów w widoku siatka jest zgrubniana (bok x2).
+MAX_VIEW_CLUSTERS = 4096
+_MAX_FACTOR = 1 << 15
+
+
+@dataclass(frozen=True, slots=True)
+class ClusterCell:
+    key: int
+    count: int
+    lat: float
+    lng: float
+    counts: dict[ReportType, int]
+    points: tuple[tuple[int, ReportType, float, float], ...] | None
+
+    @property
+    def dominant_type(self) -> ReportType:
+        return max(self.counts, key=self.counts.__getitem__)
+
+
+# Klucz: (factor, id klastra, kubełek "since"); pusty klaster też jest cache'owany.
+cluster_cache: TTLCache[tuple[int, int, int | None], ClusterCell | bool] = TTLCache(
+    "report_clusters",
+    max_size=settings.CLUSTER_CACHE_MAX_ITEMS,
+    ttl=settings.CLUSTER_CACHE_TTL_SECONDS,
+)
+_EMPTY = False
+
+
+def grid_for(zoom: int, bbox: BBox) -> ClusterGrid:
+    grid = ClusterGrid(cluster_factor(zoom))
+    while grid.factor < _MAX_FACTOR:
+        cols = sum(hi - lo + 1 for lo, hi in grid.col_spans_for(bbox))
+        if len(grid.rows_for(bbox)) * cols <= MAX_VIEW_CLUSTERS:
+            break
+        grid = ClusterGrid(grid.factor * 2)
+    return grid
+
+
+def invalidate_point(lat: float, lng: float) -> int:
+    """Drops cached clusters containing the point, on every zoom level and time bucket."""
+    stale = {(factor, ClusterGrid(factor).key_of(lat, lng)) for factor in (1 << i for i in range(16))}
+    return cluster_cache.invalidate_where(lambda key: (key[0], key[1]) in stale)
+
+
+async def _load(
+        repo: ReportRepository, grid: ClusterGrid, bbox: BBox, since: datetime | None
+) -> dict[int, ClusterCell]:
+    rows, spans = grid.rows_for(bbox), grid.col_spans_for(bbox)
+    totals: dict[int, list] = {}
+    for cluster, type_, count, row, col in await repo.cluster_counts(grid, rows, spans, since):
+        acc = totals.setdefault(cluster, [0, 0.0, 0.0, {}])
+        acc[0] += count
+        acc[1] += float(row) * count
+        acc[2] += float(col) * count
+        acc[3][type_] = count
+
+    sparse = [key for key, acc in totals.items() if acc[0] <= settings.CLUSTER_POINTS_THRESHOLD]
+    points: dict[int, list] = {key: [] for key in sparse}
+    for cluster, id_, type_, lat, lng in await repo.cluster_points(grid, rows, spans, sparse, since):
+        points[cluster].append((id_, type_, lat, lng))
+
+    cells = {}
+    for key, (count, row_sum, col_sum, counts) in totals.items():
+        lat, lng = cell_center(row_sum / count, col_sum / count)
+        cell_points = tuple(sorted(points[key])) if key in points else None
+        cells[key] = ClusterCell(key, count, lat, lng, counts, cell_points)
+    return cells
+
+
+async def clusters_in_view(
+        repo: ReportRepository,
+        *,
+        bbox: BBox,
+        zoom: int,
+        since: datetime | None = None,
+) -> tuple[ClusterGrid, list[ClusterCell]]:
+    """
+    Klastry zgłoszeń w widoku mapy, agregowane po komórkach `geo_cell`.
+
+    Wynik jest cache'owany per (zoom, komórka); przy braku którejkolwiek komórki cały widok
+    (dociągnięty do pełnych komórek) liczony jest jednym zapytaniem GROUP BY po indeksie.
+    """
+    grid = grid_for(zoom, bbox)
+    bucket = since_bucket(since)
+    keys = grid.keys_for(bbox)
+    cached = [cluster_cache.get((grid.factor, key, bucket)) for key in keys]
+
+    if any(cell is None for cell in cached):
+        loaded = await _load(repo, grid, bbox, since)
+        cached = [loaded.get(key, _EMPTY) for key in keys]
+        for key, cell in zip(keys, cached, strict=True):
+            cluster_cache.set((grid.factor, key, bucket), cell)
+
+    return grid, [cell for cell in cached if cell is not _EMPTY]
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from datetime import timezone
+from typing import Any
+
+from app.core.config import settings
+from app.schemas.traffic import DisruptionPrediction, TrafficReport
+from app.services.disruption_heuristic import heuristic_prediction
+from app.utils.cache import TTLCache, register_stats
+from app.utils.geo import ClusterGrid
+from app.utils.llm import FALLBACK_PREDICTION, AssessmentUnavailable, aassess_disruption
+from app.utils.moderation import amoderate_text, normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Klucz: (miasto, środek, linia, obszar, kubełek czasu, znormalizowany opis).
+PredictionKey = tuple[str, str, str, int, int, str]
+
+# Wartość: predykcja albo None (opis odrzucony przez moderację) – oba wyniki są powtarzalne.
+prediction_cache: TTLCache[PredictionKey, tuple[DisruptionPrediction | None]] = TTLCache(
+    "disruption_predictions",
+    max_size=settings.DISRUPTION_CACHE_MAX_ITEMS,
+    ttl=settings.DISRUPTION_CACHE_TTL_SECONDS,
+)
+
+_AREA_GRID = ClusterGrid(settings.DISRUPTION_CACHE_AREA_FACTOR)
+
+# Trwające wywołania LLM per klucz – kolejne identyczne zapytania czekają na ten sam wynik.
+_inflight: dict[PredictionKey, asyncio.Task] = {}
+_coalesced = 0
+# Odpowiedzi z heurystyki (bez LLM) i wywołania LLM przy zbyt niskiej jej pewności.
+_heuristic_answers = 0
+_llm_consulted = 0
+
+
+def prediction_key(report: TrafficReport) -> PredictionKey:
+    ts = report.timestamp
+    # `timestamp` bez strefy (domyślne utcnow) traktujemy jak UTC.
+    ts = ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts
+    return (
+        normalize_text(report.city),
+        report.mode,
+        (report.line or "").strip().upper(),
+        _AREA_GRID.key_of(report.latitude, report.longitude),
+        int(ts.timestamp() // (settings.DISRUPTION_CACHE_BUCKET_MINUTES * 60)),
+        normalize_text(report.user_text or ""),
+    )
+
+
+def _store(key: PredictionKey, task: asyncio.Task) -> None:
+    _inflight.pop(key, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    result, cacheable = task.result()
+    if cacheable:
+        prediction_cache.set(key, (result,))
+
+
+async def _heuristic(report: TrafficReport) -> DisruptionPrediction | None:
+    try:
+        return await heuristic_prediction(report)
+    except Exception:
+        # Heurystyka jest tylko skrótem – przy błędzie odczytu danych zostaje sam LLM.
+        logger.exception("Heuristic disruption scoring failed")
+        return None
+
+
+async def _predict(report: TrafficReport) -> tuple[DisruptionPrediction | None, bool]:
+    """
+    Najpierw lokalna heurystyka (`app.services.disruption_heuristic`); gdy jej pewność jest poniżej
+    DISRUPTION_HEURISTIC_MIN_CONFIDENCE – LLM. Heurystyka zastępuje też stały fallback, gdy LLM zawiedzie.
+    Opis niedozwolony przez moderację daje None na obu ścieżkach. Drugi element: czy wynik można cache'ować.
+    """
+    global _heuristic_answers, _llm_consulted
+    heuristic = await _heuristic(report) if settings.DISRUPTION_HEURISTIC_ENABLED else None
+    if heuristic is not None and heuristic.confidence >= settings.DISRUPTION_HEURISTIC_MIN_CONFIDENCE:
+        if not await amoderate_text(report.user_text):
+            return None, True
+        _heuristic_answers += 1
+        return heuristic, True
+
+    _llm_consulted += 1
+    try:
+        return await aassess_disruption(report), True
+    except AssessmentUnavailable:
+        # Chwilowy błąd LLM – ani stały fallback, ani zastępująca go heurystyka nie zostają na cały TTL.
+        return (heuristic if heuristic is not None else FALLBACK_PREDICTION.model_copy()), False
+
+
+async def predict_disruption(report: TrafficReport) -> DisruptionPrediction | None:
+    """
+    Predykcja przez cache: prawie identyczne zgłoszenia z tego samego miejsca i okna czasu dostają ten sam
+    wynik, a równoległe identyczne zapytania współdzielą jedno wyliczenie. Cache i trwające wyliczenia są
+    sprawdzane przed heurystyką, więc powtórzone zapytanie nie czyta bazy ani nie woła LLM – zob. `_predict`.
+    """
+    if not settings.DISRUPTION_CACHE_ENABLED:
+        return (await _predict(report))[0]
+
+    global _coalesced
+    key = prediction_key(report)
+    cached = prediction_cache.get(key)
+    if cached is not None:
+        return cached[0]
+
+    task = _inflight.get(key)
+    if task is None:
+        # Osobne zadanie: rozłączenie klienta, który je zlecił, nie anuluje wyniku dla pozostałych.
+        task = asyncio.create_task(_predict(report))
+        task.add_done_callback(lambda done: _store(key, done))
+        _inflight[key] = task
+    else:
+        _coalesced += 1
+    return (await asyncio.shield(task))[0]
+
+
+def _stats() -> dict[str, Any]:
+    return {
+        "name": "disruption_predictions_inflight",
+        "in_flight": len(_inflight),
+        "coalesced": _coalesced,
+        "heuristic_answers": _heuristic_answers,
+        "llm_consulted": _llm_consulted,
+    }
+
+
+register_stats("disruption_predictions_inflight", _stats)
@@ -0,0 +1,258 @@
+import math
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Row
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.db.models.event import Event, EventType
+from app.repositories.event import list_events_affecting, list_events_for_line
+from app.repositories.report import ReportRepository
+from app.schemas.common import TotalMode
+from app.schemas.event import EventRead
+from app.schemas.report import ReportType
+from app.schemas.traffic import DisruptionPrediction, TrafficReport
+from app.services.live_index import LiveReport
+from app.services.report import ReportService
+from app.utils.geo import METERS_PER_DEGREE
+from app.utils.transit import split_lines
+
+# Kategoria predykcji i waga pojedynczego sygnału dla typu zgłoszenia / zdarzenia.
+_REPORT_SIGNALS: dict[ReportType, tuple[str, float]] = {
+    ReportType.ACCIDENT: ("accident", 1.0),
+    ReportType.TRAFFIC_JAM: ("congestion", 0.8),
+    ReportType.ROADBLOCK: ("congestion", 0.9),
+    ReportType.ROADWORK: ("delay", 0.6),
+    ReportType.DELAY: ("delay", 0.8),
+    ReportType.OTHER: ("unknown", 0.3),
+}
+_EVENT_SIGNALS: dict[EventType, tuple[str, float]] = {
+    EventType.STRIKE: ("strike", 1.5),
+    EventType.SPORT: ("congestion", 0.8),
+    EventType.CONCERT: ("congestion", 0.8),
+    EventType.WEATHER: ("delay", 0.7),
+    EventType.HOLIDAY: ("congestion", 0.4),
+    EventType.OTHER: ("unknown", 0.3),
+}
+
+# Zgłoszenie sprzed REPORT_HALF_LIFE waży połowę świeżego.
+REPORT_HALF_LIFE = timedelta(minutes=20)
+# Tłum przed początkiem i po końcu zdarzenia (koncert, mecz) – w tym czasie zdarzenie liczy się w połowie.
+EVENT_LEAD = timedelta(minutes=45)
+EVENT_TAIL = timedelta(minutes=45)
+# Prawdopodobieństwo utrudnień bez żadnych sygnałów w okolicy.
+BASE_PROBABILITY = 0.15
+_KM_PER_DEGREE = METERS_PER_DEGREE / 1000
+# Suma wag, przy której pewność dochodzi do ~63% (przy zgodnych sygnałach).
+EVIDENCE_SCALE = 1.5
+
+_CATEGORY_LABELS = {
+    "delay": "opóźnienia",
+    "breakdown": "awarie",
+    "accident": "wypadki",
+    "congestion": "korki i tłok",
+    "strike": "strajk",
+    "unknown": "inne utrudnienia",
+}
+_ACTIONS = {
+    "delay": "Dolicz 10–15 minut zapasu i śledź komunikaty przewoźnika dla swojej linii.",
+    "breakdown": "Sprawdź komunikaty przewoźnika i przygotuj objazd inną linią.",
+    "accident": "Omiń okolicę zdarzenia – wybierz objazd lub inną linię i dolicz 15–20 minut.",
+    "congestion": "Wyrusz wcześniej lub wybierz środek transportu omijający zatłoczoną okolicę.",
+    "strike": "Zaplanuj podróż bez tego przewoźnika; sprawdź linie zastępcze i komunikaty.",
+    "unknown": "Śledź zgłoszenia w okolicy i dolicz kilka minut zapasu.",
+}
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # SQLite i domyślny `TrafficReport.timestamp` dają naiwne daty w UTC.
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+@dataclass(frozen=True, slots=True)
+class _Origin:
+    """
+    Miejsce zgłoszenia z przeliczonym cos(lat): w promieniu rzędu kilometrów przybliżenie płaskie
+    różni się od haversine o ułamki procenta, a jest kilka razy tańsze.
+    """
+
+    lat: float
+    lng: float
+    km_per_deg_lng: float
+
+    @classmethod
+    def at(cls, lat: float, lng: float) -> "_Origin":
+        return cls(lat, lng, _KM_PER_DEGREE * math.cos(math.radians(lat)))
+
+    def distance_km(self, lat: float, lng: float) -> float:
+        dlng = (lng - self.lng + 180) % 360 - 180
+        return math.hypot((lat - self.lat) * _KM_PER_DEGREE, dlng * self.km_per_deg_lng)
+
+
+def _lines(affected_lines: str | None) -> set[str]:
+    # Te same separatory co indeks `event_lines` – zdarzenie znalezione po linii musi się na niej liczyć.
+    return set(split_lines(affected_lines))
+
+
+def _report_weight(
+        row: Row | LiveReport,
+        at: datetime,
+        origin: _Origin,
+        radius_km: float,
+        max_age: timedelta,
+) -> float:
+    age = abs(at - _as_utc(row.created_at))
+    if age > max_age:
+        return 0.0
+    distance = origin.distance_km(row.latitude, row.longitude)
+    if distance > radius_km:
+        return 0.0
+    support = row.likes + row.confirmations
+    # Zaprzeczenia ważą podwójnie; głosy "za" podbijają wagę najwyżej dwukrotnie.
+    credibility = (1 + support) / (1 + support + 2 * row.denials) * (1 + min(support, 10) / 10)
+    recency = 0.5 ** (age / REPORT_HALF_LIFE)
+    proximity = 1 - 0.8 * distance / radius_km if radius_km > 0 else 1.0
+    return _REPORT_SIGNALS[row.type][1] * credibility * recency * proximity
+
+
+def _event_weight(
+        evt: Event | EventRead,
+        at: datetime,
+        origin: _Origin,
+        line: str | None,
+        margin_km: float,
+) -> float:
+    starts_at, ends_at = _as_utc(evt.starts_at), _as_utc(evt.ends_at)
+    if starts_at <= at <= ends_at:
+        timing = 1.0
+    elif starts_at - EVENT_LEAD <= at <= ends_at + EVENT_TAIL:
+        timing = 0.5
+    else:
+        return 0.0
+
+    on_line = line is not None and line in _lines(evt.affected_lines)
+    reach_km = evt.radius_m / 1000
+    distance = origin.distance_km(evt.lat, evt.lng)
+    if distance <= reach_km:
+        proximity = 1.0
+    elif distance <= reach_km + margin_km:
+        proximity = 1 - (distance - reach_km) / margin_km
+    else:
+        proximity = 0.0
+    if on_line:
+        # Zdarzenie obejmujące linię pasażera liczy się także daleko od jego przystanku.
+        proximity = max(proximity, 0.5) * 2
+    if proximity == 0.0:
+        return 0.0
+
+    verified = 1.0 if evt.is_verified else 0.7
+    return _EVENT_SIGNALS[evt.event_type][1] * (evt.severity.value / 2) * timing * proximity * verified
+
+
+def score_disruption(
+        report: TrafficReport,
+        reports: Iterable[Row | LiveReport],
+        events: Iterable[Event | EventRead],
+        *,
+        radius_km: float,
+        max_age: timedelta,
+) -> DisruptionPrediction:
+    """
+    Deterministyczna ocena utrudnień bez LLM – z bieżących zgłoszeń w promieniu `radius_km` (typ, świeżość
+    względem `report.timestamp`, odległość, głosy) i zdarzeń trwających w tym czasie (typ, waga, promień,
+    linie).
+
+    `confidence` rośnie z sumą wag i zgodnością sygnałów co do kategorii; bez sygnałów wynosi 0. Heurystyka
+    nie czyta `user_text` – przy niskiej pewności decyzję trzeba zostawić LLM.
+    """
+    at = _as_utc(report.timestamp)
+    origin = _Origin.at(report.latitude, report.longitude)
+    line = (report.line or "").strip().upper() or None
+
+    weights: dict[str, float] = defaultdict(float)
+    report_count = 0
+    for row in reports:
+        weight = _report_weight(row, at, origin, radius_km, max_age)
+        if weight > 0:
+            report_count += 1
+            weights[_REPORT_SIGNALS[row.type][0]] += weight
+    active_events: list[str] = []
+    for evt in events:
+        weight = _event_weight(evt, at, origin, line, radius_km)
+        if weight > 0:
+            active_events.append(evt.name)
+            weights[_EVENT_SIGNALS[evt.event_type][0]] += weight
+
+    evidence = sum(weights.values())
+    if evidence == 0:
+        return DisruptionPrediction(
+            probability=BASE_PROBABILITY,
+            category="unknown",
+            reasoning="Brak świeżych zgłoszeń i trwających zdarzeń w okolicy.",
+            recommended_action="Nie widać utrudnień w pobliżu; śledź bieżące zgłoszenia przed wyjazdem.",
+            confidence=0.0,
+        )
+
+    # Remisy rozstrzyga kolejność alfabetyczna – wynik nie zależy od kolejności wejścia.
+    category = max(sorted(weights), key=weights.__getitem__)
+    agreement = weights[category] / evidence
+    probability = 1 - (1 - BASE_PROBABILITY) * math.exp(-evidence)
+    confidence = (1 - math.exp(-evidence / EVIDENCE_SCALE)) * (0.5 + 0.5 * agreement)
+
+    parts = []
+    if report_count:
+        parts.append(
+            f"Zgłoszenia w promieniu {radius_km * 1000:.0f} m z ostatnich "
+            f"{max_age.total_seconds() / 60:.0f} min: {report_count}"
+        )
+    if active_events:
+        names = ", ".join(sorted(active_events)[:3])
+        parts.append(f"Zdarzenia w tym czasie: {names}")
+    reasoning = f"{'. '.join(parts)}. Przeważają sygnały: {_CATEGORY_LABELS[category]}."
+
+    return DisruptionPrediction(
+        probability=round(probability, 3),
+        category=category,
+        reasoning=reasoning,
+        recommended_action=_ACTIONS[category],
+        confidence=round(confidence, 3),
+    )
+
+
+async def heuristic_prediction(report: TrafficReport) -> DisruptionPrediction:
+    """
+    `score_disruption` na danych z bazy: zgłoszenia z indeksu na żywo (lub SQL) oraz zdarzenia, które mogą
+    dać sygnał – sięgające okolicy (`list_events_affecting`) lub obejmujące linię pasażera – w oknie
+    EVENT_TAIL / EVENT_LEAD wokół `timestamp`.
+    """
+    radius_km = settings.DISRUPTION_HEURISTIC_RADIUS_KM
+    max_age = timedelta(minutes=settings.DISRUPTION_HEURISTIC_MAX_AGE_MINUTES)
+    at = _as_utc(report.timestamp)
+    now = datetime.now(timezone.utc)
+
+    async with AsyncSessionLocal() as session:
+        page = await ReportService(ReportRepository(session)).list_in_radius(
+            lat=report.latitude,
+            lng=report.longitude,
+            radius_km=radius_km,
+            skip=0,
+            limit=settings.DISRUPTION_HEURISTIC_MAX_REPORTS,
+            # Okno liczone od teraz musi sięgać max_age przed `timestamp`, gdy ten jest w przeszłości.
+            max_age=max(now - at, timedelta(0)) + max_age,
+            total_mode=TotalMode.FALSE,
+        )
+        # Okno i zasięg jak w `_event_weight`: zdarzenie waży, gdy `at` wypada między startem - LEAD a końcem + TAIL,
+        # a jego okrąg jest bliżej niż `radius_km` od zgłoszenia.
+        window_start, window_end = at - EVENT_TAIL, at + EVENT_LEAD
+        nearby = await list_events_affecting(
+            session, report.latitude, report.longitude, window_start, window_end, radius_m=radius_km * 1000
+        )
+        events = {evt.id: evt for evt in nearby}
+        line = (report.line or "").strip()
+        if line:
+            events.update((evt.id, evt) for evt in await list_events_for_line(session, line, window_start, window_end))
+
+    return score_disruption(report, page.items, events.values(), radius_km=radius_km, max_age=max_age)
@@ -0,0 +1,148 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.event import EventSeverity, EventType
+from app.repositories.event import day_window, list_events_between
+from app.schemas.event import EventRead
+from app.utils.cache import TTLCache
+
+# Klucz: (rodzaj, początek okna, koniec okna, event_type, severity, is_verified) – okno służy do unieważniania.
+EventCacheKey = tuple[str, datetime, datetime, EventType | None, EventSeverity | None, bool | None]
+
+event_cache: TTLCache[EventCacheKey, tuple[EventRead, ...]] = TTLCache(
+    "events",
+    max_size=settings.EVENT_CACHE_MAX_ITEMS,
+    ttl=settings.EVENT_CACHE_TTL_SECONDS,
+)
+
+# Okna z większą liczbą zdarzeń nie są cache'owane (zapytanie idzie prosto do bazy z limitem/offsetem).
+MAX_CACHED_EVENTS = 5000
+
+# Zwiększane przy każdym unieważnieniu – wynik zapytania, które trwało w trakcie zapisu, nie trafia do cache.
+_generation = 0
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # SQLite zwraca naiwne daty (zapisywane w UTC).
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def invalidate_window(start: datetime, end: datetime) -> int:
+    """Drops every cached result whose window overlaps [start, end]; returns the number of dropped entries."""
+    global _generation
+    _generation += 1
+    start, end = _as_utc(start), _as_utc(end)
+    return event_cache.invalidate_where(lambda key: key[1] <= end and key[2] >= start)
+
+
+async def _cached_window(
+        session: AsyncSession,
+        kind: str,
+        window_start: datetime,
+        window_end: datetime,
+        event_type: EventType | None,
+        severity: EventSeverity | None,
+        is_verified: bool | None,
+) -> tuple[EventRead, ...] | None:
+    key: EventCacheKey = (kind, _as_utc(window_start), _as_utc(window_end), event_type, severity, is_verified)
+    events = event_cache.get(key)
+    if events is not None:
+        return events
+
+    generation = _generation
+    rows = await list_events_between(
+        session,
+        window_start,
+        window_end,
+        event_type=event_type,
+        severity=severity,
+        is_verified=is_verified,
+        limit=MAX_CACHED_EVENTS + 1,
+    )
+    if len(rows) > MAX_CACHED_EVENTS:
+        return None
+    events = tuple(EventRead.model_validate(row) for row in rows)
+    if generation == _generation:
+        event_cache.set(key, events)
+    return events
+
+
+async def events_on_day(
+        session: AsyncSession,
+        day: date,
+        *,
+        tz: timezone = timezone.utc,
+        event_type: EventType | None = None,
+        severity: EventSeverity | None = None,
+        is_verified: bool | None = None,
+        limit: int = 500,
+        offset: int = 0,
+) -> list[EventRead]:
+    day_start, day_end = day_window(day, tz=tz)
+    events = await _cached_window(session, "day", day_start, day_end, event_type, severity, is_verified)
+    if events is None:
+        rows = await list_events_between(
+            session,
+            day_start,
+            day_end,
+            event_type=event_type,
+            severity=severity,
+            is_verified=is_verified,
+            limit=limit,
+            offset=offset,
+        )
+        return [EventRead.model_validate(row) for row in rows]
+    return list(events[offset: offset + limit])
+
+
+async def events_around(
+        session: AsyncSession,
+        at: datetime,
+        *,
+        threshold_hours: int = 3,
+        event_type: EventType | None = None,
+        severity: EventSeverity | None = None,
+        is_verified: bool | None = None,
+        limit: int = 500,
+        offset: int = 0,
+) -> list[EventRead]:
+    """
+    `/events/around` przez cache: w cache trafia nadzbiór dla całego kubełka `at`
+    (EVENT_CACHE_AT_BUCKET_MINUTES), a dokładne okno ±threshold_hours jest wycinane w pamięci.
+    """
+    at = _as_utc(at)
+    threshold = timedelta(hours=threshold_hours)
+    bucket = timedelta(minutes=settings.EVENT_CACHE_AT_BUCKET_MINUTES)
+    bucket_start = datetime.fromtimestamp(
+        at.timestamp() // bucket.total_seconds() * bucket.total_seconds(), tz=timezone.utc
+    )
+    events = await _cached_window(
+        session,
+        "around",
+        bucket_start - threshold,
+        bucket_start + bucket + threshold,
+        event_type,
+        severity,
+        is_verified,
+    )
+    window_start, window_end = at - threshold, at + threshold
+    if events is None:
+        rows = await list_events_between(
+            session,
+            window_start,
+            window_end,
+            event_type=event_type,
+            severity=severity,
+            is_verified=is_verified,
+            limit=limit,
+            offset=offset,
+        )
+        return [EventRead.model_validate(row) for row in rows]
+
+    matching = [
+        evt for evt in events
+        if _as_utc(evt.starts_at) <= window_end and _as_utc(evt.ends_at) >= window_start
+    ]
+    return matching[offset: offset + limit]
@@ -0,0 +1,138 @@
+import csv
+from collections.abc import AsyncIterable, AsyncIterator
+from enum import Enum
+from typing import Any
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.event import existing_window, upsert_events
+from app.schemas.event import EventCreate, EventImportError, EventImportResult
+from app.services.event_cache import invalidate_window
+
+# Ile błędów walidacji zwracamy w odpowiedzi; reszta jest tylko liczona.
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @classmethod
+    def from_content_type(cls, content_type: str | None) -> "ImportFormat":
+        if content_type and content_type.split(";")[0].strip().lower() in ("text/csv", "application/csv"):
+            return cls.CSV
+        return cls.NDJSON
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Splits a byte stream into text lines without reading it whole; strips a UTF-8 BOM and CR."""
+    buffer = b""
+    first = True
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line = raw.decode("utf-8").rstrip("\r")
+            if first:
+                line, first = line.lstrip("\ufeff"), False
+            yield line
+    if buffer:
+        line = buffer.decode("utf-8").rstrip("\r")
+        yield line.lstrip("\ufeff") if first else line
+
+
+async def _ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, Any]]:
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            yield line_no, orjson.loads(line)
+        except orjson.JSONDecodeError as exc:
+            yield line_no, ValueError(f"Invalid JSON: {exc}")
+
+
+async def _csv_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, Any]]:
+    header: list[str] | None = None
+    record_no = 0
+    pending: list[str] = []
+    async for line in lines:
+        pending.append(line)
+        # Pole w cudzysłowie może zawierać znak nowej linii – rekord kończy się przy parzystej liczbie cudzysłowów.
+        record = "\n".join(pending)
+        if record.count('"') % 2:
+            continue
+        pending = []
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        record_no += 1
+        if len(values) != len(header):
+            yield record_no, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        # Puste komórki traktujemy jak brak wartości, żeby działały wartości domyślne schematu.
+        yield record_no, {name: value for name, value in zip(header, values, strict=True) if value != ""}
+    if pending:
+        yield record_no + 1, ValueError("Unterminated quoted field")
+
+
+async def _write_batch(session: AsyncSession, batch: list[dict[str, Any]]) -> int:
+    if not batch:
+        return 0
+    # Unieważniamy okna nowych wartości i – dla nadpisywanych zdarzeń – poprzednich.
+    keys = [(row["source"], row["external_id"]) for row in batch if row["source"] and row["external_id"]]
+    previous = await existing_window(session, keys)
+    count = await upsert_events(session, batch)
+    invalidate_window(min(row["starts_at"] for row in batch), max(row["ends_at"] for row in batch))
+    if previous is not None:
+        invalidate_window(*previous)
+    return count
+
+
+def _describe(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in err['loc']) or 'record'}: {err['msg']}" for err in exc.errors()
+        )
+    return str(exc)
+
+
+async def import_events(
+        session: AsyncSession,
+        chunks: AsyncIterable[bytes],
+        fmt: ImportFormat,
+        *,
+        batch_size: int,
+) -> EventImportResult:
+    """
+    Strumieniowy import zdarzeń: rekordy są walidowane `EventCreate` i zapisywane partiami po `batch_size`
+    (executemany + upsert po (source, external_id), jedna transakcja na partię). Błędne rekordy są pomijane.
+    """
+    records = (_csv_records if fmt is ImportFormat.CSV else _ndjson_records)(iter_lines(chunks))
+    result = EventImportResult()
+    batch: list[dict[str, Any]] = []
+
+    async for line_no, record in records:
+        result.received += 1
+        try:
+            if isinstance(record, Exception):
+                raise record
+            batch.append(EventCreate.model_validate(record).model_dump())
+        except ValueError as exc:  # ValidationError też dziedziczy po ValueError
+            result.failed += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(EventImportError(line=line_no, error=_describe(exc)))
+            continue
+
+        if len(batch) >= batch_size:
+            result.upserted += await _write_batch(session, batch)
+            batch = []
+
+    result.upserted += await _write_batch(session, batch)
+    return result
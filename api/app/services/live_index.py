@@ -0,0 +1,302 @@
+import dataclasses
+import logging
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import ClassVar
+
+from app.core.config import settings
+from app.db.models.report import Report, ReportType
+from app.schemas.report import ModerationStatus
+from app.utils.geo import EARTH_RADIUS_KM, BBox, cell_ranges, radius_bbox
+from app.utils.pagination import Page, page_from
+
+try:
+    import numpy as np
+except ImportError:  # numpy jest opcjonalny – bez niego indeks jest wyłączony
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Powyżej tej liczby komórek siatki taniej jest przeliczyć wszystkie sloty wektorowo.
+_MAX_GRID_LOOKUPS = 4096
+
+
+@dataclass(frozen=True, slots=True)
+class LiveReport:
+    """Detached snapshot of a report; exposes the same attributes as the `Report` ORM model."""
+
+    # Snapshoty powstają tylko dla zgłoszeń widocznych.
+    moderation_status: ClassVar[ModerationStatus] = ModerationStatus.APPROVED
+
+    id: int
+    type: ReportType
+    latitude: float
+    longitude: float
+    geo_cell: int
+    name: str | None
+    description: str | None
+    photo_path: str | None
+    likes: int
+    confirmations: int
+    denials: int
+    created_at: datetime
+
+    @classmethod
+    def from_report(cls, obj: Report) -> "LiveReport":
+        return cls(
+            id=obj.id,
+            type=obj.type,
+            latitude=obj.latitude,
+            longitude=obj.longitude,
+            geo_cell=obj.geo_cell,
+            name=obj.name,
+            description=obj.description,
+            photo_path=obj.photo_path,
+            likes=obj.likes,
+            confirmations=obj.confirmations,
+            denials=obj.denials,
+            created_at=obj.created_at,
+        )
+
+
+def _timestamp(dt: datetime) -> float:
+    # SQLite zwraca naiwne daty (zapisywane w UTC).
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class LiveReportIndex:
+    """
+    Bounded in-memory index of recent reports.
+
+    Coordinates live in preallocated NumPy arrays (one slot per report) and a grid maps `geo_cell`
+    to slots, so "what's near me right now" is a dict lookup plus a vectorized haversine over
+    the candidates. Reports older than `max_age` are evicted; when all `max_items` slots are
+    taken the oldest report is dropped, and windows reaching back to it are no longer covered.
+    """
+
+    def __init__(self, *, max_items: int, max_age: timedelta, enabled: bool = True) -> None:
+        self.max_items = max_items
+        self.max_age = max_age
+        self.enabled = enabled and np is not None
+        if enabled and np is None:
+            logger.warning("numpy is not installed – live report index disabled")
+
+        self._lock = threading.Lock()
+        self._records: list[LiveReport | None] = [None] * max_items if self.enabled else []
+        self._slot_by_id: dict[int, int] = {}
+        self._grid: dict[int, set[int]] = {}
+        self._free: list[int] = list(range(max_items - 1, -1, -1)) if self.enabled else []
+        # Najnowszy `created` wyrzucony z braku miejsca – okno sięgające do niego ma luki.
+        self._evicted_until = float("-inf")
+        if self.enabled:
+            self._used = np.zeros(max_items, dtype=np.bool_)
+            self._lat = np.zeros(max_items, dtype=np.float64)
+            self._lng = np.zeros(max_items, dtype=np.float64)
+            self._created = np.zeros(max_items, dtype=np.float64)
+            self._ids = np.zeros(max_items, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._slot_by_id)
+
+    def covers(self, max_age: timedelta | None) -> bool:
+        """Whether a query limited to reports newer than `max_age` can be answered from the index."""
+        if not self.enabled or max_age is None or max_age > self.max_age:
+            return False
+        return self._cutoff(max_age) > self._evicted_until
+
+    def _cutoff(self, max_age: timedelta) -> float:
+        return datetime.now(timezone.utc).timestamp() - max_age.total_seconds()
+
+    def _release(self, slot: int) -> None:
+        record = self._records[slot]
+        if record is None:
+            return
+        self._records[slot] = None
+        self._used[slot] = False
+        del self._slot_by_id[record.id]
+        cell_slots = self._grid.get(record.geo_cell)
+        if cell_slots is not None:
+            cell_slots.discard(slot)
+            if not cell_slots:
+                del self._grid[record.geo_cell]
+        self._free.append(slot)
+
+    def _evict_expired(self) -> None:
+        expired = np.flatnonzero(self._used & (self._created < self._cutoff(self.max_age)))
+        for slot in expired.tolist():
+            self._release(slot)
+
+    def _evict_oldest(self) -> None:
+        created = np.where(self._used, self._created, np.inf)
+        slot = int(np.argmin(created))
+        self._evicted_until = max(self._evicted_until, float(created[slot]))
+        self._release(slot)
+
+    def _put(self, record: LiveReport) -> None:
+        created = _timestamp(record.created_at)
+        if created < self._cutoff(self.max_age):
+            return
+
+        slot = self._slot_by_id.get(record.id)
+        if slot is not None:
+            self._release(slot)
+        if not self._free:
+            self._evict_expired()
+        if not self._free:
+            self._evict_oldest()
+
+        slot = self._free.pop()
+        self._records[slot] = record
+        self._slot_by_id[record.id] = slot
+        self._grid.setdefault(record.geo_cell, set()).add(slot)
+        self._used[slot] = True
+        self._lat[slot] = record.latitude
+        self._lng[slot] = record.longitude
+        self._created[slot] = created
+        self._ids[slot] = record.id
+
+    def add(self, obj: Report) -> None:
+        if not self.enabled:
+            return
+        record = LiveReport.from_report(obj)
+        with self._lock:
+            self._put(record)
+
+    def update(self, obj: Report) -> None:
+        """Refresh a report that is already indexed (e.g. after a vote); unknown reports are ignored."""
+        if not self.enabled:
+            return
+        with self._lock:
+            slot = self._slot_by_id.get(obj.id)
+            if slot is None:
+                return
+            self._records[slot] = dataclasses.replace(
+                self._records[slot],
+                likes=obj.likes,
+                confirmations=obj.confirmations,
+                denials=obj.denials,
+            )
+
+    def get(self, report_id: int) -> LiveReport | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            slot = self._slot_by_id.get(report_id)
+            return self._records[slot] if slot is not None else None
+
+    def add_counts(self, report_id: int, deltas: dict[str, int]) -> None:
+        """Applies counter deltas flushed by the vote buffer to an indexed report."""
+        if not self.enabled:
+            return
+        with self._lock:
+            slot = self._slot_by_id.get(report_id)
+            if slot is None:
+                return
+            record = self._records[slot]
+            self._records[slot] = dataclasses.replace(
+                record,
+                **{field: getattr(record, field) + delta for field, delta in deltas.items()},
+            )
+
+    def rebuild(self, reports: Iterable[Report]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            for slot in list(self._slot_by_id.values()):
+                self._release(slot)
+            self._evicted_until = float("-inf")
+            for obj in reports:
+                self._put(LiveReport.from_report(obj))
+        logger.info("Live report index rebuilt with %d reports", len(self))
+
+    def _candidate_slots(self, bbox: BBox) -> "np.ndarray":
+        ranges = cell_ranges(bbox, max_ranges=_MAX_GRID_LOOKUPS)
+        if ranges is None or sum(hi - lo + 1 for lo, hi in ranges) > _MAX_GRID_LOOKUPS:
+            return np.flatnonzero(self._used)
+        slots: list[int] = []
+        for lo, hi in ranges:
+            for cell in range(lo, hi + 1):
+                cell_slots = self._grid.get(cell)
+                if cell_slots:
+                    slots.extend(cell_slots)
+        return np.fromiter(slots, dtype=np.int64, count=len(slots))
+
+    def _page(
+            self,
+            slots: "np.ndarray",
+            *,
+            skip: int,
+            limit: int,
+            cursor: tuple[datetime, int] | None,
+            with_total: bool,
+    ) -> Page[LiveReport]:
+        total = int(slots.size)
+        if cursor is not None:
+            created, id_ = _timestamp(cursor[0]), cursor[1]
+            slot_created = self._created[slots]
+            slots = slots[(slot_created < created) | ((slot_created == created) & (self._ids[slots] < id_))]
+        # Od najnowszych, remisy po id malejąco – tak samo jak zapytanie SQL.
+        order = np.lexsort((-self._ids[slots], -self._created[slots]))
+        page = slots[order[skip: skip + limit + 1]]
+        return page_from(
+            [self._records[slot] for slot in page.tolist()],
+            limit,
+            total if with_total else None,
+        )
+
+    def query_radius(
+            self,
+            *,
+            lat: float,
+            lng: float,
+            radius_km: float,
+            max_age: timedelta,
+            skip: int,
+            limit: int,
+            cursor: tuple[datetime, int] | None = None,
+            with_total: bool = True,
+    ) -> Page[LiveReport]:
+        with self._lock:
+            slots = self._candidate_slots(radius_bbox(lat, lng, radius_km))
+            slots = slots[self._created[slots] >= self._cutoff(max_age)]
+
+            lat0, lng0 = np.radians(lat), np.radians(lng)
+            lat1, lng1 = np.radians(self._lat[slots]), np.radians(self._lng[slots])
+            a = np.sin((lat1 - lat0) / 2) ** 2 + np.cos(lat0) * np.cos(lat1) * np.sin((lng1 - lng0) / 2) ** 2
+            distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+            return self._page(
+                slots[distance <= radius_km], skip=skip, limit=limit, cursor=cursor, with_total=with_total
+            )
+
+    def query_bbox(
+            self,
+            *,
+            bbox: BBox,
+            max_age: timedelta,
+            skip: int,
+            limit: int,
+            cursor: tuple[datetime, int] | None = None,
+            with_total: bool = True,
+    ) -> Page[LiveReport]:
+        with self._lock:
+            slots = self._candidate_slots(bbox)
+            slots = slots[self._created[slots] >= self._cutoff(max_age)]
+
+            lat, lng = self._lat[slots], self._lng[slots]
+            inside = (lat >= bbox.min_lat) & (lat <= bbox.max_lat)
+            if bbox.crosses_antimeridian:
+                inside &= (lng >= bbox.min_lng) | (lng <= bbox.max_lng)
+            else:
+                inside &= (lng >= bbox.min_lng) & (lng <= bbox.max_lng)
+            return self._page(slots[inside], skip=skip, limit=limit, cursor=cursor, with_total=with_total)
+
+
+live_index = LiveReportIndex(
+    max_items=settings.LIVE_INDEX_MAX_ITEMS,
+    max_age=timedelta(minutes=settings.LIVE_INDEX_MAX_AGE_MINUTES),
+    enabled=settings.LIVE_INDEX_ENABLED,
+)
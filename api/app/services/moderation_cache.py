@@ -0,0 +1,126 @@
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.repositories.moderation import get_verdict, purge_expired, store_verdict
+from app.utils.cache import TTLCache, register_stats
+
+logger = logging.getLogger(__name__)
+
+# Co tyle zapisów do tabeli usuwamy z niej wygasłe werdykty.
+_PURGE_EVERY = 500
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # SQLite zwraca naiwne daty (zapisywane w UTC).
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+class VerdictCache:
+    """
+    Two-tier cache of LLM moderation verdicts keyed on a hash of the normalized text.
+
+    The in-process LRU answers repeated phrases without I/O; the `moderation_verdicts` table keeps
+    verdicts across restarts and workers for `ttl`. With `allowed_only` rejections are never cached,
+    so a wrongly rejected phrase is re-checked on the next attempt.
+    """
+
+    def __init__(
+            self,
+            *,
+            memory: TTLCache[str, bool],
+            ttl: float,
+            allowed_only: bool = False,
+            enabled: bool = True,
+    ) -> None:
+        self.memory = memory
+        self.ttl = ttl
+        self.allowed_only = allowed_only
+        self.enabled = enabled
+        self.db_hits = 0
+        self.db_misses = 0
+        self.db_writes = 0
+        self.db_errors = 0
+
+    @staticmethod
+    def key(normalized: str) -> str:
+        """Klucz dla tekstu już znormalizowanego (`app.utils.moderation.normalize_text`)."""
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def get_local(self, key: str) -> bool | None:
+        return self.memory.get(key) if self.enabled else None
+
+    def put_local(self, key: str, allowed: bool) -> bool:
+        """Zapisuje werdykt w LRU; False, gdy werdykt nie podlega cache'owaniu."""
+        if not self.enabled or (self.allowed_only and not allowed):
+            return False
+        self.memory.set(key, allowed, ttl=min(self.memory.ttl, self.ttl))
+        return True
+
+    async def get(self, key: str) -> bool | None:
+        if not self.enabled:
+            return None
+        allowed = self.memory.get(key)
+        if allowed is not None:
+            return allowed
+
+        now = datetime.now(timezone.utc)
+        try:
+            async with AsyncSessionLocal() as session:
+                found = await get_verdict(session, key, now)
+        except Exception:
+            self.db_errors += 1
+            logger.exception("Moderation cache lookup failed")
+            return None
+        if found is None:
+            self.db_misses += 1
+            return None
+
+        self.db_hits += 1
+        allowed, expires_at = found
+        remaining = (_as_utc(expires_at) - now).total_seconds()
+        self.memory.set(key, allowed, ttl=min(self.memory.ttl, remaining))
+        return allowed
+
+    async def put(self, key: str, allowed: bool) -> None:
+        if not self.put_local(key, allowed):
+            return
+        now = datetime.now(timezone.utc)
+        try:
+            async with AsyncSessionLocal() as session:
+                await store_verdict(session, key, allowed, now + timedelta(seconds=self.ttl))
+                self.db_writes += 1
+                if self.db_writes % _PURGE_EVERY == 0:
+                    await purge_expired(session, now)
+        except Exception:
+            self.db_errors += 1
+            logger.exception("Moderation cache write failed")
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.db_hits + self.db_misses
+        return {
+            "name": "moderation_verdicts_db",
+            "ttl_seconds": self.ttl,
+            "allowed_only": self.allowed_only,
+            "hits": self.db_hits,
+            "misses": self.db_misses,
+            "writes": self.db_writes,
+            "errors": self.db_errors,
+            "hit_rate": round(self.db_hits / lookups, 4) if lookups else None,
+        }
+
+
+verdict_cache = VerdictCache(
+    memory=TTLCache(
+        "moderation_verdicts",
+        max_size=settings.MODERATION_CACHE_MAX_ITEMS,
+        ttl=settings.MODERATION_CACHE_MEMORY_TTL_SECONDS,
+    ),
+    ttl=settings.MODERATION_CACHE_TTL_SECONDS,
+    allowed_only=settings.MODERATION_CACHE_ALLOWED_ONLY,
+    enabled=settings.MODERATION_CACHE_ENABLED,
+)
+register_stats("moderation_verdicts_db", verdict_cache.stats)
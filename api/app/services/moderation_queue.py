@@ -0,0 +1,126 @@
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.repositories.report import ReportRepository
+from app.schemas.report import ModerationStatus
+from app.services.report import ReportService
+from app.utils.moderation import amoderate_texts
+
+logger = logging.getLogger(__name__)
+
+
+class ModerationQueue:
+    """
+    Background moderation of reports created in the PENDING state.
+
+    `workers` tasks take report ids from an in-process queue, run the LLM moderation of name and
+    description and apply the verdict; an approved report is published (live index, map clusters,
+    WebSocket broadcast) only then. A failed attempt is retried with exponential backoff; reports still
+    pending at startup - e.g. after a crash - are queued again.
+    """
+
+    def __init__(
+            self,
+            *,
+            workers: int,
+            enabled: bool = True,
+            retry_base: float = 2.0,
+            retry_max: float = 300.0,
+    ) -> None:
+        self.workers = workers
+        self.enabled = enabled
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.processed = 0
+        self.failed = 0
+        self._queue: asyncio.Queue[int] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+        self._attempts: dict[int, int] = {}
+        self._retries: dict[int, asyncio.TimerHandle] = {}
+
+    def submit(self, report_id: int) -> None:
+        self._queue.put_nowait(report_id)
+
+    def _retry_later(self, report_id: int) -> float:
+        attempts = self._attempts[report_id] = self._attempts.get(report_id, 0) + 1
+        delay = min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+        self._retries[report_id] = asyncio.get_running_loop().call_later(delay, self._resubmit, report_id)
+        return delay
+
+    def _resubmit(self, report_id: int) -> None:
+        self._retries.pop(report_id, None)
+        self.submit(report_id)
+
+    async def _moderate(self, report_id: int) -> None:
+        # Sesja nie jest trzymana w trakcie wywołania LLM – odczyt i zapis werdyktu mają osobne.
+        async with AsyncSessionLocal() as session:
+            report = await ReportRepository(session).get(report_id)
+            if report is None or report.moderation_status is not ModerationStatus.PENDING:
+                return
+            name, description = report.name, report.description
+
+        description_ok, name_ok = await amoderate_texts(description, name)
+
+        async with AsyncSessionLocal() as session:
+            await ReportService(ReportRepository(session)).apply_moderation(report_id, description_ok and name_ok)
+
+    async def _run(self) -> None:
+        while True:
+            report_id = await self._queue.get()
+            try:
+                await self._moderate(report_id)
+                self.processed += 1
+                self._attempts.pop(report_id, None)
+            except Exception:
+                # Zgłoszenie zostaje PENDING (niewidoczne) – wraca do kolejki po coraz dłuższej przerwie.
+                self.failed += 1
+                delay = self._retry_later(report_id)
+                logger.exception("Moderation of report %d failed, retrying in %.0f s", report_id, delay)
+            finally:
+                self._queue.task_done()
+
+    async def start(self) -> None:
+        if not self.enabled or self._tasks:
+            return
+        # Kolejka jest tworzona w pętli zdarzeń aplikacji; zgłoszenia sprzed startu i tak są w bazie jako PENDING.
+        self._queue = asyncio.Queue()
+        async with AsyncSessionLocal() as session:
+            pending = await ReportRepository(session).pending_ids()
+        for report_id in pending:
+            self.submit(report_id)
+        if pending:
+            logger.info("Requeued %d pending reports for moderation", len(pending))
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        # Zaplanowane ponowienia przepadają – zgłoszenia PENDING wracają do kolejki przy następnym starcie.
+        for handle in self._retries.values():
+            handle.cancel()
+        self._retries.clear()
+        self._attempts.clear()
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "retrying": len(self._retries),
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+
+moderation_queue = ModerationQueue(
+    workers=settings.MODERATION_WORKERS,
+    enabled=settings.MODERATION_ASYNC_ENABLED,
+    retry_base=settings.MODERATION_RETRY_BASE_SECONDS,
+    retry_max=settings.MODERATION_RETRY_MAX_SECONDS,
+)
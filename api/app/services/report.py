@@ -1,12 +1,62 @@
-from app.repositories.report import ReportRepository
+import asyncio
+import dataclasses
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import Row
+
+from app.repositories.report import COUNTER_FIELDS, ReportRepository, invalidate_totals_at
 from app.db.models.report import Report, ReportType
+from app.schemas.report import ModerationStatus
+from app.schemas.common import TotalMode
+from app.services import clustering
+from app.services.live_index import LiveReport, LiveReportIndex, live_index
+from app.services.vote_buffer import VoteAggregator, vote_aggregator
+from app.services.ws_manager import manager
+from app.utils.geo import BBox, ClusterGrid
+from app.utils.pagination import Page
+
+logger = logging.getLogger(__name__)
+
+# Trwające rozgłoszenia WebSocket – referencja chroni zadanie przed garbage collectorem.
+_broadcasts: set[asyncio.Task] = set()
+
+
+def _broadcast_done(task: asyncio.Task) -> None:
+    _broadcasts.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Report broadcast failed", exc_info=task.exception())
+
+
+def _since(max_age: timedelta | None) -> datetime | None:
+    return datetime.now(timezone.utc) - max_age if max_age is not None else None
+
+
+def report_broadcast(obj: Report) -> dict[str, Any]:
+    """Wiadomość WebSocket o nowym (widocznym) zgłoszeniu."""
+    return {
+        "user": "Anonim",
+        "message": obj.description or obj.name or "Nowe zgłoszenie",
+        "lat": obj.latitude,
+        "lng": obj.longitude,
+        "likes": obj.likes,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
 
 
 class ReportService:
-    def __init__(self, repo: ReportRepository):
+    def __init__(
+            self,
+            repo: ReportRepository,
+            index: LiveReportIndex = live_index,
+            votes: VoteAggregator = vote_aggregator,
+    ):
         self.repo = repo
+        self.index = index
+        self.votes = votes
 
-    def create(
+    async def create(
             self,
             *,
             type_: ReportType,
@@ -15,20 +65,52 @@ class ReportService:
             name: str | None = None,
             description: str | None = None,
             photo_path: str | None = None,
+            pending: bool = False,
     ) -> Report:
-        return self.repo.create(
+        """Z `pending=True` zgłoszenie czeka na moderację w tle i nie jest jeszcze nigdzie publikowane."""
+        obj = await self.repo.create(
             type_=type_,
             lat=lat,
             lng=lng,
             name=name,
             description=description,
             photo_path=photo_path,
+            moderation_status=ModerationStatus.PENDING if pending else ModerationStatus.APPROVED,
         )
+        if not pending:
+            self._publish(obj)
+        return obj
+
+    async def apply_moderation(self, report_id: int, allowed: bool) -> Report | None:
+        """Zapisuje werdykt dla zgłoszenia PENDING; zaakceptowane jest publikowane jak nowe zgłoszenie."""
+        status = ModerationStatus.APPROVED if allowed else ModerationStatus.REJECTED
+        obj = await self.repo.set_moderation_status(report_id, status)
+        if obj is not None and allowed:
+            self._publish(obj)
+        return obj
 
-    def get(self, id_: int) -> Report | None:
-        return self.repo.get(id_)
+    def _publish(self, obj: Report) -> None:
+        self.index.add(obj)
+        clustering.invalidate_point(obj.latitude, obj.longitude)
+        invalidate_totals_at(obj.latitude, obj.longitude)
+        task = asyncio.create_task(manager.broadcast(report_broadcast(obj)))
+        _broadcasts.add(task)
+        task.add_done_callback(_broadcast_done)
 
-    def list_in_radius(
+    async def get(self, id_: int) -> Report | LiveReport | None:
+        """Zgłoszenie po id; liczniki zatwierdzonego obejmują głosy czekające jeszcze w buforze write-behind."""
+        report = await self.repo.get(id_)
+        if report is None or report.moderation_status is not ModerationStatus.APPROVED:
+            return report
+        pending = self.votes.pending_for(id_)
+        if not pending:
+            return report
+        snapshot = LiveReport.from_report(report)
+        return dataclasses.replace(
+            snapshot, **{field: getattr(snapshot, field) + delta for field, delta in pending.items()}
+        )
+
+    async def list_in_radius(
             self,
             *,
             lat: float,
@@ -36,22 +118,87 @@ class ReportService:
             radius_km: float,
             skip: int,
             limit: int,
-    ) -> tuple[list[Report], int]:
-        return self.repo.list_in_radius(
-            lat=lat, lng=lng, radius_km=radius_km, skip=skip, limit=limit
+            max_age: timedelta | None = None,
+            cursor: tuple[datetime, int] | None = None,
+            total_mode: TotalMode = TotalMode.EXACT,
+    ) -> Page[Row | LiveReport]:
+        if self.index.covers(max_age):
+            return self.index.query_radius(
+                lat=lat,
+                lng=lng,
+                radius_km=radius_km,
+                max_age=max_age,
+                skip=skip,
+                limit=limit,
+                cursor=cursor,
+                with_total=total_mode is not TotalMode.FALSE,
+            )
+        return await self.repo.list_in_radius(
+            lat=lat,
+            lng=lng,
+            radius_km=radius_km,
+            skip=skip,
+            limit=limit,
+            since=_since(max_age),
+            cursor=cursor,
+            total_mode=total_mode,
         )
 
-    def increment_counter(self, report_id: int, counter: str) -> Report | None:
-        if counter not in {"likes", "confirmations", "denials"}:
-            raise ValueError(f"Invalid counter name: {counter}")
+    async def list_in_bbox(
+            self,
+            *,
+            bbox: BBox,
+            skip: int,
+            limit: int,
+            max_age: timedelta | None = None,
+            cursor: tuple[datetime, int] | None = None,
+            total_mode: TotalMode = TotalMode.EXACT,
+    ) -> Page[Row | LiveReport]:
+        if self.index.covers(max_age):
+            return self.index.query_bbox(
+                bbox=bbox,
+                max_age=max_age,
+                skip=skip,
+                limit=limit,
+                cursor=cursor,
+                with_total=total_mode is not TotalMode.FALSE,
+            )
+        return await self.repo.list_in_bbox(
+            bbox=bbox, skip=skip, limit=limit, since=_since(max_age), cursor=cursor, total_mode=total_mode
+        )
 
-        report = self.repo.get(report_id)
-        if not report:
-            return None
+    async def clusters(
+            self,
+            *,
+            bbox: BBox,
+            zoom: int,
+            max_age: timedelta | None = None,
+    ) -> tuple[ClusterGrid, list[clustering.ClusterCell]]:
+        return await clustering.clusters_in_view(self.repo, bbox=bbox, zoom=zoom, since=_since(max_age))
+
+    async def increment_counter(self, report_id: int, counter: str) -> Report | LiveReport | None:
+        if counter not in COUNTER_FIELDS:
+            raise ValueError(f"Invalid counter name: {counter}")
 
-        current = getattr(report, counter, 0)
-        setattr(report, counter, current + 1)
+        if self.votes.enabled:
+            return await self._buffer_vote(report_id, counter)
 
-        self.repo.session.commit()
-        self.repo.session.refresh(report)
+        report = await self.repo.increment_counter(report_id, counter)
+        if report is not None:
+            self.index.update(report)
+            self.votes.touch()
         return report
+
+    async def _buffer_vote(self, report_id: int, counter: str) -> LiveReport | None:
+        """Głos trafia do bufora write-behind; zwracamy widok z uwzględnieniem niezapisanych głosów."""
+        snapshot = self.index.get(report_id)
+        if snapshot is None:
+            report = await self.repo.get(report_id)
+            if report is None or report.moderation_status is not ModerationStatus.APPROVED:
+                return None
+            snapshot = LiveReport.from_report(report)
+
+        pending = self.votes.add(report_id, counter)
+        return dataclasses.replace(
+            snapshot, **{field: getattr(snapshot, field) + delta for field, delta in pending.items()}
+        )
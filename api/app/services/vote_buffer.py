@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.repositories.report import ReportRepository
+from app.services.live_index import live_index
+
+logger = logging.getLogger(__name__)
+
+
+class VoteAggregator:
+    """
+    Write-behind buffer for like/confirm/deny votes.
+
+    Votes are summed in memory per report and flushed every `flush_interval` seconds as one batched
+    transaction, so a viral report costs one UPDATE per interval instead of one per tap.
+
+    With `enabled=False` votes are written synchronously, but the flush loop still runs: it bumps the
+    reports table version (list ETags) once per interval after `touch()` instead of once per vote.
+    """
+
+    def __init__(self, *, flush_interval: float, enabled: bool = True) -> None:
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self._pending: defaultdict[int, defaultdict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._touched = False
+        self._lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+        self._stopping: asyncio.Event | None = None
+
+    def add(self, report_id: int, field: str, by: int = 1) -> dict[str, int]:
+        """Buffers a vote and returns all deltas still pending for the report."""
+        with self._lock:
+            counts = self._pending[report_id]
+            counts[field] += by
+            return dict(counts)
+
+    def pending_for(self, report_id: int) -> dict[str, int]:
+        with self._lock:
+            return dict(self._pending.get(report_id, {}))
+
+    def touch(self) -> None:
+        """Marks a synchronously written vote; the table version is bumped on the next flush."""
+        with self._lock:
+            self._touched = True
+
+    def _drain(self) -> tuple[dict[int, dict[str, int]], bool]:
+        with self._lock:
+            drained = {id_: dict(counts) for id_, counts in self._pending.items()}
+            self._pending.clear()
+            touched, self._touched = self._touched, False
+        return drained, touched
+
+    def _restore(self, deltas: dict[int, dict[str, int]], touched: bool) -> None:
+        with self._lock:
+            for id_, counts in deltas.items():
+                for field, value in counts.items():
+                    self._pending[id_][field] += value
+            self._touched = self._touched or touched
+
+    async def flush(self) -> int:
+        """Writes all pending deltas; on failure they go back to the buffer. Returns the number of reports."""
+        deltas, touched = self._drain()
+        if not deltas and not touched:
+            return 0
+        try:
+            async with AsyncSessionLocal() as session:
+                repo = ReportRepository(session)
+                if deltas:
+                    # Podbija też wersję tabeli – jeden raz dla całego flusha.
+                    await repo.apply_counter_deltas(deltas)
+                else:
+                    await repo.bump_list_version()
+        except Exception:
+            logger.exception("Vote flush failed, %d reports kept for retry", len(deltas))
+            self._restore(deltas, touched)
+            return 0
+
+        for id_, counts in deltas.items():
+            live_index.add_counts(id_, counts)
+        return len(deltas)
+
+    async def _run(self, stopping: asyncio.Event) -> None:
+        while not stopping.is_set():
+            try:
+                await asyncio.wait_for(stopping.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run(self._stopping))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            # Bez cancel(): CancelledError w trakcie zapisu ominąłby `_restore` i zgubił pobrane głosy.
+            # Pętla kończy się po bieżącym flushu, a resztę zapisuje flush poniżej.
+            self._stopping.set()
+            await self._task
+            self._task = None
+            self._stopping = None
+        await self.flush()
+
+
+vote_aggregator = VoteAggregator(
+    flush_interval=settings.VOTE_FLUSH_INTERVAL_MS / 1000,
+    enabled=settings.VOTE_WRITE_BEHIND_ENABLED,
+)
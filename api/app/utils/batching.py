@@ -0,0 +1,80 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collects items submitted within `max_wait` seconds (or until `max_items` are pending) and passes
+    them to `handler` in one call; every caller gets the result for its own item.
+
+    `handler` receives distinct items and must return one result per item, in order. Identical items
+    submitted while a batch is open share a single slot.
+    """
+
+    def __init__(
+            self,
+            handler: Callable[[list[T]], Awaitable[list[R]]],
+            *,
+            max_items: int,
+            max_wait: float,
+    ) -> None:
+        self.handler = handler
+        self.max_items = max_items
+        self.max_wait = max_wait
+        self.batches = 0
+        self.items = 0
+        self._pending: dict[T, asyncio.Future] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> R:
+        future = self._pending.get(item)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[item] = future
+            if len(self._pending) >= self.max_items:
+                self._flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        # Anulowanie jednego wywołującego nie anuluje wyniku dla pozostałych.
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[T, asyncio.Future]) -> None:
+        items = list(batch)
+        self.batches += 1
+        self.items += len(items)
+        try:
+            results = await self.handler(items)
+            if len(results) != len(items):
+                raise ValueError(f"Batch handler returned {len(results)} results for {len(items)} items")
+        except Exception as exc:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for item, result in zip(items, results, strict=True):
+            if not batch[item].done():
+                batch[item].set_result(result)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else None,
+            "pending": len(self._pending),
+        }
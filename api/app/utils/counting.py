@@ -0,0 +1,36 @@
+from collections.abc import Awaitable, Callable, Hashable
+
+from app.core.config import settings
+from app.schemas.common import TotalMode
+from app.utils.cache import TTLCache
+
+count_cache: TTLCache[Hashable, int] = TTLCache(
+    "list_totals",
+    max_size=settings.COUNT_CACHE_MAX_ITEMS,
+    ttl=settings.COUNT_CACHE_TTL_SECONDS,
+)
+
+
+async def known_total(
+        mode: TotalMode, key: Hashable, counter: Callable[[], Awaitable[int | None]] | None = None
+) -> int | None:
+    """
+    Total available without counting rows: for `approx`, an incrementally kept counter
+    (when the query has no filters) or a cached count. None means "count it" – unless mode is `false`.
+    """
+    if mode is not TotalMode.APPROX:
+        return None
+    if counter is not None:
+        value = await counter()
+        if value is not None:
+            return value
+    return count_cache.get(key)
+
+
+def needs_count(mode: TotalMode, total: int | None) -> bool:
+    return mode is not TotalMode.FALSE and total is None
+
+
+def store_total(key: Hashable, value: int) -> int:
+    count_cache.set(key, value)
+    return value
@@ -0,0 +1,178 @@
+from dataclasses import dataclass
+from math import asin, ceil, cos, degrees, floor, log2, pi, radians, sin, sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+METERS_PER_DEGREE = 2 * pi * EARTH_RADIUS_KM * 1000 / 360
+
+# Siatka stałej rozdzielczości (~1.1 km na równiku) używana jako indeksowana kolumna `geo_cell`.
+GRID_CELL_DEG = 0.01
+GRID_ROWS = round(180 / GRID_CELL_DEG)
+GRID_COLS = round(360 / GRID_CELL_DEG)
+
+# Powyżej tej liczby zakresów komórek prefiltr po `geo_cell` przestaje się opłacać
+# i zapytanie przechodzi na zwykły bounding box po `latitude`/`longitude`.
+MAX_CELL_RANGES = 64
+
+
+@dataclass(frozen=True, slots=True)
+class BBox:
+    """Bounding box in degrees. `min_lng > max_lng` means the box crosses the antimeridian."""
+
+    min_lat: float
+    min_lng: float
+    max_lat: float
+    max_lng: float
+
+    @property
+    def crosses_antimeridian(self) -> bool:
+        return self.min_lng > self.max_lng
+
+    @property
+    def is_global(self) -> bool:
+        return self.min_lat <= -90 and self.max_lat >= 90 and self.min_lng <= -180 and self.max_lng >= 180
+
+    def lng_intervals(self) -> list[tuple[float, float]]:
+        if self.crosses_antimeridian:
+            return [(self.min_lng, 180.0), (-180.0, self.max_lng)]
+        return [(self.min_lng, self.max_lng)]
+
+    def contains(self, lat: float, lng: float) -> bool:
+        if not self.min_lat <= lat <= self.max_lat:
+            return False
+        return any(lo <= lng <= hi for lo, hi in self.lng_intervals())
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in kilometers."""
+    dlat = radians(lat2 - lat1)
+    dlng = radians(lng2 - lng1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+def radius_bbox(lat: float, lng: float, radius_km: float) -> BBox:
+    """
+    Smallest lat/lng box containing the circle of `radius_km` around (lat, lng).
+
+    Near the poles, or when the radius spans half the globe, the box degrades to full longitude range.
+    """
+    dlat = degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat = max(-90.0, lat - dlat)
+    max_lat = min(90.0, lat + dlat)
+
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return BBox(min_lat, -180.0, max_lat, 180.0)
+
+    ratio = sin(radius_km / EARTH_RADIUS_KM) / cos(radians(lat))
+    if ratio >= 1.0:
+        return BBox(min_lat, -180.0, max_lat, 180.0)
+
+    dlng = degrees(asin(ratio))
+    min_lng = lng - dlng
+    max_lng = lng + dlng
+    if min_lng < -180.0:
+        min_lng += 360.0
+    if max_lng > 180.0:
+        max_lng -= 360.0
+    return BBox(min_lat, min_lng, max_lat, max_lng)
+
+
+def _grid_row(lat: float) -> int:
+    return min(max(int((lat + 90.0) / GRID_CELL_DEG), 0), GRID_ROWS - 1)
+
+
+def _grid_col(lng: float) -> int:
+    return min(max(int((lng + 180.0) / GRID_CELL_DEG), 0), GRID_COLS - 1)
+
+
+def grid_cell(lat: float, lng: float) -> int:
+    """Id of the grid cell containing the point: `row * GRID_COLS + col`."""
+    return _grid_row(lat) * GRID_COLS + _grid_col(lng)
+
+
+def cell_ranges(bbox: BBox, max_ranges: int = MAX_CELL_RANGES) -> list[tuple[int, int]] | None:
+    """
+    Contiguous `geo_cell` id ranges covering the bbox (one or two per grid row).
+
+    Returns None when the box needs more than `max_ranges` ranges — caller should fall back to a plain
+    lat/lng range filter.
+    """
+    rows = range(_grid_row(bbox.min_lat), _grid_row(bbox.max_lat) + 1)
+    col_spans = [(_grid_col(lo), _grid_col(hi)) for lo, hi in bbox.lng_intervals()]
+    if len(rows) * len(col_spans) > max_ranges:
+        return None
+    return [(row * GRID_COLS + lo, row * GRID_COLS + hi) for row in rows for lo, hi in col_spans]
+
+
+def cluster_factor(zoom: int) -> int:
+    """
+    Side of a map cluster in grid cells for a web-map zoom level: a power of two close to a quarter
+    of a 256 px tile, so clusters of neighbouring zoom levels nest.
+    """
+    cells = 360 / 2 ** zoom / 4 / GRID_CELL_DEG
+    return 1 << floor(log2(cells)) if cells >= 2 else 1
+
+
+@dataclass(frozen=True, slots=True)
+class ClusterGrid:
+    """Coarse grid of `factor` x `factor` `geo_cell`s; cluster id is `row * cols + col`."""
+
+    factor: int
+
+    @property
+    def cols(self) -> int:
+        return ceil(GRID_COLS / self.factor)
+
+    @property
+    def cell_deg(self) -> float:
+        return self.factor * GRID_CELL_DEG
+
+    def rows_for(self, bbox: BBox) -> range:
+        return range(_grid_row(bbox.min_lat) // self.factor, _grid_row(bbox.max_lat) // self.factor + 1)
+
+    def col_spans_for(self, bbox: BBox) -> list[tuple[int, int]]:
+        return [(_grid_col(lo) // self.factor, _grid_col(hi) // self.factor) for lo, hi in bbox.lng_intervals()]
+
+    def keys_for(self, bbox: BBox) -> list[int]:
+        spans = self.col_spans_for(bbox)
+        return [row * self.cols + col for row in self.rows_for(bbox) for lo, hi in spans for col in range(lo, hi + 1)]
+
+    def key_of(self, lat: float, lng: float) -> int:
+        return (_grid_row(lat) // self.factor) * self.cols + _grid_col(lng) // self.factor
+
+    def key_of_cell(self, cell: int) -> int:
+        """Key of the coarse cell containing `geo_cell` `cell`."""
+        return (cell // GRID_COLS // self.factor) * self.cols + (cell % GRID_COLS) // self.factor
+
+    def bounds(self, key: int) -> BBox:
+        row, col = divmod(key, self.cols)
+        min_lat, min_lng = row * self.cell_deg - 90.0, col * self.cell_deg - 180.0
+        return BBox(min_lat, min_lng, min(min_lat + self.cell_deg, 90.0), min(min_lng + self.cell_deg, 180.0))
+
+
+# Klasy zasięgu zdarzeń: klasa `c < REACH_CLASS_MAX` obejmuje promienie do 2**c km, a środek zdarzenia
+# trafia do komórki `reach_grid(c)` (bok ~1.1 * 2**c km) – punkt w zasięgu leży w kilku sąsiednich komórkach.
+# Najwyższa klasa zbiera zasięgi ponad 2**(REACH_CLASS_MAX - 1) km i nie ma prefiltra przestrzennego.
+REACH_CLASS_MAX = 12
+
+
+def reach_class(radius_m: float) -> int:
+    """Smallest `c` with `radius_m <= 2**c` km, capped at `REACH_CLASS_MAX`."""
+    km = radius_m / 1000
+    return min(ceil(log2(km)), REACH_CLASS_MAX) if km > 1 else 0
+
+
+def reach_grid(class_: int) -> ClusterGrid:
+    return ClusterGrid(1 << min(class_, REACH_CLASS_MAX))
+
+
+def max_reach_km(class_: int) -> float | None:
+    """Upper bound on the radius of events in `class_`; None for the open-ended top class."""
+    if class_ >= REACH_CLASS_MAX:
+        return None
+    return float(2 ** class_)
+
+
+def cell_center(row: float, col: float) -> tuple[float, float]:
+    """(lat, lng) of the centre of a grid cell; fractional row/col (e.g. averages) are allowed."""
+    return (row + 0.5) * GRID_CELL_DEG - 90.0, (col + 0.5) * GRID_CELL_DEG - 180.0
@@ -0,0 +1,19 @@
+from datetime import datetime, timedelta
+from math import ceil
+
+# Klasy długości zdarzeń: klasa `c` obejmuje przedziały trwające najwyżej 2**c minut.
+# Najwyższa klasa zbiera wszystko dłuższe niż 2**18 minut (~6 miesięcy) i nie ma górnego ograniczenia.
+DURATION_CLASS_MAX = 19
+
+
+def duration_class(starts_at: datetime, ends_at: datetime) -> int:
+    """Smallest `c` with `ends_at - starts_at <= 2**c` minutes, capped at `DURATION_CLASS_MAX`."""
+    minutes = ceil(max((ends_at - starts_at).total_seconds(), 0) / 60)
+    return min(max(minutes - 1, 0).bit_length(), DURATION_CLASS_MAX)
+
+
+def max_duration(class_: int) -> timedelta | None:
+    """Upper bound on the length of intervals in `class_`; None for the open-ended top class."""
+    if class_ >= DURATION_CLASS_MAX:
+        return None
+    return timedelta(minutes=2 ** class_)
@@ -1,3 +1,5 @@
+import asyncio
+
 from app.core.config import settings
 from typing import Literal, Optional
 from pydantic import BaseModel, Field
@@ -5,7 +7,8 @@ from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 
 from app.schemas.traffic import TrafficReport, DisruptionPrediction
-from app.utils.moderation import ensure_allowed_or_none  # moderacja przed LLM
+from app.utils.llm_limits import call_llm
+from app.utils.moderation import aensure_allowed_or_none, ensure_allowed_or_none  # moderacja przed LLM
 
 
 class _AssessmentModel(BaseModel):
@@ -60,28 +63,60 @@ def _missing_fields(res: _AssessmentModel) -> list[str]:
     return missing
 
 
+def _variables(report: TrafficReport, allowed_text: str) -> dict:
+    return {
+        "city": report.city,
+        "mode": report.mode,
+        "line": report.line or "unknown",
+        "lat": report.latitude,
+        "lon": report.longitude,
+        "timestamp": report.timestamp.isoformat(),
+        "user_text": allowed_text or "brak",
+    }
+
+
+# Odpowiedź, gdy LLM nie dał poprawnego wyniku (błąd, timeout, brakujące pola).
+FALLBACK_PREDICTION = DisruptionPrediction(
+    probability=0.6,
+    category="unknown",
+    reasoning="Na podstawie zgłoszenia szacowane umiarkowane ryzyko lokalnych opóźnień w najbliższym czasie.",
+    recommended_action="Sprawdź alternatywne trasy i komunikaty przewoźnika; zaplanuj dodatkowe 10–20 minut.",
+    confidence=0.55,
+)
+
+
+class AssessmentUnavailable(Exception):
+    """LLM nie dał poprawnej oceny (błąd, timeout, brakujące pola także po krótszym prompcie)."""
+
+
+def _prediction(result: Optional[_AssessmentModel]) -> DisruptionPrediction:
+    if result is None or _missing_fields(result):
+        return FALLBACK_PREDICTION.model_copy()
+
+    return DisruptionPrediction(
+        probability=result.probability,
+        category=result.category,
+        reasoning=result.reasoning.strip(),
+        recommended_action=result.recommended_action.strip(),
+        confidence=result.confidence,
+    )
+
+
 def assess_disruption(report: TrafficReport) -> Optional[DisruptionPrediction]:
     """
     1) Moderacja user_text – jeśli NIEDOZWOLONE → None (body=null).
     2) LLM structured output (1. próba).
     3) Jeśli padnie na limit tokenów / parsing: retry z krótszym promptem.
     4) Jeśli dalej źle albo brakuje pól → bezpieczny fallback (nie 503).
+
+    Wersja blokująca – w handlerach async używaj `aassess_disruption`.
     """
 
     allowed_text = ensure_allowed_or_none(report.user_text)
     if allowed_text is None:
         return None
 
-    variables = {
-        "city": report.city,
-        "mode": report.mode,
-        "line": report.line or "unknown",
-        "lat": report.latitude,
-        "lon": report.longitude,
-        "timestamp": report.timestamp.isoformat(),
-        "user_text": allowed_text or "brak",
-    }
-
+    variables = _variables(report, allowed_text)
     result: Optional[_AssessmentModel] = None
 
     try:
@@ -95,19 +130,40 @@ def assess_disruption(report: TrafficReport) -> Optional[DisruptionPrediction]:
         except Exception:
             result = None
 
-    if result is None or _missing_fields(result):
-        return DisruptionPrediction(
-            probability=0.6,
-            category="unknown",
-            reasoning="Na podstawie zgłoszenia szacowane umiarkowane ryzyko lokalnych opóźnień w najbliższym czasie.",
-            recommended_action="Sprawdź alternatywne trasy i komunikaty przewoźnika; zaplanuj dodatkowe 10–20 minut.",
-            confidence=0.55,
-        )
+    return _prediction(result)
 
-    return DisruptionPrediction(
-        probability=result.probability,
-        category=result.category,
-        reasoning=result.reasoning.strip(),
-        recommended_action=result.recommended_action.strip(),
-        confidence=result.confidence,
-    )
+
+async def aassess_disruption(report: TrafficReport) -> Optional[DisruptionPrediction]:
+    """
+    Jak `assess_disruption`, ale przez `ainvoke`: wywołania idą pod globalnym limitem równoległości LLM,
+    każde z limitem czasu LLM_TIMEOUT_SECONDS. Po timeoucie nie ponawiamy krótszym promptem
+    (to tylko podwoiłoby czas odpowiedzi).
+
+    Zamiast FALLBACK_PREDICTION rzuca `AssessmentUnavailable` – wywołujący sam wybiera zastępczą odpowiedź
+    i wie, że nie jest to wynik LLM (np. nie zapisuje jej w cache).
+    """
+    allowed_text = await aensure_allowed_or_none(report.user_text)
+    if allowed_text is None:
+        return None
+
+    variables = _variables(report, allowed_text)
+    result: Optional[_AssessmentModel] = None
+
+    try:
+        result = await call_llm(_BASE_PROMPT | _structured, variables, timeout=settings.LLM_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError as exc:
+        raise AssessmentUnavailable("LLM timed out") from exc
+    except Exception:
+        result = None
+
+    if result is None or _missing_fields(result):
+        try:
+            result = await call_llm(
+                _SHORT_PROMPT | _structured_short, variables, timeout=settings.LLM_TIMEOUT_SECONDS
+            )
+        except Exception as exc:
+            raise AssessmentUnavailable("LLM call failed") from exc
+        if result is None or _missing_fields(result):
+            raise AssessmentUnavailable("LLM returned an incomplete assessment")
+
+    return _prediction(result)
@@ -0,0 +1,20 @@
+import asyncio
+from typing import Any
+
+from app.core.config import settings
+
+# Wspólny limit równoległych wywołań LLM dla całego procesu (moderacja + ocena zakłóceń).
+llm_semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+
+
+async def call_llm(runnable: Any, inputs: dict[str, Any], *, timeout: float) -> Any:
+    """
+    `runnable.ainvoke(inputs)` pod globalnym semaforem; `timeout` obejmuje też czekanie na slot.
+
+    Rzuca `asyncio.TimeoutError` po przekroczeniu czasu – wywołanie LLM jest wtedy anulowane.
+    """
+    async def limited() -> Any:
+        async with llm_semaphore:
+            return await runnable.ainvoke(inputs)
+
+    return await asyncio.wait_for(limited(), timeout)
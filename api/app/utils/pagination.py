@@ -1,7 +1,12 @@
-from typing import Annotated
+import base64
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Annotated, Generic, TypeVar
 
 from fastapi import Query
 
+T = TypeVar("T")
+
 
 class PaginationParams:
     """
@@ -15,3 +20,44 @@ class PaginationParams:
     ):
         self.limit = limit
         self.offset = offset
+
+
+@dataclass(slots=True)
+class Page(Generic[T]):
+    """One page of results from a repository query."""
+
+    items: list[T]
+    total: int | None = None
+    next_cursor: str | None = None
+
+
+def encode_cursor(created_at: datetime, id_: int) -> str:
+    """Opaque keyset cursor for `(created_at, id)` ordering."""
+    raw = f"{created_at.isoformat()}|{id_}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def cursor_time(dt: datetime) -> datetime:
+    """Data w konwencji kursora: naiwna, w UTC (jak `created_at` z SQLite)."""
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo is not None else dt
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Inverse of `encode_cursor`; raises ValueError on a malformed cursor. The time is returned as naive UTC
+    whatever offset the cursor carries (e.g. minted on Postgres, or built by hand).
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, id_ = raw.rsplit("|", 1)
+        return cursor_time(datetime.fromisoformat(created_at)), int(id_)
+    except (ValueError, UnicodeDecodeError, OverflowError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def page_from(items: list, limit: int, total: int | None = None) -> Page:
+    """Build a page from up to `limit + 1` rows; the extra row only signals that a next page exists."""
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_cursor = encode_cursor(items[-1].created_at, items[-1].id) if has_more else None
+    return Page(items=items, total=total, next_cursor=next_cursor)
@@ -0,0 +1,17 @@
+import re
+
+_LINE_SEPARATORS = re.compile(r"[,;/|\s]+")
+
+
+def split_lines(affected_lines: str | None) -> list[str]:
+    """Normalized, de-duplicated line codes from a free-form list such as `'52, a;D'` -> `['52', 'A', 'D']`."""
+    if not affected_lines:
+        return []
+    lines = (part.strip().upper() for part in _LINE_SEPARATORS.split(affected_lines))
+    return list(dict.fromkeys(line for line in lines if line))
+
+
+def normalize_carrier(carrier: str | None) -> str | None:
+    if carrier is None:
+        return None
+    return carrier.strip().lower() or None
@@ -0,0 +1,107 @@
+"""
+Microbenchmark: jednoprzebiegowy `_PROFANITY` vs poprzedni matcher (15 wzorców na tekście surowym i znormalizowanym).
+
+Uruchamiaj z katalogu api/:  python -m scripts.bench_profanity [--texts 20000] [--repeat 5]
+Sprawdza też, że oba matchery dają ten sam wynik na całym korpusie.
+"""
+import argparse
+import random
+import re
+import timeit
+import unicodedata
+
+from app.utils.moderation import _BAD_WORDS, _OBFUSCATED, _PL_MAP, _looks_profanity, normalize_text
+
+_PHRASES = [
+    "Tramwaj 52 stoi na moście Dębnickim", "korek na Alejach od ronda Mogilskiego",
+    "wypadek na skrzyżowaniu, dwa auta", "autobus nie przyjechał, czekam 20 minut",
+    "Roboty drogowe na Kapelance, objazd przez Monte Cassino", "Zatrzymanie ruchu tramwajów na Dietla",
+    "Światła nie działają przy Rondzie Grunwaldzkim", "metro opóźnione ~15 min", "Policja kieruje ruchem",
+    "Linia 8 skrócona do Łagiewnik", "pociąg do Wieliczki odwołany", "Duży ruch, jedzie się wolno",
+]
+_INSULTS = ["kurwa", "K U R W A", "k***a", "ch*j", "jebany", "spier**aj", "pizda", "szmata", "Kurwą", "p**da"]
+
+
+def _legacy_normalize(text: str) -> str:
+    t = text.strip().lower()
+    t = unicodedata.normalize("NFKD", t)
+    t = "".join(ch for ch in t if not unicodedata.combining(ch))
+    return t.translate(_PL_MAP)
+
+
+def _legacy_fuzzy(word: str) -> str:
+    return r"\b" + "".join(re.escape(ch) + r"[\W_]*" for ch in word) + r"\b"
+
+
+_LEGACY_FUZZY = [re.compile(_legacy_fuzzy(w), re.IGNORECASE | re.UNICODE) for w in _BAD_WORDS]
+_LEGACY_OBFUSCATED = [re.compile(r"\b" + p, re.IGNORECASE | re.UNICODE) for p in _OBFUSCATED]
+
+
+def legacy_looks_profanity(text: str) -> bool:
+    def raw(t: str) -> bool:
+        return any(p.search(t) for p in _LEGACY_FUZZY + _LEGACY_OBFUSCATED)
+
+    return raw(text) or raw(_legacy_normalize(text))
+
+
+def current_looks_profanity(text: str) -> bool:
+    return _looks_profanity(text, normalize_text(text))
+
+
+def corpus(n: int, seed: int = 7) -> list[str]:
+    """Krótkie zgłoszenia i wiadomości czatu; ~5% zawiera wulgaryzm (w tym zamaskowany)."""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        words = " ".join(rng.choice(_PHRASES) for _ in range(rng.randint(1, 4))).split()
+        if rng.random() < 0.05:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(_INSULTS))
+        texts.append(" ".join(words))
+    return texts
+
+
+# Znaki, których NFKD nie sprowadza do litery łacińskiej, a które re z IGNORECASE z nią utożsamia.
+_LOOKALIKES = {"i": "ıİ", "s": "ſ", "k": "\u212a"}
+
+
+def fuzz_corpus(n: int, seed: int = 11) -> list[str]:
+    """
+    Wulgaryzmy z wtrąconymi separatorami, diakrytykami, znakami pełnej szerokości i literami-sobowtórami
+    (ı, İ, ſ, K) – do sprawdzenia zgodności.
+    """
+    rng = random.Random(seed)
+    noise = list(" .-_*#$x") + ["\u0301", "\u0328", "ł", "Ł", "ą", "Ó", "ｋ", "ａ", "ß", "\u00a0", "é", "ж"]
+    texts = []
+    for _ in range(n):
+        chars = [
+            rng.choice(_LOOKALIKES[ch]) if ch in _LOOKALIKES and rng.random() < 0.3 else ch
+            for ch in rng.choice(_BAD_WORDS + _INSULTS + _PHRASES)
+        ]
+        for _ in range(rng.randint(0, 3)):
+            chars.insert(rng.randrange(len(chars) + 1), rng.choice(noise))
+        word = "".join(ch.upper() if rng.random() < 0.2 else ch for ch in chars)
+        texts.append(f"{rng.choice(_PHRASES)} {word} {rng.choice(_PHRASES)}")
+    return texts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = corpus(args.texts)
+    mismatches = [
+        t for t in texts + fuzz_corpus(args.texts) if legacy_looks_profanity(t) != current_looks_profanity(t)
+    ]
+    flagged = sum(map(current_looks_profanity, texts))
+    print(f"{len(texts)} texts, avg {sum(map(len, texts)) / len(texts):.0f} chars, {flagged} flagged")
+    print(f"mismatches: {len(mismatches)}" + (f" e.g. {mismatches[:3]!r}" if mismatches else ""))
+
+    for name, fn in (("legacy", legacy_looks_profanity), ("single-pass", current_looks_profanity)):
+        best = min(timeit.repeat(lambda fn=fn: [fn(t) for t in texts], number=1, repeat=args.repeat))
+        print(f"{name:>12}: {best * 1e6 / len(texts):7.2f} µs/text  ({best * 1e3:.1f} ms total)")
+
+
+if __name__ == "__main__":
+    main()
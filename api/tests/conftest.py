@@ -0,0 +1,42 @@
+import asyncio
+import os
+import tempfile
+from collections.abc import Iterator
+
+import pytest
+
+# Baza testów – ustawiana przed pierwszym importem `app`, bo silnik powstaje przy imporcie app.db.database.
+_DB_DIR = tempfile.mkdtemp(prefix="travel_hi_tests_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_DB_DIR}/test.db"
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import app.db.models  # noqa: E402,F401 – rejestruje wszystkie tabele w Base.metadata
+from app.db.database import Base, engine  # noqa: E402
+from app.utils.cache import _registry  # noqa: E402
+
+
+async def _reset_schema() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+@pytest.fixture
+def fresh_db() -> Iterator[None]:
+    """Pusta baza i puste cache procesu – każdy test zaczyna od zera."""
+    asyncio.run(_reset_schema())
+    for cache in _registry.values():
+        cache.clear()
+    yield
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def client(fresh_db: None) -> Iterator[TestClient]:
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
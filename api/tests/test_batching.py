@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from app.core.config import settings
+from app.services.moderation_cache import verdict_cache
+from app.utils import moderation
+from app.utils.batching import MicroBatcher
+
+
+class _Recorder:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.calls: list[list[str]] = []
+        self.delay = delay
+
+    async def __call__(self, items: list[str]) -> list[str]:
+        self.calls.append(items)
+        await asyncio.sleep(self.delay)
+        return [item.upper() for item in items]
+
+
+def test_flushes_when_batch_is_full():
+    handler = _Recorder()
+
+    async def main():
+        # max_wait tak duży, że partię może zamknąć tylko rozmiar.
+        batcher = MicroBatcher(handler, max_items=3, max_wait=60)
+        return await asyncio.wait_for(asyncio.gather(*(batcher.submit(x) for x in "abc")), timeout=1)
+
+    assert asyncio.run(main()) == ["A", "B", "C"]
+    assert handler.calls == [["a", "b", "c"]]
+
+
+def test_flushes_after_max_wait():
+    handler = _Recorder()
+
+    async def main():
+        batcher = MicroBatcher(handler, max_items=100, max_wait=0.05)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), batcher.submit("a"))
+        return results, loop.time() - started, batcher.stats()
+
+    results, elapsed, stats = asyncio.run(main())
+    assert results == ["A", "B", "A"]
+    assert elapsed >= 0.05
+    # Powtórzony tekst dzieli miejsce w partii.
+    assert handler.calls == [["a", "b"]]
+    assert stats["batches"] == 1 and stats["items"] == 2 and stats["pending"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    handler = _Recorder(delay=0.05)
+
+    async def main():
+        batcher = MicroBatcher(handler, max_items=100, max_wait=0.01)
+        first = asyncio.create_task(batcher.submit("a"))
+        second = asyncio.create_task(batcher.submit("a"))
+        other = asyncio.create_task(batcher.submit("b"))
+        await asyncio.sleep(0.02)  # partia już wysłana do handlera
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, await other
+
+    assert asyncio.run(main()) == ("A", "B")
+    assert handler.calls == [["a", "b"]]
+
+
+def test_handler_error_reaches_every_caller():
+    async def failing(items: list[str]) -> list[str]:
+        raise RuntimeError("boom")
+
+    async def main():
+        batcher = MicroBatcher(failing, max_items=2, max_wait=60)
+        return await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    assert [type(result) for result in asyncio.run(main())] == [RuntimeError, RuntimeError]
+
+
+@pytest.mark.skipif(not moderation.USE_LLM_MODERATION, reason="LLM moderation dependencies not installed")
+def test_missing_verdict_fails_open(monkeypatch):
+    async def fake_llm(prompt):
+        # Model pomija tekst o indeksie 1 i odrzuca tekst o indeksie 0.
+        return moderation.BatchModerationVerdict(verdicts=[moderation.ItemVerdict(index=0, allowed=False)])
+
+    monkeypatch.setattr(moderation, "_mod_batch_structured", RunnableLambda(fake_llm))
+    monkeypatch.setattr(settings, "MODERATION_BATCH_ENABLED", True)
+    monkeypatch.setattr(verdict_cache, "enabled", False)
+
+    async def main():
+        batcher = MicroBatcher(moderation._moderate_batch, max_items=2, max_wait=60)
+        monkeypatch.setattr(moderation, "_mod_batcher", batcher)
+        return await asyncio.gather(
+            moderation.amoderate_text("pierwszy tekst"), moderation.amoderate_text("drugi tekst")
+        )
+
+    assert asyncio.run(main()) == [False, True]
@@ -0,0 +1,64 @@
+import pytest
+
+from app.core.config import settings
+from app.services.vote_buffer import vote_aggregator
+
+
+def _create(client, **form) -> dict:
+    response = client.post("/api/v1/incidents", data={"type": "accident", "lat": 50.06, "lng": 19.94, **form})
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_unchanged_report_gives_304(client):
+    report = _create(client)
+    first = client.get(f"/api/v1/incidents/{report['id']}")
+    etag = first.headers["etag"]
+
+    again = client.get(f"/api/v1/incidents/{report['id']}", headers={"If-None-Match": etag})
+
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_vote_changes_report_etag_at_once(client, monkeypatch, write_behind):
+    # Wersja tabeli po głosie zmienia się dopiero przy flushu bufora – ETag pojedynczego zgłoszenia nie może
+    # na to czekać.
+    monkeypatch.setattr(vote_aggregator, "enabled", write_behind)
+    monkeypatch.setattr(vote_aggregator, "flush_interval", 3600)
+    report = _create(client)
+    etag = client.get(f"/api/v1/incidents/{report['id']}").headers["etag"]
+
+    assert client.post(f"/api/v1/incidents/{report['id']}/like").status_code == 200
+    after = client.get(f"/api/v1/incidents/{report['id']}", headers={"If-None-Match": etag})
+
+    assert after.status_code == 200
+    assert after.json()["likes"] == 1
+    assert after.headers["etag"] != etag
+
+
+def test_list_etag_changes_after_create(client):
+    _create(client)
+    etag = client.get("/api/v1/incidents").headers["etag"]
+    assert client.get("/api/v1/incidents", headers={"If-None-Match": etag}).status_code == 304
+
+    _create(client)
+    after = client.get("/api/v1/incidents", headers={"If-None-Match": etag})
+
+    assert after.status_code == 200
+    assert len(after.json()["items"]) == 2
+
+
+def test_list_etag_follows_votes_after_flush(client, monkeypatch):
+    monkeypatch.setattr(vote_aggregator, "enabled", settings.VOTE_WRITE_BEHIND_ENABLED)
+    report = _create(client)
+    etag = client.get("/api/v1/incidents").headers["etag"]
+
+    client.post(f"/api/v1/incidents/{report['id']}/like")
+    client.portal.call(vote_aggregator.flush)
+    after = client.get("/api/v1/incidents", headers={"If-None-Match": etag})
+
+    assert after.status_code == 200
+    assert after.json()["items"][0]["likes"] == 1
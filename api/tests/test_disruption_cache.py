@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from app.schemas.traffic import TrafficReport
+from app.services import disruption_cache
+from app.utils import llm
+
+
+class _FakeLLM:
+    """Zamiast `_structured` / `_structured_short`: zwraca `answer` albo rzuca, gdy `fail`."""
+
+    def __init__(self, answer: dict) -> None:
+        self.answer = answer
+        self.fail = False
+        self.calls = 0
+
+    async def __call__(self, prompt) -> "llm._AssessmentModel":
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("LLM down")
+        return llm._AssessmentModel(**self.answer)
+
+
+@pytest.fixture
+def fake_llm(fresh_db, monkeypatch) -> _FakeLLM:
+    fake = _FakeLLM(llm.FALLBACK_PREDICTION.model_dump())
+    monkeypatch.setattr(llm, "_structured", RunnableLambda(fake))
+    monkeypatch.setattr(llm, "_structured_short", RunnableLambda(fake))
+
+    async def allowed(text):
+        return text
+
+    monkeypatch.setattr(llm, "aensure_allowed_or_none", allowed)
+    return fake
+
+
+def _report(**overrides) -> TrafficReport:
+    data = dict(
+        city="Kraków",
+        mode="tram",
+        line="52",
+        latitude=50.06,
+        longitude=19.94,
+        timestamp="2025-10-01T10:01:00Z",
+        user_text="Tramwaj stoi",
+    )
+    return TrafficReport.model_validate({**data, **overrides})
+
+
+def test_llm_answer_equal_to_fallback_payload_is_cached(fake_llm):
+    async def main():
+        first = await disruption_cache.predict_disruption(_report())
+        second = await disruption_cache.predict_disruption(_report())
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert first == second == llm.FALLBACK_PREDICTION
+    assert fake_llm.calls == 1
+
+
+def test_llm_failure_is_not_cached(fake_llm):
+    fake_llm.fail = True
+
+    async def main():
+        failed = await disruption_cache.predict_disruption(_report(line="8"))
+        fake_llm.fail = False
+        fake_llm.answer = {**fake_llm.answer, "category": "delay", "confidence": 0.9}
+        return failed, await disruption_cache.predict_disruption(_report(line="8"))
+
+    failed, recovered = asyncio.run(main())
+
+    # Bez sygnałów w bazie heurystyka ma zerową pewność, ale i tak zastępuje stały fallback.
+    assert failed.confidence == 0.0
+    assert recovered.category == "delay"
+
+
+def test_aassess_disruption_raises_instead_of_fallback(fake_llm):
+    fake_llm.fail = True
+
+    with pytest.raises(llm.AssessmentUnavailable):
+        asyncio.run(llm.aassess_disruption(_report()))
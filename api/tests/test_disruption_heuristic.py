@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.db.models.event import EventSeverity, EventType
+from app.schemas.report import ReportType
+from app.schemas.traffic import TrafficReport
+from app.services.disruption_heuristic import BASE_PROBABILITY, score_disruption
+
+NOW = datetime(2025, 10, 1, 10, 0, tzinfo=timezone.utc)
+LAT, LNG = 50.06, 19.94
+RADIUS_KM = 1.0
+MAX_AGE = timedelta(minutes=60)
+
+
+def _report(**overrides) -> TrafficReport:
+    data = dict(
+        city="Kraków", mode="tram", line="52", latitude=LAT, longitude=LNG, timestamp=NOW, user_text="Tramwaj stoi"
+    )
+    return TrafficReport.model_validate({**data, **overrides})
+
+
+def _row(type_=ReportType.ACCIDENT, *, minutes_ago=5, dlat=0.001, likes=0, confirmations=0, denials=0):
+    return SimpleNamespace(
+        type=type_,
+        created_at=NOW - timedelta(minutes=minutes_ago),
+        latitude=LAT + dlat,
+        longitude=LNG,
+        likes=likes,
+        confirmations=confirmations,
+        denials=denials,
+    )
+
+
+def _event(*, lat=LAT, lng=LNG, lines=None, name="Strajk MPK", starts=-1, ends=2):
+    return SimpleNamespace(
+        name=name,
+        event_type=EventType.STRIKE,
+        severity=EventSeverity.HIGH,
+        starts_at=NOW + timedelta(hours=starts),
+        ends_at=NOW + timedelta(hours=ends),
+        lat=lat,
+        lng=lng,
+        radius_m=300,
+        affected_lines=lines,
+        is_verified=True,
+    )
+
+
+def _score(reports=(), events=(), **report):
+    return score_disruption(_report(**report), reports, events, radius_km=RADIUS_KM, max_age=MAX_AGE)
+
+
+def test_no_signals_gives_base_probability_and_zero_confidence():
+    prediction = _score()
+
+    assert prediction.probability == BASE_PROBABILITY
+    assert prediction.category == "unknown"
+    assert prediction.confidence == 0.0
+
+
+def test_agreeing_signals_raise_confidence():
+    one = _score([_row()])
+    three = _score([_row(), _row(dlat=0.002), _row(dlat=-0.001)])
+    mixed = _score([_row(), _row(ReportType.ROADWORK, dlat=0.002), _row(ReportType.OTHER, dlat=-0.001)])
+
+    assert one.category == three.category == "accident"
+    assert three.probability > one.probability > BASE_PROBABILITY
+    assert three.confidence > one.confidence
+    # Ta sama liczba zgłoszeń, ale w różnych kategoriach – mniejsza pewność.
+    assert mixed.confidence < three.confidence
+
+
+def test_denied_reports_weigh_less():
+    plain = _score([_row()])
+    denied = _score([_row(denials=5)])
+    supported = _score([_row(likes=3, confirmations=2)])
+
+    assert denied.probability < plain.probability < supported.probability
+    assert denied.confidence < plain.confidence
+
+
+def test_event_on_passenger_line_counts_far_away():
+    far_on_line = _event(lat=52.23, lng=21.01, lines="52, 8")
+
+    on_line = _score(events=[far_on_line])
+    other_line = _score(events=[far_on_line], line="4")
+
+    assert on_line.category == "strike"
+    assert "Strajk MPK" in on_line.reasoning
+    assert other_line.confidence == 0.0
+
+
+@pytest.mark.parametrize("lines", ["52;A", "a 52", "8/52", "52|8"])
+def test_event_line_separators_match_line_index(lines):
+    # Tak jak `split_lines` przy zapisie do `event_lines` – nie tylko przecinek.
+    prediction = _score(events=[_event(lat=52.23, lng=21.01, lines=lines)])
+
+    assert prediction.category == "strike"
+
+
+def test_nearby_event_outside_its_time_window_is_ignored():
+    assert _score(events=[_event()]).category == "strike"
+    assert _score(events=[_event(starts=-6, ends=-3)]).confidence == 0.0
+
+
+@pytest.mark.parametrize("minutes_ago", [61, 24 * 60])
+def test_old_reports_are_ignored(minutes_ago):
+    assert _score([_row(minutes_ago=minutes_ago)]).confidence == 0.0
+
+
+def test_old_timestamp_uses_reports_from_its_own_time():
+    # Zgłoszenie opisuje sytuację sprzed 2 godzin – liczą się sygnały z tamtego czasu, nie z teraz.
+    then = NOW - timedelta(hours=2)
+    reports = [_row(minutes_ago=125), _row(minutes_ago=5)]
+
+    prediction = _score(reports, timestamp=then)
+
+    assert prediction.category == "accident"
+    assert "z ostatnich 60 min: 1." in prediction.reasoning
+    # Naiwna data (jak z SQLite) to UTC.
+    assert _score(reports, timestamp=then.replace(tzinfo=None)) == prediction
+
+
+def test_result_does_not_depend_on_input_order():
+    reports = [_row(), _row(ReportType.TRAFFIC_JAM, dlat=0.002), _row(ReportType.DELAY, dlat=-0.002)]
+    events = [_event(), _event(name="Koncert", starts=0, ends=1)]
+
+    assert _score(reports, events) == _score(reports[::-1], events[::-1])
@@ -0,0 +1,71 @@
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.db.models  # noqa: F401 – rejestruje wszystkie tabele w Base.metadata
+from app.db.database import Base
+from app.db.models.event import Event, EventLine
+from app.repositories.event import upsert_events
+from app.schemas.event import EventCreate
+
+
+def _row(external_id: str | None, name: str, lines: str) -> dict:
+    return EventCreate(
+        name=name,
+        event_type="STRIKE",
+        starts_at="2025-10-04T10:00:00Z",
+        ends_at="2025-10-04T12:00:00Z",
+        lat=50.06,
+        lng=19.94,
+        affected_lines=lines,
+        source="feed",
+        external_id=external_id,
+    ).model_dump()
+
+
+async def _upsert(db_url: str, *batches: list[dict]) -> tuple[list[Event], list[tuple[int, str]]]:
+    engine = create_async_engine(db_url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_factory() as session:
+            for batch in batches:
+                await upsert_events(session, batch)
+            events = list((await session.execute(select(Event).order_by(Event.id))).scalars().all())
+            lines = (await session.execute(select(EventLine.event_id, EventLine.line))).all()
+        return events, sorted(lines)
+    finally:
+        await engine.dispose()
+
+
+def test_duplicate_key_in_one_batch_keeps_last_row(tmp_path):
+    batch = [_row("a", "first", "1,2"), _row("b", "other", "3"), _row("a", "second", "4")]
+
+    events, lines = asyncio.run(_upsert(f"sqlite+aiosqlite:///{tmp_path / 'events.db'}", batch))
+
+    assert [(evt.external_id, evt.name) for evt in events] == [("a", "second"), ("b", "other")]
+    by_id = {evt.external_id: evt.id for evt in events}
+    assert lines == sorted([(by_id["a"], "4"), (by_id["b"], "3")])
+
+
+def test_rows_without_external_id_are_not_deduplicated(tmp_path):
+    batch = [_row(None, "x", ""), _row(None, "y", "")]
+
+    events, _ = asyncio.run(_upsert(f"sqlite+aiosqlite:///{tmp_path / 'events.db'}", batch))
+
+    assert [evt.name for evt in events] == ["x", "y"]
+
+
+def test_duplicate_key_across_batches_updates(tmp_path):
+    events, lines = asyncio.run(
+        _upsert(
+            f"sqlite+aiosqlite:///{tmp_path / 'events.db'}",
+            [_row("a", "old", "1")],
+            [_row("a", "new", "2"), _row("a", "newest", "3")],
+        )
+    )
+
+    assert [evt.name for evt in events] == ["newest"]
+    assert lines == [(events[0].id, "3")]
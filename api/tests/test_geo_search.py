@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from app.utils.geo import BBox, cell_ranges, grid_cell, haversine_km, radius_bbox
+
+
+@pytest.mark.parametrize(
+    "bbox",
+    [BBox(50.0, 19.9, 50.1, 20.0), BBox(-0.05, -0.05, 0.05, 0.05), BBox(-17.0, 179.95, -16.9, -179.95)],
+    ids=["krakow", "origin", "antimeridian"],
+)
+def test_cell_ranges_cover_every_point_in_bbox(bbox):
+    ranges = cell_ranges(bbox)
+    rng = random.Random(1)
+
+    assert ranges is not None
+    for _ in range(2000):
+        lat = rng.uniform(bbox.min_lat, bbox.max_lat)
+        lo, hi = rng.choice(bbox.lng_intervals())
+        cell = grid_cell(lat, rng.uniform(lo, hi))
+        assert any(start <= cell <= end for start, end in ranges)
+
+
+def test_cell_ranges_give_up_on_large_boxes():
+    assert cell_ranges(BBox(40.0, 10.0, 60.0, 30.0)) is None
+
+
+@pytest.mark.parametrize(
+    ("lat", "lng"),
+    [(50.06, 19.94), (-17.0, 179.99)],
+    ids=["krakow", "antimeridian"],
+)
+def test_radius_search_matches_haversine(client, lat, lng):
+    rng = random.Random(7)
+    points = []
+    for _ in range(30):
+        point = (lat + rng.uniform(-0.1, 0.1), (lng + rng.uniform(-0.1, 0.1) + 180) % 360 - 180)
+        response = client.post("/api/v1/incidents", data={"type": "accident", "lat": point[0], "lng": point[1]})
+        assert response.status_code == 201, response.text
+        points.append((response.json()["id"], point))
+
+    for radius in (0.5, 3, 8):
+        expected = {id_ for id_, (p_lat, p_lng) in points if haversine_km(lat, lng, p_lat, p_lng) <= radius}
+        response = client.get("/api/v1/incidents", params={"lat": lat, "lng": lng, "radius": radius, "limit": 200})
+
+        assert response.status_code == 200, response.text
+        assert {item["id"] for item in response.json()["items"]} == expected
+
+    # Przy antypołudniku wyniki leżą po obu jego stronach – box promienia dzieli się na dwa przedziały długości.
+    if radius_bbox(lat, lng, 8).crosses_antimeridian:
+        assert {p_lng > 0 for id_, (_, p_lng) in points if id_ in expected} == {True, False}
@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.db.models.report import ReportType
+from app.services.live_index import LiveReportIndex
+from app.services.report import ReportService
+from app.utils.geo import grid_cell
+from app.utils.pagination import Page
+
+LAT, LNG = 50.06, 19.94
+MAX_AGE = timedelta(hours=3)
+
+
+def _report(id_: int, minutes_ago: float) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=id_,
+        type=ReportType.ACCIDENT,
+        latitude=LAT,
+        longitude=LNG,
+        geo_cell=grid_cell(LAT, LNG),
+        name=None,
+        description=None,
+        photo_path=None,
+        likes=0,
+        confirmations=0,
+        denials=0,
+        created_at=datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+    )
+
+
+class _FakeRepo:
+    """Zamiast `ReportRepository`: zapamiętuje, że zapytanie zeszło do bazy."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def list_in_radius(self, **kwargs) -> Page:
+        self.calls += 1
+        return Page(items=[], next_cursor=None, total=0)
+
+
+@pytest.fixture
+def index() -> LiveReportIndex:
+    index = LiveReportIndex(max_items=2, max_age=MAX_AGE)
+    if not index.enabled:
+        pytest.skip("numpy is not installed")
+    return index
+
+
+def test_covers_window_within_max_age(index):
+    assert index.covers(timedelta(minutes=30))
+    assert not index.covers(MAX_AGE + timedelta(minutes=1))
+    assert not index.covers(None)
+
+
+def test_eviction_for_space_uncovers_windows_reaching_it(index):
+    for id_, minutes_ago in [(1, 60), (2, 20), (3, 5)]:
+        index.add(_report(id_, minutes_ago))
+
+    assert index.get(1) is None
+    # Wyrzucone zgłoszenie sprzed 60 min – okno 90 min miałoby lukę, okno 30 min jest kompletne.
+    assert not index.covers(timedelta(minutes=90))
+    assert index.covers(timedelta(minutes=30))
+
+
+def test_expired_reports_do_not_uncover(index):
+    index.add(_report(1, MAX_AGE.total_seconds() / 60 + 1))
+    index.add(_report(2, 20))
+    index.add(_report(3, 5))
+
+    assert index.covers(MAX_AGE)
+
+
+def test_rebuild_resets_eviction_mark(index):
+    for id_, minutes_ago in [(1, 60), (2, 20), (3, 5)]:
+        index.add(_report(id_, minutes_ago))
+
+    index.rebuild([_report(2, 20), _report(3, 5)])
+
+    assert index.covers(MAX_AGE)
+
+
+def test_service_falls_back_to_database_after_eviction(index):
+    repo = _FakeRepo()
+    service = ReportService(repo, index=index)
+    for id_, minutes_ago in [(1, 60), (2, 20), (3, 5)]:
+        index.add(_report(id_, minutes_ago))
+
+    def query(max_age: timedelta) -> Page:
+        return asyncio.run(
+            service.list_in_radius(lat=LAT, lng=LNG, radius_km=1, skip=0, limit=10, max_age=max_age)
+        )
+
+    recent = query(timedelta(minutes=30))
+    assert [item.id for item in recent.items] == [3, 2]
+    assert repo.calls == 0
+
+    query(timedelta(minutes=90))
+    assert repo.calls == 1
@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services import moderation_queue as queue_module
+from app.services.moderation_queue import moderation_queue
+
+
+class _FakeModeration:
+    """Zamiast `amoderate_texts`: odrzuca teksty z `banned`, a pierwsze `failures` wywołań rzuca."""
+
+    def __init__(self, banned: str = "zakazane") -> None:
+        self.banned = banned
+        self.failures = 0
+        self.calls = 0
+
+    async def __call__(self, *texts):
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("LLM down")
+        return [text is None or self.banned not in text for text in texts]
+
+
+@pytest.fixture
+def moderation(client, monkeypatch) -> _FakeModeration:
+    """Asynchroniczna moderacja z atrapą LLM; workery startuje dopiero test (`_start_workers`)."""
+    fake = _FakeModeration()
+    monkeypatch.setattr(queue_module, "amoderate_texts", fake)
+    monkeypatch.setattr(settings, "MODERATION_ASYNC_ENABLED", True)
+    monkeypatch.setattr(moderation_queue, "enabled", True)
+    monkeypatch.setattr(moderation_queue, "retry_base", 0.05)
+    monkeypatch.setattr(moderation_queue, "processed", 0)
+    monkeypatch.setattr(moderation_queue, "failed", 0)
+    yield fake
+    client.portal.call(moderation_queue.stop)
+
+
+def _start_workers(client) -> None:
+    # Aplikacja wystartowała z wyłączoną kolejką; start() bierze zgłoszenia PENDING z bazy, jak po restarcie.
+    client.portal.call(moderation_queue.start)
+
+
+def _create(client, name: str) -> int:
+    response = client.post("/api/v1/incidents", data={"type": "accident", "lat": 50.06, "lng": 19.94, "name": name})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _wait_for_verdict(client, report_id: int, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get(f"/api/v1/incidents/{report_id}")
+        if response.status_code != 200 or response.json().get("moderation_status") != "pending":
+            return response
+        time.sleep(0.02)
+    raise AssertionError(f"Report {report_id} still pending after {timeout} s")
+
+
+def _listed(client) -> list[int]:
+    return [item["id"] for item in client.get("/api/v1/incidents").json()["items"]]
+
+
+def test_pending_report_is_hidden_until_approved(client, moderation):
+    report_id = _create(client, "Korek na moście")
+
+    assert client.get(f"/api/v1/incidents/{report_id}").json() == {"id": report_id, "moderation_status": "pending"}
+    assert report_id not in _listed(client)
+
+    _start_workers(client)
+    approved = _wait_for_verdict(client, report_id)
+
+    assert approved.status_code == 200
+    assert approved.json()["name"] == "Korek na moście"
+    assert report_id in _listed(client)
+
+
+def test_rejected_report_is_never_published(client, moderation):
+    report_id = _create(client, "Coś zakazane")
+
+    _start_workers(client)
+
+    assert _wait_for_verdict(client, report_id).status_code == 404
+    assert report_id not in _listed(client)
+
+
+def test_failed_moderation_is_retried(client, moderation):
+    moderation.failures = 2
+    report_id = _create(client, "Objazd przez Kapelankę")
+
+    _start_workers(client)
+    approved = _wait_for_verdict(client, report_id)
+
+    assert approved.status_code == 200
+    assert moderation.calls == 3
+    assert moderation_queue.stats()["failed"] == 2
+    assert report_id in _listed(client)
+
+
+def test_local_prefilter_rejects_at_once(client, moderation):
+    response = client.post(
+        "/api/v1/incidents", data={"type": "accident", "lat": 50.06, "lng": 19.94, "name": "kurwa"}
+    )
+
+    assert response.status_code == 400
+    assert moderation.calls == 0
@@ -0,0 +1,88 @@
+import base64
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.utils.pagination import decode_cursor, encode_cursor, page_from
+
+
+def _raw_cursor(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 10, 1, 10, 0, 0, 123456)
+
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+@pytest.mark.parametrize(
+    "created_at",
+    [
+        datetime(2025, 10, 1, 10, 0, tzinfo=timezone.utc),
+        datetime(2025, 10, 1, 12, 0, tzinfo=timezone(timedelta(hours=2))),
+    ],
+)
+def test_cursor_with_offset_decodes_to_naive_utc(created_at):
+    assert decode_cursor(encode_cursor(created_at, 7)) == (datetime(2025, 10, 1, 10, 0), 7)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["", "???", _raw_cursor("no-separator"), _raw_cursor("2025-10-01T10:00:00|x"), _raw_cursor("yesterday|1")],
+)
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_page_from_sets_cursor_only_when_more_rows_exist():
+    rows = [type("Row", (), {"created_at": datetime(2025, 10, 1, 10, i), "id": i})() for i in range(3)]
+
+    assert page_from(rows, 3).next_cursor is None
+    page = page_from(rows, 2)
+    assert page.items == rows[:2]
+    assert decode_cursor(page.next_cursor) == (rows[1].created_at, 1)
+
+
+def _create(client, n: int) -> None:
+    for _ in range(n):
+        response = client.post("/api/v1/incidents", data={"type": "accident", "lat": 50.06, "lng": 19.94})
+        assert response.status_code == 201
+
+
+@pytest.mark.parametrize("total", ["false", "approx", "exact"])
+def test_pages_follow_cursor_without_gaps(client, total):
+    _create(client, 5)
+    params = {"lat": 50.06, "lng": 19.94, "radius": 5, "limit": 2, "include_total": total}
+
+    seen, cursor = [], None
+    while True:
+        page = client.get("/api/v1/incidents", params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [5, 4, 3, 2, 1]
+
+
+@pytest.mark.parametrize("total", ["false", "exact"])
+@pytest.mark.parametrize("viewport", [False, True])
+def test_cursor_with_offset_is_accepted(client, total, viewport):
+    _create(client, 3)
+    cursor = encode_cursor(datetime.now(timezone(timedelta(hours=2))) + timedelta(minutes=1), 10**9)
+    params = {"cursor": cursor, "include_total": total}
+    if viewport:
+        params |= {"min_lat": 49, "min_lng": 19, "max_lat": 51, "max_lng": 21}
+    else:
+        params |= {"lat": 50.06, "lng": 19.94, "radius": 5}
+
+    response = client.get("/api/v1/incidents", params=params)
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [3, 2, 1]
+
+
+def test_garbage_cursor_is_400(client):
+    assert client.get("/api/v1/incidents", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,38 @@
+import pytest
+
+from app.utils.moderation import contains_profanity
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "kurwa",
+        "K U R W A",
+        "k***a",
+        "Kurwą mać",
+        "pızda",  # bezkropkowe ı zamiast i
+        "DzıwKa",
+        "spıerdalaj",
+        "Spİerdalaj",
+        "ſzmata",  # długie s
+        "Kurwa",  # znak kelwina zamiast K
+        "ｋｕｒｗａ",
+    ],
+)
+def test_flags_profanity(text):
+    assert contains_profanity(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        None,
+        "",
+        "Tramwaj 52 stoi na moście Dębnickim",
+        "Linia 8 skrócona do Łagiewnik",
+        "İstanbul",
+        "Kelvin K",
+    ],
+)
+def test_allows_clean_text(text):
+    assert not contains_profanity(text)
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.rbac import get_current_active_user
+from app.repositories.rollup import bucket_start
+from app.schemas.report import RollupGranularity
+from app.schemas.user import Role, User
+
+
+@pytest.mark.parametrize(
+    ("at", "hour", "day"),
+    [
+        (datetime(2025, 10, 1, 10, 59, 59), datetime(2025, 10, 1, 10), datetime(2025, 10, 1)),
+        (datetime(2025, 10, 1, 10, 30, tzinfo=timezone.utc), datetime(2025, 10, 1, 10), datetime(2025, 10, 1)),
+        # 01:30 w strefie +02:00 to 23:30 UTC poprzedniego dnia.
+        (
+            datetime(2025, 10, 2, 1, 30, tzinfo=timezone(timedelta(hours=2))),
+            datetime(2025, 10, 1, 23),
+            datetime(2025, 10, 1),
+        ),
+    ],
+)
+def test_bucket_start_is_utc(at, hour, day):
+    assert bucket_start(at, RollupGranularity.HOUR) == hour.replace(tzinfo=timezone.utc)
+    assert bucket_start(at, RollupGranularity.DAY) == day.replace(tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def metrics_client(client):
+    admin = User(_id=1, email="admin@example.com", username="admin", role=Role.ADMIN)
+    client.app.dependency_overrides[get_current_active_user] = lambda: admin
+    yield client
+    client.app.dependency_overrides.clear()
+
+
+def _create(client) -> dict:
+    response = client.post("/api/v1/incidents", data={"type": "accident", "lat": 50.06, "lng": 19.94})
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+@pytest.mark.parametrize("granularity", ["hour", "day"])
+def test_reports_and_votes_land_in_current_bucket(metrics_client, granularity):
+    report = _create(metrics_client)
+    _create(metrics_client)
+    metrics_client.post(f"/api/v1/incidents/{report['id']}/like")
+    now = datetime.now(timezone.utc)
+
+    response = metrics_client.get(
+        "/api/v1/metrics/reports",
+        params={"start": (now - timedelta(hours=1)).isoformat(), "end": now.isoformat(), "granularity": granularity},
+    )
+
+    assert response.status_code == 200, response.text
+    points = response.json()["points"]
+    assert sum(point["reports"] for point in points) == 2
+    assert sum(point["likes"] for point in points) == 1
+    assert {point["type"] for point in points} == {"accident"}
+
+
+def test_naive_and_offset_bounds_are_compared_in_utc(metrics_client):
+    _create(metrics_client)
+    now = datetime.now(timezone.utc)
+    # Naiwny start (UTC) z końcem w strefie +02:00 – ten sam moment, więc zakres jest poprawny.
+    params = {
+        "start": (now - timedelta(hours=1)).replace(tzinfo=None).isoformat(),
+        "end": now.astimezone(timezone(timedelta(hours=2))).isoformat(),
+    }
+
+    response = metrics_client.get("/api/v1/metrics/reports", params=params)
+
+    assert response.status_code == 200, response.text
+    assert sum(point["reports"] for point in response.json()["points"]) == 1
+
+
+def test_end_before_start_is_422(metrics_client):
+    # 11:00+02:00 to 09:00 UTC – przed naiwnym (UTC) startem o 10:00.
+    params = {"start": "2025-10-01T10:00:00", "end": "2025-10-01T11:00:00+02:00"}
+
+    assert metrics_client.get("/api/v1/metrics/reports", params=params).status_code == 422
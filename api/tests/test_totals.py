@@ -0,0 +1,35 @@
+import pytest
+
+from app.repositories.report import invalidate_totals_at
+from app.utils.counting import count_cache
+from app.utils.geo import BBox
+
+VIEWPORT = {"min_lat": 49, "min_lng": 19, "max_lat": 51, "max_lng": 21}
+RADIUS = {"lat": 50.06, "lng": 19.94, "radius": 5}
+
+
+def _create(client, lat: float = 50.06, lng: float = 19.94) -> None:
+    response = client.post("/api/v1/incidents", data={"type": "accident", "lat": lat, "lng": lng})
+    assert response.status_code == 201, response.text
+
+
+def _total(client, params: dict) -> int:
+    return client.get("/api/v1/incidents", params={**params, "include_total": "approx"}).json()["total"]
+
+
+@pytest.mark.parametrize("params", [VIEWPORT, RADIUS], ids=["viewport", "radius"])
+def test_approx_total_follows_new_reports(client, params):
+    _create(client)
+    assert _total(client, params) == 1
+
+    _create(client)
+
+    assert _total(client, params) == 2
+
+
+def test_report_elsewhere_keeps_cached_totals(fresh_db):
+    count_cache.set(("bbox", BBox(49, 19, 51, 21), None), 7)
+    count_cache.set(("radius", 50.06, 19.94, 5, None), 3)
+
+    assert invalidate_totals_at(52.23, 21.01) == 0
+    assert invalidate_totals_at(50.06, 19.99) == 2